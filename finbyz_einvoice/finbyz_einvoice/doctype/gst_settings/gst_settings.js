@@ -23,6 +23,7 @@ frappe.ui.form.on("GST Settings", {
         });
     },
     onload: show_ic_api_promo,
+    refresh: show_gsp_status,
     attach_e_waybill_print(frm) {
         if (!frm.doc.attach_e_waybill_print || frm.doc.fetch_e_waybill_data) return;
         frm.set_value("fetch_e_waybill_data", 1);
@@ -69,6 +70,28 @@ function show_ic_api_promo(frm) {
     });
 }
 
+function show_gsp_status(frm) {
+    const unavailable_apis = (frm.doc.__onload?.gsp_status || []).filter(
+        status => status.state !== "Closed"
+    );
+
+    if (!unavailable_apis.length) return;
+
+    frm.dashboard.set_headline_alert(
+        unavailable_apis
+            .map(status =>
+                status.state === "Open"
+                    ? __(
+                          "{0} API is paused after {1} consecutive failures. Retrying in {2} seconds.",
+                          [status.api_name, status.failures, Math.ceil(status.retry_after)]
+                      )
+                    : __("{0} API is recovering from failures.", [status.api_name])
+            )
+            .join("<br>"),
+        "orange"
+    );
+}
+
 function set_auto_generate_e_waybill(frm) {
     if (!frm.doc.enable_e_invoice) return;
 
@@ -6,6 +6,9 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import getdate
 
+from finbyz_einvoice.gst_india.api_classes.auth import clear_auth_token
+from finbyz_einvoice.gst_india.api_classes.credentials import clear_credentials_cache
+from finbyz_einvoice.gst_india.api_classes.throttle import get_circuit_state
 from finbyz_einvoice.gst_india.constants import GST_ACCOUNT_FIELDS
 from finbyz_einvoice.gst_india.constants.custom_fields import (
     E_INVOICE_FIELDS,
@@ -16,7 +19,12 @@ from finbyz_einvoice.gst_india.page.finbyz_einvoice_account import (
     _disable_api_promo,
     post_login,
 )
-from finbyz_einvoice.gst_india.utils import can_enable_api
+from finbyz_einvoice.gst_india.utils import (
+    can_enable_api,
+    clear_gst_account_profiles,
+    clear_gst_uom_maps,
+    is_api_enabled,
+)
 from finbyz_einvoice.gst_india.utils.custom_fields import toggle_custom_fields
 
 E_INVOICE_START_DATE = "2021-01-01"
@@ -24,6 +32,9 @@ E_INVOICE_START_DATE = "2021-01-01"
 
 class GSTSettings(Document):
     def onload(self):
+        if is_api_enabled(self):
+            self.set_onload("gsp_status", get_gsp_status())
+
         if can_enable_api(self) or frappe.db.get_global("ic_api_promo_dismissed"):
             return
 
@@ -48,6 +59,15 @@ class GSTSettings(Document):
     def on_update(self):
         self.update_custom_fields()
 
+        if self.has_value_changed("client_id") or self.has_value_changed(
+            "client_secret"
+        ):
+            clear_auth_token()
+
+        clear_credentials_cache()
+        clear_gst_account_profiles()
+        clear_gst_uom_maps()
+
         # clear session boot cache
         frappe.cache().delete_keys("bootinfo")
 
@@ -221,3 +241,10 @@ class GSTSettings(Document):
 def disable_api_promo():
     if frappe.has_permission("GST Settings", "write"):
         _disable_api_promo()
+
+
+def get_gsp_status():
+    return [
+        get_circuit_state(api_name)
+        for api_name in ("e-Invoice", "e-Waybill", "GST Public")
+    ]
@@ -0,0 +1,9 @@
+# Copyright (c) 2023, info@finbyz.tech and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+
+class TestGSTINInfo(FrappeTestCase):
+	pass
@@ -0,0 +1,67 @@
+// Copyright (c) 2023, Resilient Tech and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["GSTIN Verification Exceptions"] = {
+    filters: [
+        {
+            fieldtype: "Select",
+            fieldname: "source_type",
+            label: __("Document Type"),
+            options: "\nCompany\nCustomer\nSupplier\nAddress",
+        },
+        {
+            fieldtype: "Select",
+            fieldname: "exception",
+            label: __("Exception"),
+            options:
+                "\nInvalid GSTIN\nVerification Failed\nNot Active\nGST Category Mismatch",
+        },
+    ],
+
+    onload: function (report) {
+        report.page.add_inner_button(__("Verify GSTINs"), () => {
+            frappe.call({
+                method: "finbyz_einvoice.gst_india.utils.gstin_verification.enqueue_gstin_verification",
+                callback: () => {
+                    frappe.show_alert({
+                        message: __("GSTIN verification has been queued"),
+                        indicator: "blue",
+                    });
+                    show_gstin_verification_progress(report);
+                },
+            });
+        });
+    },
+};
+
+function show_gstin_verification_progress(report) {
+    const event = "gstin_verification_progress";
+    const title = __("Verifying GSTINs");
+
+    frappe.realtime.off(event);
+    frappe.realtime.on(event, ({ status, total, processed, failed }) => {
+        if (!total) return;
+
+        frappe.show_progress(
+            title,
+            processed,
+            total,
+            __("{0} of {1} processed, {2} failed", [processed, total, failed]),
+            true
+        );
+
+        if (status !== "Completed" && status !== "Stopped") return;
+
+        frappe.realtime.off(event);
+        frappe.hide_progress();
+        frappe.show_alert({
+            message:
+                status === "Completed"
+                    ? __("GSTIN verification completed with {0} failure(s)", [failed])
+                    : __("GSTIN verification stopped as all GSTINs of a chunk failed"),
+            indicator: failed ? "orange" : "green",
+        });
+
+        report.refresh();
+    });
+}
@@ -0,0 +1,157 @@
+# Copyright (c) 2023, Resilient Tech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+
+from finbyz_einvoice.gst_india.utils.gstin_verification import GSTIN_SOURCES
+
+INVALID_GSTIN = "Invalid GSTIN"
+VERIFICATION_FAILED = "Verification Failed"
+NOT_ACTIVE = "Not Active"
+CATEGORY_MISMATCH = "GST Category Mismatch"
+
+# not shown by the GST Public API, can't be compared
+UNVERIFIABLE_GST_CATEGORIES = {"Deemed Export", "Overseas"}
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+
+    columns = get_columns()
+    data = get_data(filters)
+
+    return columns, data
+
+
+def get_data(filters):
+    data = []
+
+    for doctype, source_filters in GSTIN_SOURCES.items():
+        if filters.source_type and filters.source_type != doctype:
+            continue
+
+        for row in get_verified_gstins(doctype, source_filters):
+            if not (exception := get_exception(row)):
+                continue
+
+            if filters.exception and filters.exception != exception:
+                continue
+
+            row.update(exception=exception, source_type=doctype)
+            data.append(row)
+
+    return data
+
+
+def get_verified_gstins(doctype, source_filters):
+    source = frappe.qb.DocType(doctype)
+    gstin_info = frappe.qb.DocType("GSTIN Info")
+
+    query = (
+        frappe.qb.from_(source)
+        .join(gstin_info)
+        .on(source.gstin == gstin_info.name)
+        .select(
+            source.name.as_("source_name"),
+            source.gstin,
+            source.gst_category,
+            gstin_info.status,
+            gstin_info.legal_name,
+            gstin_info.gst_category.as_("registered_gst_category"),
+            gstin_info.last_updated_on,
+            gstin_info.verification_error,
+        )
+        .orderby(source.gstin)
+    )
+
+    for fieldname, value in source_filters.items():
+        query = query.where(source[fieldname] == value)
+
+    return query.run(as_dict=True)
+
+
+def get_exception(row):
+    if row.status == "Invalid":
+        return INVALID_GSTIN
+
+    if row.verification_error:
+        return VERIFICATION_FAILED
+
+    if row.status and row.status != "Active":
+        return NOT_ACTIVE
+
+    if (
+        row.registered_gst_category
+        and row.gst_category not in UNVERIFIABLE_GST_CATEGORIES
+        and row.gst_category != row.registered_gst_category
+    ):
+        return CATEGORY_MISMATCH
+
+
+def get_columns():
+    return [
+        {
+            "fieldtype": "Data",
+            "fieldname": "exception",
+            "label": _("Exception"),
+            "width": 160,
+        },
+        {
+            "fieldtype": "Link",
+            "fieldname": "source_type",
+            "label": _("Document Type"),
+            "options": "DocType",
+            "width": 110,
+        },
+        {
+            "fieldtype": "Dynamic Link",
+            "fieldname": "source_name",
+            "label": _("Document Name"),
+            "options": "source_type",
+            "width": 180,
+        },
+        {
+            "fieldtype": "Link",
+            "fieldname": "gstin",
+            "label": _("GSTIN"),
+            "options": "GSTIN Info",
+            "width": 160,
+        },
+        {
+            "fieldtype": "Data",
+            "fieldname": "status",
+            "label": _("Status"),
+            "width": 100,
+        },
+        {
+            "fieldtype": "Data",
+            "fieldname": "legal_name",
+            "label": _("Legal Name"),
+            "width": 200,
+        },
+        {
+            "fieldtype": "Data",
+            "fieldname": "gst_category",
+            "label": _("GST Category"),
+            "width": 150,
+        },
+        {
+            "fieldtype": "Data",
+            "fieldname": "registered_gst_category",
+            "label": _("Registered GST Category"),
+            "width": 150,
+        },
+        {
+            "fieldtype": "Datetime",
+            "fieldname": "last_updated_on",
+            "label": _("Last Verified On"),
+            "width": 160,
+        },
+        {
+            "fieldtype": "Small Text",
+            "fieldname": "verification_error",
+            "label": _("Verification Error"),
+            "width": 250,
+        },
+    ]
@@ -11,7 +11,12 @@ from frappe.utils import cstr, flt, getdate
 import erpnext
 
 from finbyz_einvoice.gst_india.report.gstr_1.gstr_1 import get_company_gstin_number
-from finbyz_einvoice.gst_india.utils import get_gst_accounts_by_type, get_gst_uom
+from finbyz_einvoice.gst_india.utils import (
+    get_gst_account_profile,
+    get_gst_accounts_by_type,
+    get_gst_uom,
+)
+from finbyz_einvoice.gst_india.utils.hsn_codes import get_hsn_index
 
 
 def execute(filters=None):
@@ -20,11 +25,7 @@ def execute(filters=None):
 
     columns = get_columns()
 
-    output_gst_accounts = {
-        account
-        for account in get_gst_accounts_by_type(filters.company, "Output").values()
-        if account
-    }
+    output_gst_accounts = get_gst_account_profile(filters.company, "Output").account_set
 
     company_currency = erpnext.get_company_currency(filters.company)
     item_list = get_items(filters)
@@ -158,12 +159,10 @@ def get_items(filters):
             sum(`tabSales Invoice Item`.stock_qty) AS stock_qty,
             sum(`tabSales Invoice Item`.taxable_value) AS taxable_value,
             `tabSales Invoice Item`.parent,
-            `tabSales Invoice Item`.item_code,
-            `tabGST HSN Code`.description
+            `tabSales Invoice Item`.item_code
         FROM
             `tabSales Invoice`
             INNER JOIN `tabSales Invoice Item` ON `tabSales Invoice`.name = `tabSales Invoice Item`.parent
-            INNER JOIN `tabGST HSN Code` ON `tabSales Invoice Item`.gst_hsn_code = `tabGST HSN Code`.name
         WHERE
             `tabSales Invoice`.docstatus = 1
             AND `tabSales Invoice`.company_gstin != IFNULL(`tabSales Invoice`.billing_address_gstin, '')
@@ -176,6 +175,13 @@ def get_items(filters):
         as_dict=1,
     )
 
+    # only items with GST HSN Codes, with their description
+    hsn_index = get_hsn_index()
+    items = [item for item in items if item.gst_hsn_code in hsn_index]
+
+    for item in items:
+        item.description = hsn_index.get_description(item.gst_hsn_code)
+
     return items
 
 
@@ -0,0 +1,199 @@
+import asyncio
+import weakref
+from json import loads
+
+import aiohttp
+
+import frappe
+from frappe.utils import cint
+
+from finbyz_einvoice.gst_india.api_classes.base import BaseAPI
+from finbyz_einvoice.gst_india.api_classes.e_invoice import EInvoiceAPI
+from finbyz_einvoice.gst_india.api_classes.session import get_timeout
+from finbyz_einvoice.gst_india.api_classes.throttle import (
+    get_retry_after,
+    is_retryable_error,
+    is_retryable_status,
+)
+
+DEFAULT_CONNECTION_LIMIT = 100
+
+# one session per event loop, aiohttp sessions can't be shared across loops
+_sessions = weakref.WeakKeyDictionary()
+
+
+class AsyncBaseAPI(BaseAPI):
+    """
+    Asyncio counterpart of BaseAPI.
+
+    Requests are made with the same headers, logging, masking and error handling
+    as BaseAPI, but `get` and `post` are coroutines. Setup (credentials, auth
+    token) is still synchronous and done when the object is created.
+
+    An object makes one request at a time, create one per document to make
+    requests concurrently:
+
+        apis = [AsyncEInvoiceAPI(doc) for doc in docs]
+        results = await asyncio.gather(
+            *(api.generate_irn(data) for api, data in zip(apis, payloads)),
+            return_exceptions=True,
+        )
+    """
+
+    async def get(self, *args, **kwargs):
+        return await self._make_request("GET", *args, **kwargs)
+
+    async def post(self, *args, **kwargs):
+        return await self._make_request("POST", *args, **kwargs)
+
+    async def _make_request(
+        self,
+        method,
+        endpoint="",
+        params=None,
+        headers=None,
+        json=None,
+    ):
+        request_args, log = self._prepare_request(
+            method, endpoint, params, headers, json
+        )
+
+        # unlike requests, aiohttp doesn't skip headers and params set to None
+        request_args.headers = _remove_none(request_args.headers)
+        if request_args.params:
+            request_args.params = _remove_none(request_args.params)
+
+        response_json = None
+
+        try:
+            response, content = await self._send_request(method.upper(), request_args)
+            if api_request_id := response.headers.get("x-amzn-RequestId"):
+                log.request_id = api_request_id
+
+            try:
+                response_json = loads(content, object_hook=frappe._dict)
+            except Exception:
+                pass
+
+            # Raise special error for certain HTTP codes
+            self.handle_http_code(response.status, response_json)
+
+            # Raise ClientResponseError for other HTTP codes
+            response.raise_for_status()
+
+            return self._process_response(response_json, content)
+
+        except Exception as e:
+            log.error = str(e)
+            raise e
+
+        finally:
+            self._log_request(log, response_json)
+
+    async def _send_request(self, method, request_args):
+        """
+        Send request within rate limits, retrying if GSP is busy or unavailable.
+        Returns the response and its body.
+        """
+
+        throttle = self.get_throttle()
+        session = await get_async_session()
+        attempt = 0
+
+        while True:
+            await asyncio.sleep(throttle.acquire())
+
+            try:
+                async with session.request(
+                    method, timeout=get_async_timeout(), **request_args
+                ) as response:
+                    content = await response.read()
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                throttle.record_response()
+
+                retryable = is_retryable_error(method, e)
+                if (delay := throttle.get_retry_delay(attempt, retryable)) is None:
+                    raise e
+
+            else:
+                throttle.record_response(response.status)
+                retry_after = get_retry_after(response.headers)
+                delay = throttle.get_retry_delay(
+                    attempt,
+                    is_retryable_status(method, response.status, retry_after),
+                    retry_after,
+                )
+
+                if delay is None:
+                    return response, content
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+class AsyncEInvoiceAPI(AsyncBaseAPI, EInvoiceAPI):
+    async def get_e_invoice_by_irn(self, irn):
+        return await self.get(endpoint="invoice/irn", params={"irn": irn})
+
+    async def generate_irn(self, data):
+        result = await self.post(endpoint="invoice", json=data)
+
+        # In case of Duplicate IRN, result is a list
+        if isinstance(result, list):
+            result = result[0]
+
+        self.update_distance(result)
+        return result
+
+    async def cancel_irn(self, data):
+        return await self.post(endpoint="invoice/cancel", json=data)
+
+    async def generate_e_waybill(self, data):
+        result = await self.post(endpoint="ewaybill", json=data)
+        self.update_distance(result)
+        return result
+
+    async def cancel_e_waybill(self, data):
+        return await self.post(endpoint="ewayapi", json=data)
+
+
+async def get_async_session():
+    """
+    Returns a keep-alive aiohttp session for the running event loop.
+
+    Tunable using site config:
+    - `gst_api_async_connection_limit`: maximum simultaneous connections
+      (default: 100)
+    """
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+
+    if not session or session.closed:
+        limit = (
+            cint(frappe.conf.gst_api_async_connection_limit) or DEFAULT_CONNECTION_LIMIT
+        )
+        session = _sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit),
+            # same connection is used for different GSTINs, don't carry cookies
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    return session
+
+
+async def close_async_session():
+    """Close pooled connections of the running event loop"""
+
+    if session := _sessions.pop(asyncio.get_running_loop(), None):
+        await session.close()
+
+
+def get_async_timeout():
+    connect_timeout, read_timeout = get_timeout()
+    return aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+
+
+def _remove_none(values):
+    return {key: value for key, value in values.items() if value is not None}
@@ -0,0 +1,138 @@
+import time
+
+from redis.exceptions import LockError
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from frappe.utils.password import get_decrypted_password
+
+from finbyz_einvoice.gst_india.api_classes.base import BASE_URL
+from finbyz_einvoice.gst_india.api_classes.session import get_session, get_timeout
+
+CACHE_KEY = "gsp_auth_token"
+LOCK_KEY = "gsp_auth_token_lock"
+
+# token is refreshed by a single worker when it is about to expire
+REFRESH_BEFORE = 600
+# after this, callers wait for a fresh token instead of using the current one
+MIN_VALIDITY = 150
+# seconds, added to the request timeout for the lock to outlast a slow fetch
+LOCK_TIMEOUT_MARGIN = 30
+
+
+def get_auth_token():
+    """
+    Returns the GSP auth token shared by all workers of the site.
+
+    - Token is kept in Redis, GST Settings is not saved on refresh.
+    - Only one worker authenticates with the GSP at a time (single-flight).
+    - Token is refreshed proactively before it expires, while other workers
+      continue to use the current token.
+    """
+
+    token = frappe.cache().get_value(CACHE_KEY)
+    validity = _get_validity(token)
+
+    if validity > REFRESH_BEFORE:
+        return token["token"]
+
+    if validity > MIN_VALIDITY:
+        # refresh in the background of this request if no one else is doing it
+        lock = _get_lock()
+        if not lock.acquire(blocking=False):
+            return token["token"]
+
+        try:
+            return _refresh_if_required(REFRESH_BEFORE)
+        finally:
+            _release(lock)
+
+    lock = _get_lock()
+    if not lock.acquire(blocking=True, blocking_timeout=_get_lock_timeout()):
+        frappe.throw(
+            _("Timed out waiting for GSP authentication. Please try again."),
+            title=_("GSP Connection Error"),
+        )
+
+    try:
+        return _refresh_if_required(MIN_VALIDITY)
+    finally:
+        _release(lock)
+
+
+def clear_auth_token():
+    frappe.cache().delete_value(CACHE_KEY)
+
+
+def _refresh_if_required(min_validity):
+    # token may have been refreshed by another worker while waiting for the lock
+    token = frappe.cache().get_value(CACHE_KEY)
+    if _get_validity(token) > min_validity:
+        return token["token"]
+
+    return _fetch_auth_token()
+
+
+def _fetch_auth_token():
+    client_id, client_secret = get_client_details()
+    response = get_session(BASE_URL).post(
+        f"{BASE_URL}/gsp/authenticate",
+        params={"grant_type": "token"},
+        headers={"gspappid": client_id, "gspappsecret": client_secret},
+        timeout=get_timeout(),
+    )
+    response.raise_for_status()
+    res = response.json()
+
+    if not res.get("access_token"):
+        frappe.throw(
+            _("Error establishing connection to GSP. Please check your credentials."),
+            title=_("GSP Connection Error"),
+        )
+
+    expires_in = cint(res.get("expires_in"))
+    token = {
+        "token": "{} {}".format(res.get("token_type"), res.get("access_token")),
+        "expires_at": time.time() + expires_in,
+    }
+
+    frappe.cache().set_value(CACHE_KEY, token, expires_in_sec=expires_in)
+    return token["token"]
+
+
+def get_client_details():
+    settings = frappe.get_cached_doc("GST Settings")
+    if settings.get("client_id") and settings.get("client_secret"):
+        return (
+            get_decrypted_password("GST Settings", "GST Settings", "client_id"),
+            get_decrypted_password("GST Settings", "GST Settings", "client_secret"),
+        )
+
+    return frappe.conf.einvoice_client_id, frappe.conf.einvoice_client_secret
+
+
+def _get_validity(token):
+    if not token:
+        return 0
+
+    return token["expires_at"] - time.time()
+
+
+def _get_lock_timeout():
+    """Lock is held while fetching the token, for up to connect + read timeout"""
+
+    return sum(get_timeout()) + LOCK_TIMEOUT_MARGIN
+
+
+def _get_lock():
+    cache = frappe.cache()
+    return cache.lock(cache.make_key(LOCK_KEY), timeout=_get_lock_timeout())
+
+
+def _release(lock):
+    try:
+        lock.release()
+    except LockError:
+        # lock expired while authenticating
+        pass
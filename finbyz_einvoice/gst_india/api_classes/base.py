@@ -1,3 +1,4 @@
+import time
 from urllib.parse import urljoin
 
 import requests
@@ -6,8 +7,20 @@ import frappe
 from frappe import _
 from frappe.utils import sbool
 
+from finbyz_einvoice.gst_india.api_classes.credentials import (
+    get_api_secret,
+    get_credential,
+)
+from finbyz_einvoice.gst_india.api_classes.session import get_session, get_timeout
+from finbyz_einvoice.gst_india.api_classes.throttle import (
+    RequestThrottle,
+    get_retry_after,
+    is_retryable_error,
+    is_retryable_status,
+)
 from finbyz_einvoice.gst_india.utils import is_api_enabled
 from finbyz_einvoice.gst_india.utils.api import enqueue_integration_request
+from finbyz_einvoice.gst_india.utils.payload import dumps
 
 BASE_URL = "https://gsp.adaequare.com"
 
@@ -27,12 +40,8 @@ class BaseAPI:
             )
 
         self.sandbox_mode = self.settings.sandbox_mode
-        self.default_headers = {
-            "x-api-key": (
-                (self.settings.api_secret and self.settings.get_password("api_secret"))
-                or frappe.conf.ic_api_secret
-            )
-        }
+        self.session = get_session(BASE_URL)
+        self.default_headers = {"x-api-key": get_api_secret(self.settings)}
         self.default_log_values = {}
 
         self.setup(*args, **kwargs)
@@ -42,10 +51,11 @@ class BaseAPI:
         pass
 
     def fetch_credentials(self, gstin, service, require_password=True):
-        for row in self.settings.credentials:
-            if row.gstin == gstin and row.service == service:
-                break
-        else:
+        credential = get_credential(
+            self.settings, gstin, service, require_password=require_password
+        )
+
+        if not credential:
             frappe.throw(
                 _(
                     "Please set the relevant credentials in GST Settings to use the"
@@ -55,9 +65,9 @@ class BaseAPI:
                 title=_("Credentials Unavailable"),
             )
 
-        self.username = row.username
-        self.company = row.company
-        self.password = row.get_password(raise_exception=require_password)
+        self.username = credential.username
+        self.company = credential.company
+        self.password = credential.password
 
     def get_url(self, *parts):
         if parts and not list(parts)[-1]:
@@ -88,6 +98,78 @@ class BaseAPI:
         headers=None,
         json=None,
     ):
+        request_args, log = self._prepare_request(
+            method, endpoint, params, headers, json
+        )
+        response_json = None
+
+        try:
+            response = self._send_request(method.upper(), request_args)
+            if api_request_id := response.headers.get("x-amzn-RequestId"):
+                log.request_id = api_request_id
+
+            try:
+                response_json = response.json(object_hook=frappe._dict)
+            except Exception:
+                pass
+
+            # Raise special error for certain HTTP codes
+            self.handle_http_code(response.status_code, response_json)
+
+            # Raise HTTPError for other HTTP codes
+            response.raise_for_status()
+
+            return self._process_response(response_json, response.content)
+
+        except Exception as e:
+            log.error = str(e)
+            raise e
+
+        finally:
+            self._log_request(log, response_json)
+
+    def _send_request(self, method, request_args):
+        """Send request within rate limits, retrying if GSP is busy or unavailable"""
+
+        throttle = self.get_throttle()
+        attempt = 0
+
+        while True:
+            time.sleep(throttle.acquire())
+
+            try:
+                response = self.session.request(
+                    method, timeout=get_timeout(), **request_args
+                )
+
+            except requests.RequestException as e:
+                throttle.record_response()
+
+                retryable = is_retryable_error(method, e)
+                if (delay := throttle.get_retry_delay(attempt, retryable)) is None:
+                    raise e
+
+            else:
+                throttle.record_response(response.status_code)
+                retry_after = get_retry_after(response.headers)
+                delay = throttle.get_retry_delay(
+                    attempt,
+                    is_retryable_status(method, response.status_code, retry_after),
+                    retry_after,
+                )
+
+                if delay is None:
+                    return response
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get_throttle(self):
+        return RequestThrottle(self.API_NAME, self.default_headers.get("gstin"))
+
+    def _prepare_request(self, method, endpoint, params, headers, json):
+        """Returns request arguments and Integration Request log values"""
+
         method = method.upper()
         if method not in ("GET", "POST"):
             frappe.throw(_("Invalid method {0}").format(method))
@@ -118,7 +200,9 @@ class BaseAPI:
         )
 
         if method == "POST" and json:
-            request_args.json = json
+            # serialized here, as `requests` uses the slower stdlib encoder
+            request_args.data = dumps(json)
+            request_args.headers["Content-Type"] = "application/json"
 
             if not request_args.params:
                 log.data = json
@@ -128,59 +212,42 @@ class BaseAPI:
                     "body": json,
                 }
 
-        response_json = None
-
-        try:
-            response = requests.request(method, **request_args)
-            if api_request_id := response.headers.get("x-amzn-RequestId"):
-                log.request_id = api_request_id
-
-            try:
-                response_json = response.json(object_hook=frappe._dict)
-            except Exception:
-                pass
+        return request_args, log
 
-            # Raise special error for certain HTTP codes
-            self.handle_http_code(response.status_code, response_json)
+    def _process_response(self, response_json, content):
+        """Validates a response with a successful HTTP code and returns its result"""
 
-            # Raise HTTPError for other HTTP codes
-            response.raise_for_status()
+        # Expect all successful responses to be JSON
+        if not response_json:
+            frappe.throw(_("Error parsing response: {0}").format(content))
+        else:
+            self.response = response_json
 
-            # Expect all successful responses to be JSON
-            if not response_json:
-                frappe.throw(_("Error parsing response: {0}").format(response.content))
-            else:
-                self.response = response_json
-
-            # All error responses have a success key set to false
-            success_value = response_json.get("success", True)
-            if isinstance(success_value, str):
-                success_value = sbool(success_value)
-
-            if not success_value and not self.handle_failed_response(response_json):
-                frappe.throw(
-                    response_json.get("message")
-                    # Fallback to response body if message is not present
-                    or frappe.as_json(response_json, indent=4),
-                    title=_("API Request Failed"),
-                )
+        # All error responses have a success key set to false
+        success_value = response_json.get("success", True)
+        if isinstance(success_value, str):
+            success_value = sbool(success_value)
 
-            return response_json.get("result", response_json)
+        if not success_value and not self.handle_failed_response(response_json):
+            frappe.throw(
+                response_json.get("message")
+                # Fallback to response body if message is not present
+                or frappe.as_json(response_json, indent=4),
+                title=_("API Request Failed"),
+            )
 
-        except Exception as e:
-            log.error = str(e)
-            raise e
+        return response_json.get("result", response_json)
 
-        finally:
-            log.output = response_json
-            enqueue_integration_request(**log)
+    def _log_request(self, log, response_json):
+        log.output = response_json
+        enqueue_integration_request(**log)
 
-            if self.sandbox_mode and not frappe.flags.ic_sandbox_message_shown:
-                frappe.msgprint(
-                    _("GST API request was made in Sandbox Mode"),
-                    alert=True,
-                )
-                frappe.flags.ic_sandbox_message_shown = True
+        if self.sandbox_mode and not frappe.flags.ic_sandbox_message_shown:
+            frappe.msgprint(
+                _("GST API request was made in Sandbox Mode"),
+                alert=True,
+            )
+            frappe.flags.ic_sandbox_message_shown = True
 
     def handle_failed_response(self, response_json):
         # Override in subclass, return truthy value to stop frappe.throw
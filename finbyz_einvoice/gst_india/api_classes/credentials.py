@@ -0,0 +1,87 @@
+import threading
+import time
+
+import frappe
+from frappe.utils import cint
+from frappe.utils.password import get_decrypted_password
+
+DEFAULT_TTL = 300  # seconds
+
+# {site: index}, shared by all API objects in this worker process
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_credential(settings, gstin, service, require_password=True):
+    """
+    Returns username, company and decrypted password for the given GSTIN and service,
+    or None if credentials are not set.
+
+    Credentials are indexed by (gstin, service) and passwords are decrypted once,
+    instead of on every API object construction. The index is rebuilt when
+    GST Settings is saved, or after `gst_api_credentials_ttl` seconds (default: 300).
+    """
+
+    index = _get_index(settings)
+    if not (credential := index.credentials.get((gstin, service))):
+        return
+
+    if "password" not in credential:
+        with _lock:
+            if "password" not in credential:
+                credential.password = get_decrypted_password(
+                    "GST Credential",
+                    credential.row_name,
+                    "password",
+                    raise_exception=False,
+                )
+
+    if require_password and not credential.password:
+        # raise the same error as before
+        get_decrypted_password("GST Credential", credential.row_name, "password")
+
+    return credential
+
+
+def get_api_secret(settings):
+    index = _get_index(settings)
+
+    if "api_secret" not in index:
+        with _lock:
+            if "api_secret" not in index:
+                index.api_secret = (
+                    settings.api_secret
+                    and get_decrypted_password(
+                        "GST Settings", "GST Settings", "api_secret"
+                    )
+                ) or frappe.conf.ic_api_secret
+
+    return index.api_secret
+
+
+def clear_credentials_cache():
+    with _lock:
+        _indexes.pop(frappe.local.site, None)
+
+
+def _get_index(settings):
+    index = _indexes.get(frappe.local.site)
+    if index and index.modified == settings.modified and index.expires_at > time.time():
+        return index
+
+    with _lock:
+        index = _indexes[frappe.local.site] = frappe._dict(
+            modified=settings.modified,
+            expires_at=time.time()
+            + (cint(frappe.conf.gst_api_credentials_ttl) or DEFAULT_TTL),
+            credentials={
+                (row.gstin, row.service): frappe._dict(
+                    username=row.username,
+                    company=row.company,
+                    row_name=row.name,
+                )
+                for row in reversed(settings.credentials)
+            },
+        )
+
+    return index
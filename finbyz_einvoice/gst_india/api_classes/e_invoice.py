@@ -4,9 +4,9 @@ import frappe
 from frappe import _
 import base64
 import os
+from finbyz_einvoice.gst_india.api_classes.auth import get_auth_token
 from finbyz_einvoice.gst_india.api_classes.base import BaseAPI
 from finbyz_einvoice.gst_india.constants import DISTANCE_REGEX
-from finbyz_einvoice.gst_india.api_classes.public import get_auth_token
 
 class EInvoiceAPI(BaseAPI):
     API_NAME = "e-Invoice"
@@ -27,7 +27,6 @@ class EInvoiceAPI(BaseAPI):
         self.BASE_PATH = "enriched/ei/api"
         if not self.settings.enable_e_invoice:
             frappe.throw(_("Please enable e-Waybill features in GST Settings first"))
-        self.gst_settings = frappe.get_cached_doc("GST Settings")
         if doc:
             company_gstin = doc.company_gstin
             self.default_log_values.update(
@@ -48,7 +47,7 @@ class EInvoiceAPI(BaseAPI):
 
         self.default_headers.update(
             {
-                "authorization": get_auth_token(self),
+                "authorization": get_auth_token(),
                 "gstin": company_gstin,
                 "user_name": self.username,
                 "password": self.password,
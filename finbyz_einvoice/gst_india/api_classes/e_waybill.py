@@ -2,16 +2,12 @@ import re
 
 import frappe
 from frappe import _
-from frappe.utils.data import time_diff_in_seconds
 import base64
 import os
-from frappe.utils import now_datetime
 
+from finbyz_einvoice.gst_india.api_classes.auth import get_auth_token
 from finbyz_einvoice.gst_india.api_classes.base import BaseAPI
 from finbyz_einvoice.gst_india.constants import DISTANCE_REGEX
-from frappe.integrations.utils import make_request
-from frappe.utils.password import get_decrypted_password
-from frappe.utils.data import add_to_date
 
 
 class EWaybillAPI(BaseAPI):
@@ -24,7 +20,6 @@ class EWaybillAPI(BaseAPI):
     }
 
     def setup(self, doc=None, *, company_gstin=None):
-        self.gst_settings = frappe.get_cached_doc("GST Settings")
         self.BASE_PATH = "enriched/ewb/ewayapi"
         if not self.settings.enable_e_waybill:
             frappe.throw(_("Please enable e-Waybill features in GST Settings first"))
@@ -49,7 +44,7 @@ class EWaybillAPI(BaseAPI):
 
         self.default_headers.update(
             {
-                "authorization": get_auth_token(self),
+                "authorization": get_auth_token(),
                 "gstin": company_gstin,
                 "username": self.username,
                 "password": self.password,
@@ -96,30 +91,3 @@ class EWaybillAPI(BaseAPI):
             if error_message in message:
                 response_json.error_code = error_code
                 return True
-
-def get_auth_token(self):
-    if time_diff_in_seconds(self.gst_settings.token_expiry, now_datetime()) < 150.0 or not self.gst_settings.auth_token:
-        fetch_auth_token(self)
-
-    return self.gst_settings.auth_token
-
-def fetch_auth_token(self):
-    client_id, client_secret = get_client_details(self)
-    headers = {"gspappid": client_id, "gspappsecret": client_secret}
-    res = {}
-    url = "https://gsp.adaequare.com/gsp/authenticate?grant_type=token"\
-
-    res = make_request("post", url, headers = headers)
-    self.gst_settings.auth_token = "{} {}".format(
-        res.get("token_type"), res.get("access_token")
-    )
-
-    self.gst_settings.token_expiry = add_to_date(None, seconds=res.get("expires_in"))
-    self.gst_settings.save(ignore_permissions=True)
-    self.gst_settings.reload()
-
-def get_client_details(self):
-	if self.gst_settings.get('client_id') and self.gst_settings.get('client_secret'):
-		return self.gst_settings.get('client_id'), get_decrypted_password("GST Settings", "GST Settings", fieldname = "client_secret")
-
-	return frappe.conf.einvoice_client_id, frappe.conf.einvoice_client_secret
@@ -0,0 +1,77 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import frappe
+from frappe.utils import cint, flt
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+
+# one session per base URL, shared by all API objects in this worker process
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(base_url):
+    """
+    Returns a keep-alive session for the given base URL.
+
+    Connections are pooled per worker process, so that the TCP + TLS handshake
+    is made once per connection instead of once per API call.
+
+    Tunable using site config:
+    - `gst_api_pool_size`: maximum connections kept alive per host (default: 10)
+    """
+
+    if session := _sessions.get(base_url):
+        return session
+
+    with _lock:
+        if not (session := _sessions.get(base_url)):
+            session = _sessions[base_url] = _create_session()
+
+    return session
+
+
+def _create_session():
+    pool_size = cint(frappe.conf.gst_api_pool_size) or DEFAULT_POOL_SIZE
+
+    session = requests.Session()
+
+    # same connection is used for different GSTINs, don't carry cookies across calls
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_timeout():
+    """
+    Returns (connect timeout, read timeout) in seconds.
+
+    Tunable using site config:
+    - `gst_api_connect_timeout` (default: 10)
+    - `gst_api_read_timeout` (default: 120)
+    """
+
+    return (
+        flt(frappe.conf.gst_api_connect_timeout) or DEFAULT_CONNECT_TIMEOUT,
+        flt(frappe.conf.gst_api_read_timeout) or DEFAULT_READ_TIMEOUT,
+    )
+
+
+def close_sessions():
+    """Close all pooled connections of this worker process"""
+
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+
+        _sessions.clear()
@@ -0,0 +1,348 @@
+import asyncio
+import math
+import random
+import time
+
+import aiohttp
+import requests
+from urllib3.exceptions import NewConnectionError
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from finbyz_einvoice.gst_india.api_classes.session import get_timeout
+
+KEY_PREFIX = "gsp_throttle"
+
+# Rate limiting
+DEFAULT_RATE_LIMIT = 10  # requests per second per API per GSTIN
+MAX_RETRY_AFTER = 60  # seconds, longer waits are not retried
+
+# Retries
+DEFAULT_MAX_RETRIES = 3
+RETRY_BACKOFF = 1  # seconds, doubled on every attempt
+MAX_RETRY_BACKOFF = 30
+
+# Circuit breaker
+DEFAULT_FAILURE_THRESHOLD = 5  # consecutive failures
+DEFAULT_COOLDOWN = 60  # seconds
+DEFAULT_MAX_PAUSE = 180  # seconds, for jobs waiting for the circuit to close
+FAILURE_WINDOW = 60  # seconds
+
+CIRCUIT_CLOSED = "Closed"
+CIRCUIT_OPEN = "Open"
+CIRCUIT_HALF_OPEN = "Half Open"
+
+# reserves a token and returns seconds to wait before using it
+# KEYS: bucket, paused until
+# ARGV: rate, burst
+ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate) - 1
+
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+
+local paused_until = tonumber(redis.call("GET", KEYS[2]) or 0)
+if paused_until - now > wait then
+    wait = paused_until - now
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 60)
+
+return tostring(wait)
+"""
+
+# KEYS: paused until
+# ARGV: seconds
+PAUSE_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local paused_until = now + tonumber(ARGV[1])
+
+if paused_until > tonumber(redis.call("GET", KEYS[1]) or 0) then
+    redis.call("SET", KEYS[1], paused_until, "EX", math.ceil(tonumber(ARGV[1])) + 1)
+end
+"""
+
+
+class GSPUnavailableError(frappe.ValidationError):
+    pass
+
+
+class RequestThrottle:
+    """
+    Rate limiting, retries and circuit breaking of GSP calls.
+
+    State is kept in Redis and shared by all workers of the site:
+    - Token bucket per API and GSTIN, paused for all workers when the GSP
+      responds with 429 and a `Retry-After` header.
+    - Circuit breaker per API, opened after consecutive connection errors or
+      5xx responses. While open, requests fail immediately. After the cooldown,
+      one request is let through to test whether the GSP has recovered.
+
+    Tunable using site config:
+    - `gst_api_rate_limit`: requests per second per API per GSTIN (default: 10)
+    - `gst_api_max_retries`: retries for rate limited or unavailable GSP (default: 3)
+    - `gst_api_circuit_threshold`: consecutive failures to open circuit (default: 5)
+    - `gst_api_circuit_cooldown`: seconds for which circuit stays open (default: 60)
+    """
+
+    def __init__(self, api_name, gstin=None):
+        self.api_name = api_name
+        self.cache = frappe.cache()
+        self.bucket_key = self.make_key("bucket", gstin or "all")
+        self.paused_key = self.make_key("paused", gstin or "all")
+
+    def make_key(self, *parts):
+        return self.cache.make_key(":".join((KEY_PREFIX, self.api_name, *parts)))
+
+    def acquire(self):
+        """Returns seconds to wait before making the request"""
+
+        self.check_circuit()
+
+        rate = flt(frappe.conf.gst_api_rate_limit) or DEFAULT_RATE_LIMIT
+        wait = self.run_script(
+            ACQUIRE_SCRIPT, (self.bucket_key, self.paused_key), (rate, rate)
+        )
+
+        return flt(wait)
+
+    def get_retry_delay(self, attempt, retryable, retry_after=None):
+        """Returns seconds to wait before retrying, None if request can't be retried"""
+
+        max_retries = cint(frappe.conf.get("gst_api_max_retries", DEFAULT_MAX_RETRIES))
+
+        if not retryable or attempt >= max_retries:
+            return
+
+        delay = min(MAX_RETRY_BACKOFF, RETRY_BACKOFF * 2**attempt)
+        delay *= random.uniform(0.5, 1)
+
+        if retry_after:
+            if retry_after > MAX_RETRY_AFTER:
+                return
+
+            # other workers wait too, instead of hitting the limit again
+            self.run_script(PAUSE_SCRIPT, (self.paused_key,), (retry_after,))
+            delay = max(delay, retry_after)
+
+        return delay
+
+    def record_response(self, status_code=None):
+        """Record outcome of a request, `status_code` is None for connection errors"""
+
+        if status_code is None or status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def check_circuit(self):
+        state = get_circuit_state(self.api_name)
+
+        if state.state == CIRCUIT_CLOSED:
+            return
+
+        # let one request through to check if GSP has recovered
+        if state.state == CIRCUIT_HALF_OPEN and self.cache.set(
+            self.make_key("trial"), 1, nx=True, ex=get_circuit_config()[1]
+        ):
+            return
+
+        frappe.throw(
+            _(
+                "{0} API is temporarily unavailable due to repeated failures."
+                " Please try again after some time."
+            ).format(self.api_name),
+            GSPUnavailableError,
+            title=_("GSP Unavailable"),
+        )
+
+    def record_failure(self):
+        threshold, cooldown = get_circuit_config()
+        failures_key = self.make_key("failures")
+
+        pipeline = self.cache.pipeline()
+        pipeline.incr(failures_key)
+        pipeline.expire(failures_key, cooldown + FAILURE_WINDOW)
+        failures = pipeline.execute()[0]
+
+        if failures >= threshold:
+            pipeline = self.cache.pipeline()
+            pipeline.set(self.make_key("open"), time.time(), ex=cooldown)
+            pipeline.delete(self.make_key("trial"))
+            pipeline.execute()
+
+    def record_success(self):
+        self.cache.delete(self.make_key("failures"), self.make_key("trial"))
+
+    def run_script(self, script, keys, args):
+        return self.cache.register_script(script)(keys=keys, args=args)
+
+
+def get_circuit_state(api_name):
+    cache = frappe.cache()
+
+    def make_key(part):
+        return cache.make_key(f"{KEY_PREFIX}:{api_name}:{part}")
+
+    pipeline = cache.pipeline()
+    pipeline.get(make_key("open"))
+    pipeline.get(make_key("failures"))
+    opened_at, failures = pipeline.execute()
+
+    threshold, cooldown = get_circuit_config()
+    failures = cint(failures)
+
+    if opened_at:
+        state = CIRCUIT_OPEN
+    elif failures >= threshold:
+        state = CIRCUIT_HALF_OPEN
+    else:
+        state = CIRCUIT_CLOSED
+
+    return frappe._dict(
+        api_name=api_name,
+        state=state,
+        failures=failures,
+        retry_after=max(0, flt(opened_at) + cooldown - time.time()) if opened_at else 0,
+    )
+
+
+def get_circuit_config():
+    return (
+        cint(frappe.conf.gst_api_circuit_threshold) or DEFAULT_FAILURE_THRESHOLD,
+        cint(frappe.conf.gst_api_circuit_cooldown) or DEFAULT_COOLDOWN,
+    )
+
+
+def is_retryable_status(method, status_code, retry_after=None):
+    # 429 without Retry-After means API credits are exhausted
+    if status_code == 429:
+        return bool(retry_after)
+
+    if status_code == 503:
+        return True
+
+    # request may have been processed by the GSP, only safe to retry for GET
+    return method == "GET" and status_code in (502, 504)
+
+
+def is_retryable_error(method, error):
+    """
+    Whether a request that failed without a response can be retried.
+    Used for errors raised by both `requests` and `aiohttp`.
+    """
+
+    # request wasn't sent
+    if is_connection_failure(error):
+        return True
+
+    # request may have reached the GSP, only safe to retry for GET
+    return method == "GET" and isinstance(
+        error,
+        (
+            requests.ConnectionError,
+            requests.Timeout,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+        ),
+    )
+
+
+def is_connection_failure(error):
+    """Whether connection to the GSP couldn't be established"""
+
+    if isinstance(error, (requests.ConnectTimeout, aiohttp.ClientConnectorError)):
+        return True
+
+    # connection refused or host not found
+    if isinstance(error, requests.ConnectionError):
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    # raised for both connect and read timeouts
+    return isinstance(error, aiohttp.ServerTimeoutError) and str(error).startswith(
+        "Connection timeout"
+    )
+
+
+def get_retry_after(headers):
+    # seconds, HTTP date is not used by the GSP
+    return flt(headers.get("retry-after"))
+
+
+def wait_while_unavailable(api_name, max_pause=None):
+    """
+    Pause while the circuit of the given API is open, up to `max_pause` seconds
+    (default: `gst_api_circuit_max_pause` from site config or 180).
+    """
+
+    if max_pause is None:
+        max_pause = cint(frappe.conf.gst_api_circuit_max_pause) or DEFAULT_MAX_PAUSE
+
+    deadline = time.monotonic() + max_pause
+
+    while (state := get_circuit_state(api_name)).state == CIRCUIT_OPEN:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+
+        time.sleep(min(state.retry_after or 1, remaining, 5))
+
+
+def get_job_timeout(requests=1):
+    """
+    Returns timeout in seconds for a background job run with `run_when_available`
+    that makes `requests` calls to the GSP, including pauses, retries and backoff.
+    """
+
+    max_pause = cint(frappe.conf.gst_api_circuit_max_pause) or DEFAULT_MAX_PAUSE
+    max_retries = cint(frappe.conf.get("gst_api_max_retries", DEFAULT_MAX_RETRIES))
+    attempt_timeout = sum(get_timeout())
+
+    return math.ceil(
+        max_pause
+        + requests
+        * ((max_retries + 1) * attempt_timeout + max_retries * MAX_RETRY_BACKOFF)
+    )
+
+
+def run_when_available(api_name, target, *args, **kwargs):
+    """
+    Call `target` (function or dotted path), pausing while the GSP is unavailable
+    instead of failing. Used for background jobs that call the given API.
+    """
+
+    if isinstance(target, str):
+        target = frappe.get_attr(target)
+
+    deadline = time.monotonic() + (
+        cint(frappe.conf.gst_api_circuit_max_pause) or DEFAULT_MAX_PAUSE
+    )
+
+    while True:
+        wait_while_unavailable(api_name, max(0, deadline - time.monotonic()))
+
+        try:
+            return target(*args, **kwargs)
+
+        except GSPUnavailableError:
+            if time.monotonic() >= deadline:
+                raise
+
+            # circuit is half open and another worker is checking the GSP
+            frappe.clear_last_message()
+            time.sleep(1)
@@ -0,0 +1,93 @@
+"""
+Time taken to apportion charges (e.g. freight) to taxable values of items, with NumPy
+vs item by item, by number of lines.
+
+Uses a Sales Invoice with random item amounts and a freight row, not saved to the
+database.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.apportionment.run \
+        --kwargs "{'lines': (100, 1000, 3000)}"
+"""
+
+import random
+import time
+from unittest.mock import patch
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.overrides import transaction
+from finbyz_einvoice.gst_india.overrides.transaction import update_taxable_values
+
+
+def run(lines=(10, 100, 1000, 3000), repeat=10):
+    if transaction.np is None:
+        frappe.throw("NumPy is not installed")
+
+    results = []
+
+    for line_count in lines:
+        item_by_item = _time_run(line_count, line_count + 1, repeat)
+        vectorized = _time_run(line_count, 0, repeat)
+
+        if item_by_item.taxable_values != vectorized.taxable_values:
+            frappe.throw(f"Taxable values of {line_count} lines don't match")
+
+        results.append(
+            {
+                "lines": line_count,
+                "item_by_item_ms": item_by_item.time,
+                "vectorized_ms": vectorized.time,
+                "speedup": round(item_by_item.time / vectorized.time, 2),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def get_transaction(line_count):
+    rng = random.Random(line_count)
+    items = [
+        {"base_net_amount": round(rng.uniform(1, 10000), 2), "qty": 1}
+        for _ in range(line_count)
+    ]
+    base_net_total = sum(item["base_net_amount"] for item in items)
+
+    return frappe.get_doc(
+        {
+            "doctype": "Sales Invoice",
+            "items": items,
+            "base_net_total": base_net_total,
+            "taxes": [
+                {
+                    "account_head": "_Test Freight",
+                    "tax_amount": 1234.56,
+                    "base_total": base_net_total + 1234.56,
+                }
+            ],
+        }
+    )
+
+
+def _time_run(line_count, threshold, repeat):
+    total = 0
+
+    with patch.object(transaction, "VECTORIZED_APPORTIONMENT_THRESHOLD", threshold):
+        for _ in range(repeat):
+            # new document, as precision is cached for each item
+            doc = get_transaction(line_count)
+
+            start = time.perf_counter()
+            update_taxable_values(doc, ())
+            total += time.perf_counter() - start
+
+    return frappe._dict(
+        taxable_values=[item.taxable_value for item in doc.items],
+        time=round(total * 1000 / repeat, 3),
+    )
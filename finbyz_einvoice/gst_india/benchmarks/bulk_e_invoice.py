@@ -0,0 +1,70 @@
+"""
+Throughput of bulk e-Invoice generation against a stand-in GSP, serial vs concurrent.
+
+Each invoice makes one API call to the stand-in GSP, which responds after `latency`
+seconds. Nothing is saved to the database.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.bulk_e_invoice.run \
+        --kwargs "{'invoices': 200, 'gstins': 2, 'latency': 0.2}"
+"""
+
+import time
+
+from finbyz_einvoice.gst_india.api_classes.session import _create_session, get_timeout
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.benchmarks.server import StandInServer
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently
+from finbyz_einvoice.gst_india.utils.e_invoice import get_bulk_generation_limits
+
+
+def run(invoices=200, gstins=2, latency=0.2):
+    max_workers, max_per_gstin = get_bulk_generation_limits()
+    items = [f"BENCH-INV-{i:05d}" for i in range(invoices)]
+
+    def get_gstin(item):
+        return int(item.rsplit("-", 1)[1]) % gstins
+
+    with StandInServer(latency=latency) as server:
+        url = f"{server.url}/enriched/ei/api/invoice"
+        session = _create_session()
+
+        def generate(item):
+            session.post(url, json={"invoice": item}, timeout=get_timeout())
+
+        serial = _time_run(generate, items, get_gstin, 1, 1)
+        concurrent = _time_run(generate, items, get_gstin, max_workers, max_per_gstin)
+
+        session.close()
+
+    result = {
+        "invoices": invoices,
+        "gstins": gstins,
+        "latency_ms": latency * 1000,
+        "max_workers": max_workers,
+        "max_per_gstin": max_per_gstin,
+        "serial_invoices_per_sec": round(invoices / serial, 2),
+        "concurrent_invoices_per_sec": round(invoices / concurrent, 2),
+        "speedup": round(serial / concurrent, 2),
+    }
+
+    print_result(result)
+    return result
+
+
+def _time_run(method, items, get_group, max_workers, max_per_group):
+    start = time.perf_counter()
+    results = run_concurrently(
+        method,
+        items,
+        get_group=get_group,
+        max_workers=max_workers,
+        max_per_group=max_per_group,
+    )
+    elapsed = time.perf_counter() - start
+
+    if errors := [error for error in results.values() if error]:
+        raise errors[0]
+
+    return elapsed
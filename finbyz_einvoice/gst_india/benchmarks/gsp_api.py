@@ -0,0 +1,209 @@
+"""
+Latency and throughput of the GST API layer against a local mock GSP.
+
+Measures single (sequential) e-Invoice generation, and bulk generation using the
+thread pool of bulk e-Invoice generation and the asyncio client.
+
+Requires API to be enabled in GST Settings, in sandbox mode or with credentials
+for `gstin`. Use a development site: calls are logged as Integration Requests.
+Auth token and rate limiter / circuit breaker state of the site are not touched,
+the benchmark uses its own cache keys.
+
+Usage:
+    bench --site {site} execute finbyz_einvoice.gst_india.benchmarks.gsp_api.run \
+        --kwargs "{'calls': 100, 'bulk': 500, 'latency': 0.05, 'error_rate': 0.01}"
+"""
+
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+
+import frappe
+
+from finbyz_einvoice.gst_india.api_classes import auth, base, throttle
+from finbyz_einvoice.gst_india.api_classes.async_api import (
+    AsyncEInvoiceAPI,
+    close_async_session,
+)
+from finbyz_einvoice.gst_india.api_classes.e_invoice import EInvoiceAPI
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.benchmarks.mock_gsp import MockGSP, load_test_data
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently
+from finbyz_einvoice.gst_india.utils.e_invoice import get_bulk_generation_limits
+
+
+def run(
+    calls=100,
+    bulk=500,
+    latency=0.05,
+    jitter=0,
+    error_rate=0,
+    gstin="05AAACG2115R1ZN",
+    async_concurrency=50,
+    rate_limit=1000,
+):
+    """
+    :param calls: e-Invoices generated one after another
+    :param bulk: e-Invoices generated in bulk, by each bulk mode
+    :param latency: seconds taken by the mock GSP to respond
+    :param jitter: random seconds added to latency
+    :param error_rate: fraction of requests that fail with 503
+    :param async_concurrency: requests in flight for the asyncio client
+    :param rate_limit: requests per second per GSTIN, high enough not to throttle
+        unless `gst_api_rate_limit` is set in site config
+    """
+
+    data = load_test_data("test_e_invoice.json").goods_item_with_ewaybill.request_data
+
+    def generate_irn():
+        EInvoiceAPI(company_gstin=gstin).generate_irn(data)
+
+    async def generate_irn_async():
+        await AsyncEInvoiceAPI(company_gstin=gstin).generate_irn(data)
+
+    with MockGSP(latency, jitter, error_rate, seed=0) as server, use_mock_gsp(
+        server.url, rate_limit
+    ):
+        results = [
+            _run_single(generate_irn, calls),
+            _run_bulk(generate_irn, bulk),
+            _run_async(generate_irn_async, bulk, async_concurrency),
+        ]
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+@contextmanager
+def use_mock_gsp(url, rate_limit):
+    """
+    Point API classes to the mock GSP, restoring everything on exit.
+
+    Auth token and throttle state are kept in separate cache keys while the mock
+    is active, so that the site's own state is neither used nor cleared.
+    """
+
+    original_url = base.BASE_URL
+    original_rate_limit = frappe.conf.gst_api_rate_limit
+    original_default_rate_limit = throttle.DEFAULT_RATE_LIMIT
+    original_keys = (auth.CACHE_KEY, auth.LOCK_KEY, throttle.KEY_PREFIX)
+
+    base.BASE_URL = auth.BASE_URL = url
+    # worker threads of bulk generation read site config again, use the default
+    frappe.conf.gst_api_rate_limit = throttle.DEFAULT_RATE_LIMIT = rate_limit
+    auth.CACHE_KEY, auth.LOCK_KEY, throttle.KEY_PREFIX = (
+        f"benchmark_{key}" for key in original_keys
+    )
+    _clear_benchmark_state()
+
+    try:
+        yield
+
+    finally:
+        _clear_benchmark_state()
+        base.BASE_URL = auth.BASE_URL = original_url
+        frappe.conf.gst_api_rate_limit = original_rate_limit
+        throttle.DEFAULT_RATE_LIMIT = original_default_rate_limit
+        auth.CACHE_KEY, auth.LOCK_KEY, throttle.KEY_PREFIX = original_keys
+
+
+def _clear_benchmark_state():
+    auth.clear_auth_token()
+    frappe.cache().delete_keys(f"{throttle.KEY_PREFIX}:")
+
+
+def _run_single(method, calls):
+    latencies, errors = [], 0
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        call_start = time.perf_counter()
+        try:
+            method()
+        except Exception:
+            errors += 1
+
+        latencies.append(time.perf_counter() - call_start)
+
+    return _get_result("single", latencies, errors, time.perf_counter() - start)
+
+
+def _run_bulk(method, calls):
+    latencies = []
+    max_workers, max_per_gstin = get_bulk_generation_limits()
+
+    def timed(item):
+        call_start = time.perf_counter()
+        try:
+            method()
+        finally:
+            latencies.append(time.perf_counter() - call_start)
+
+    start = time.perf_counter()
+    results = run_concurrently(
+        timed,
+        range(calls),
+        max_workers=max_workers,
+        max_per_group=max_per_gstin,
+    )
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for error in results.values() if error)
+    return _get_result(
+        f"bulk (threads, {max_per_gstin} per GSTIN)", latencies, errors, elapsed
+    )
+
+
+def _run_async(coroutine_function, calls, concurrency):
+    latencies = []
+
+    async def timed(semaphore):
+        async with semaphore:
+            call_start = time.perf_counter()
+            try:
+                await coroutine_function()
+            finally:
+                latencies.append(time.perf_counter() - call_start)
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        try:
+            return await asyncio.gather(
+                *(timed(semaphore) for _ in range(calls)), return_exceptions=True
+            )
+        finally:
+            await close_async_session()
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for result in results if isinstance(result, Exception))
+    return _get_result(
+        f"bulk (asyncio, {concurrency} in flight)", latencies, errors, elapsed
+    )
+
+
+def _get_result(mode, latencies, errors, elapsed):
+    return {
+        "mode": mode,
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "calls_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0,
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile"""
+
+    if not values:
+        return 0
+
+    values = sorted(values)
+    return values[max(0, math.ceil(len(values) * percent / 100) - 1)]
@@ -0,0 +1,148 @@
+"""
+Time taken by GST validations of a Sales Invoice, by number of lines, with:
+- shared context: `validate_transaction`, where details are fetched once and
+  shared by all validations through `GSTValidationContext`.
+- context per validation: `validate_per_validation`, where each validation is
+  called without a context and fetches the details it needs.
+
+Both use the same cached helpers (e.g. GST Account profiles), so this measures
+the cost of fetching details once per validation. It is not a comparison with
+the implementation before `GSTValidationContext` was added.
+
+Also reports the time taken to save the invoice in each case.
+
+Uses test records of `company` (e.g. `_Test Indian Registered Company`).
+The invoices are saved in a transaction that is rolled back.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.gst_validation.run \
+        --kwargs "{'lines': (10, 100, 1000)}"
+"""
+
+import time
+from unittest.mock import patch
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.overrides.transaction import (
+    ignore_gst_validations,
+    update_taxable_values,
+    validate_gst_accounts,
+    validate_hsn_codes,
+    validate_mandatory_fields,
+    validate_overseas_gst_category,
+    validate_place_of_supply,
+    validate_transaction,
+)
+from finbyz_einvoice.gst_india.utils import get_place_of_supply, validate_gst_category
+from finbyz_einvoice.gst_india.utils.tests import append_item, create_transaction
+
+
+def run(company="_Test Indian Registered Company", lines=(10, 100, 1000), repeat=20):
+    results = []
+
+    for line_count in lines:
+        doc = get_transaction(company, line_count)
+
+        per_validation = _time_run(validate_per_validation, doc, repeat)
+        shared = _time_run(validate_transaction, doc, repeat)
+
+        results.append(
+            {
+                "lines": line_count,
+                "context_per_validation_ms": per_validation,
+                "shared_context_ms": shared,
+                "saved_ms": round(per_validation - shared, 3),
+                "save_with_context_per_validation_ms": _time_save(
+                    doc, validate_per_validation
+                ),
+                "save_with_shared_context_ms": _time_save(doc, validate_transaction),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def get_transaction(company, line_count):
+    doc = create_transaction(
+        doctype="Sales Invoice",
+        company=company,
+        gst_hsn_code="61149090",
+        is_in_state=True,
+        do_not_save=True,
+    )
+
+    for _ in range(line_count - 1):
+        append_item(doc, frappe._dict(gst_hsn_code="61149090"), doc.get_company_abbr())
+
+    doc.run_method("set_missing_values")
+    doc.calculate_taxes_and_totals()
+    return doc
+
+
+def validate_per_validation(doc, method=None):
+    """
+    `validate_transaction`, with each validation called without a context,
+    and hence fetching the details it needs.
+    """
+
+    if ignore_gst_validations(doc):
+        return False
+
+    if doc.place_of_supply:
+        validate_place_of_supply(doc)
+    else:
+        doc.place_of_supply = get_place_of_supply(doc, doc.doctype)
+
+    if validate_mandatory_fields(doc, ("company_gstin", "place_of_supply")) is False:
+        return False
+
+    if (
+        validate_mandatory_fields(
+            doc,
+            "gst_category",
+            "{0} is a mandatory field for GST Transactions.",
+        )
+        is False
+    ):
+        return False
+
+    validate_overseas_gst_category(doc)
+    validate_hsn_codes(doc)
+    validate_gst_category(doc.gst_category, doc.billing_address_gstin)
+
+    valid_accounts = validate_gst_accounts(doc, True) or ()
+    update_taxable_values(doc, valid_accounts)
+
+
+def _time_run(method, doc, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        method(doc)
+
+    return round((time.perf_counter() - start) * 1000 / repeat, 3)
+
+
+def _time_save(doc, validate):
+    frappe.db.savepoint("gst_validation_benchmark")
+
+    try:
+        doc = frappe.copy_doc(doc)
+
+        # used by `validate` of Sales Invoice
+        with patch(
+            "finbyz_einvoice.gst_india.overrides.sales_invoice.validate_transaction",
+            validate,
+        ):
+            start = time.perf_counter()
+            doc.insert()
+            return round((time.perf_counter() - start) * 1000, 3)
+
+    finally:
+        frappe.db.rollback(save_point="gst_validation_benchmark")
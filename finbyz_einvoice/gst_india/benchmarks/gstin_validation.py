@@ -0,0 +1,113 @@
+"""
+Throughput of validating GSTINs (with GST Categories) in a batch vs one at a time with
+`validate_gstin` and `validate_gst_category`, as done earlier.
+
+GSTINs are generated with `invalid_ratio` of them having a wrong check digit.
+Nothing is read from or saved to the database.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.gstin_validation.run \
+        --kwargs "{'counts': (1000, 50000)}"
+"""
+
+import random
+import time
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.constants import GSTIN_CODE_POINT_CHARS, STATE_NUMBERS
+from finbyz_einvoice.gst_india.utils import (
+    get_gstin_check_digit,
+    validate_gst_category,
+    validate_gstin,
+)
+from finbyz_einvoice.gst_india.utils import gstin_validation
+from finbyz_einvoice.gst_india.utils.gstin_validation import (
+    INVALID_CHECK_DIGIT,
+    VALID,
+    validate_gstins,
+)
+
+
+def run(counts=(100, 1000, 50000), invalid_ratio=0.1):
+    results = []
+
+    for count in counts:
+        gstins, expected = get_gstins(count, invalid_ratio)
+        gst_categories = ["Registered Regular"] * count
+
+        one_by_one = _time_run(validate_one_by_one, gstins, gst_categories)
+        batch = _time_run(validate_gstins, gstins, gst_categories)
+
+        if one_by_one.statuses != expected or batch.statuses != expected:
+            frappe.throw(f"Statuses of {count} GSTINs don't match")
+
+        results.append(
+            {
+                "gstins": count,
+                "numpy": gstin_validation.np is not None,
+                "one_by_one_per_sec": round(count / one_by_one.time),
+                "batch_per_sec": round(count / batch.time),
+                "speedup": round(one_by_one.time / batch.time, 2),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def get_gstins(count, invalid_ratio):
+    """Returns random GSTINs of regular taxpayers and their expected statuses"""
+
+    state_numbers = tuple(STATE_NUMBERS.values())
+    rng = random.Random(count)
+    gstins = []
+    statuses = []
+
+    for _ in range(count):
+        gstin = (
+            rng.choice(state_numbers)
+            + "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=5))
+            + "".join(rng.choices("0123456789", k=4))
+            + rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+            + rng.choice("123456789")
+            + "Z"
+        )
+        check_digit = get_gstin_check_digit(gstin + "0")
+
+        if rng.random() < invalid_ratio:
+            check_digit = rng.choice(GSTIN_CODE_POINT_CHARS.replace(check_digit, ""))
+            statuses.append(INVALID_CHECK_DIGIT)
+        else:
+            statuses.append(VALID)
+
+        gstins.append(gstin + check_digit)
+
+    return gstins, statuses
+
+
+def validate_one_by_one(gstins, gst_categories):
+    statuses = []
+
+    for gstin, gst_category in zip(gstins, gst_categories):
+        try:
+            validate_gst_category(gst_category, validate_gstin(gstin))
+        except frappe.ValidationError:
+            frappe.clear_last_message()
+            statuses.append(INVALID_CHECK_DIGIT)
+        else:
+            statuses.append(VALID)
+
+    return statuses
+
+
+def _time_run(method, gstins, gst_categories):
+    start = time.perf_counter()
+    statuses = method(gstins, gst_categories)
+
+    return frappe._dict(statuses=statuses, time=time.perf_counter() - start)
@@ -0,0 +1,58 @@
+"""
+Latency of one-shot `requests.request` calls vs the pooled session used by BaseAPI.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.http_session.run --kwargs "{'calls': 500}"
+"""
+
+import time
+
+import requests
+
+from finbyz_einvoice.gst_india.api_classes.session import _create_session, get_timeout
+from finbyz_einvoice.gst_india.benchmarks.server import StandInServer
+
+
+def run(calls=200, latency=0):
+    with StandInServer(latency=latency) as server:
+        url = f"{server.url}/enriched/ei/api/invoice"
+
+        one_shot = _time_calls(
+            calls, lambda: requests.request("POST", url, json={}, timeout=get_timeout())
+        )
+        one_shot_connections = server.connection_count
+
+        session = _create_session()
+        pooled = _time_calls(
+            calls, lambda: session.request("POST", url, json={}, timeout=get_timeout())
+        )
+        pooled_connections = server.connection_count - one_shot_connections
+
+        session.close()
+
+    result = {
+        "calls": calls,
+        "one_shot_ms_per_call": round(one_shot * 1000 / calls, 3),
+        "pooled_ms_per_call": round(pooled * 1000 / calls, 3),
+        "saved_ms_per_call": round((one_shot - pooled) * 1000 / calls, 3),
+        "one_shot_connections": one_shot_connections,
+        "pooled_connections": pooled_connections,
+    }
+
+    print_result(result)
+    return result
+
+
+def _time_calls(calls, make_call):
+    start = time.perf_counter()
+    for _ in range(calls):
+        make_call().raise_for_status()
+
+    return time.perf_counter() - start
+
+
+def print_result(result):
+    width = max(len(key) for key in result)
+    for key, value in result.items():
+        print(f"{key.ljust(width)}  {value}")
@@ -0,0 +1,102 @@
+"""
+Time taken to compute item-wise tax details of a transaction, with item-wise tax
+detail of each tax row parsed once vs once per item, by number of lines.
+
+Uses GST Accounts of `company` from GST Settings. Nothing is saved to the database.
+
+Usage:
+    bench --site {site} execute \
+        finbyz_einvoice.gst_india.benchmarks.item_tax_details.run \
+        --kwargs "{'company': '_Test Indian Registered Company'}"
+"""
+
+import json
+import time
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.utils import get_gst_accounts_by_type
+from finbyz_einvoice.gst_india.utils.transaction_data import GSTTransactionData
+
+
+class PerItemParse(GSTTransactionData):
+    """Parses item-wise tax detail for every item, as done earlier"""
+
+    def get_item_tax_index(self):
+        self.item_tax_index = None
+        return super().get_item_tax_index()
+
+
+def run(company=None, lines=(10, 100, 1000)):
+    company = company or frappe.defaults.get_user_default("Company")
+    results = []
+
+    for line_count in lines:
+        doc = get_transaction(company, line_count)
+
+        per_item = _time_item_details(PerItemParse(doc))
+        indexed = _time_item_details(GSTTransactionData(doc))
+
+        results.append(
+            {
+                "lines": line_count,
+                "per_item_parse_ms": round(per_item * 1000, 2),
+                "indexed_ms": round(indexed * 1000, 2),
+                "speedup": round(per_item / indexed, 2),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def get_transaction(company, line_count):
+    accounts = get_gst_accounts_by_type(company, "Output")
+    items = [
+        dict(
+            idx=idx,
+            item_code=f"BENCH-ITEM-{idx:05d}",
+            item_name=f"Bench Item {idx}",
+            gst_hsn_code="61149090",
+            uom="Nos",
+            qty=2,
+            taxable_value=100.0,
+        )
+        for idx in range(1, line_count + 1)
+    ]
+
+    def get_tax_row(account_field, rate):
+        return dict(
+            account_head=accounts[account_field],
+            charge_type="On Net Total",
+            tax_amount=line_count * rate,
+            item_wise_tax_detail=json.dumps(
+                {item["item_code"]: [rate, rate] for item in items}
+            ),
+        )
+
+    return frappe.get_doc(
+        doctype="Sales Invoice",
+        company=company,
+        items=items,
+        taxes=[
+            get_tax_row(account_field, rate)
+            for account_field, rate in (
+                ("cgst_account", 9),
+                ("sgst_account", 9),
+                ("cess_account", 1),
+            )
+            if accounts.get(account_field)
+        ],
+        group_same_items=0,
+    )
+
+
+def _time_item_details(transaction_data):
+    start = time.perf_counter()
+    transaction_data.get_all_item_details()
+    return time.perf_counter() - start
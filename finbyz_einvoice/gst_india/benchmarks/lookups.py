@@ -0,0 +1,147 @@
+"""
+Time taken per call by GST constant lookups, with tables from `constants.lookups`
+vs scanning the forward maps as done earlier.
+
+The UOM lookups use a GST UOM Map of `uom_map_rows` rows, with the UOM looked up
+being the last one (worst case for the scan). Nothing is saved to the database.
+
+Usage:
+    bench --site {site} execute finbyz_einvoice.gst_india.benchmarks.lookups.run \
+        --kwargs "{'number': 100000}"
+"""
+
+import timeit
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.constants import STATE_NUMBERS, UOM_MAP
+from finbyz_einvoice.gst_india.constants.e_waybill import TRANSPORT_MODES
+from finbyz_einvoice.gst_india.constants.lookups import VALID_PLACES_OF_SUPPLY
+from finbyz_einvoice.gst_india.utils import (
+    clear_gst_uom_maps,
+    get_gst_uom,
+    get_place_of_supply_options,
+    get_state,
+)
+from finbyz_einvoice.gst_india.utils.jinja import get_transport_mode
+
+
+def run(number=100000, uom_map_rows=50):
+    settings = get_settings(uom_map_rows)
+    last_uom = settings.gst_uom_map[-1].uom
+
+    cases = (
+        ("state", lambda: _scan_state("27"), lambda: get_state("27")),
+        (
+            "uom_from_map",
+            lambda: _scan_gst_uom(last_uom, settings),
+            lambda: get_gst_uom(last_uom, settings),
+        ),
+        (
+            "uom_from_description",
+            lambda: _scan_gst_uom("Numbers", settings),
+            lambda: get_gst_uom("Numbers", settings),
+        ),
+        (
+            "place_of_supply_valid",
+            lambda: "27-Maharashtra" in _build_place_of_supply_options(True),
+            lambda: "27-Maharashtra" in VALID_PLACES_OF_SUPPLY[True],
+        ),
+        (
+            "place_of_supply_options",
+            lambda: _build_place_of_supply_options(False, as_list=False),
+            lambda: get_place_of_supply_options(),
+        ),
+        (
+            "transport_mode",
+            lambda: _scan_transport_mode("4"),
+            lambda: get_transport_mode("4"),
+        ),
+    )
+
+    results = []
+    for name, scan, lookup in cases:
+        if scan() != lookup():
+            frappe.throw(f"Results of {name} don't match")
+
+        scan_time = _time_per_call(scan, number)
+        lookup_time = _time_per_call(lookup, number)
+
+        results.append(
+            {
+                "lookup": name,
+                "scan_us": scan_time,
+                "lookup_us": lookup_time,
+                "speedup": round(scan_time / lookup_time, 2),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def get_settings(uom_map_rows):
+    """Returns GST Settings with a GST UOM Map of `uom_map_rows` rows"""
+
+    settings = frappe.get_doc("GST Settings")
+    gst_uoms = tuple(f"{code}({description})" for code, description in UOM_MAP.items())
+
+    settings.gst_uom_map = [
+        frappe._dict(uom=f"_Test UOM {idx}", gst_uom=gst_uoms[idx % len(gst_uoms)])
+        for idx in range(uom_map_rows)
+    ]
+
+    # UOM Map cached for the saved settings is not for these rows
+    clear_gst_uom_maps()
+    return settings
+
+
+def _scan_state(state_number):
+    state_number = str(state_number).zfill(2)
+
+    for state, code in STATE_NUMBERS.items():
+        if code == state_number:
+            return state
+
+
+def _scan_gst_uom(uom, settings):
+    for row in settings.get("gst_uom_map"):
+        if row.uom == uom:
+            return row.gst_uom.split("(")[0].strip()
+
+    uom = uom.upper()
+    if uom in UOM_MAP:
+        return uom
+
+    return next((k for k, v in UOM_MAP.items() if v == uom), "OTH")
+
+
+def _build_place_of_supply_options(with_other_countries, as_list=True):
+    options = []
+
+    for state_name, state_number in STATE_NUMBERS.items():
+        options.append(f"{state_number}-{state_name}")
+
+    if with_other_countries:
+        options.append("96-Other Countries")
+
+    if as_list:
+        return options
+
+    return "\n".join(sorted(options))
+
+
+def _scan_transport_mode(code):
+    code = int(code)
+
+    for transport_mode, _code in TRANSPORT_MODES.items():
+        if _code == code:
+            return transport_mode
+
+
+def _time_per_call(method, number):
+    return round(timeit.timeit(method, number=number) * 1e6 / number, 3)
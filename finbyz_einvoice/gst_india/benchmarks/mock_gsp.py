@@ -0,0 +1,207 @@
+import itertools
+import json
+import random
+import threading
+import time
+from copy import deepcopy
+from urllib.parse import parse_qs
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.server import StandInServer
+
+TAXPAYER_INFO = {
+    "ctb": "Proprietorship",
+    "dty": "Regular",
+    "lgnm": "TEST TAXPAYER",
+    "tradeNam": "Test Taxpayer",
+    "rgdt": "01/07/2017",
+    "sts": "Active",
+    "pradr": {
+        "addr": {
+            "bnm": "",
+            "bno": "Plot No. 1",
+            "dst": "Vadodara",
+            "flno": "",
+            "loc": "GIDC",
+            "pncd": "391243",
+            "st": "Test Street",
+            "stcd": "Gujarat",
+        },
+        "ntr": "Office / Sale Office",
+    },
+    "adadr": [],
+}
+
+
+class MockGSP(StandInServer):
+    """
+    Stand-in for the GSP that implements the endpoints used by EInvoiceAPI,
+    EWaybillAPI and PublicAPI, with responses from `gst_india/data/test_*.json`.
+
+    IRNs, acknowledgement and e-Waybill numbers are unique per request.
+
+    :param latency: seconds to wait before responding to each request
+    :param jitter: random seconds added to latency (0 to `jitter`)
+    :param error_rate: fraction of requests that fail with `error_status`
+    :param error_status: HTTP status code of injected errors (default: 503)
+    :param seed: seed for jitter and error injection, for reproducible runs
+    """
+
+    def __init__(self, latency=0, jitter=0, error_rate=0, error_status=503, seed=None):
+        super().__init__(latency=0, get_response=self.respond)
+        self.mock_latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.counter = itertools.count(1)
+
+        self.e_invoice_data = load_test_data("test_e_invoice.json")
+        self.e_waybill_data = load_test_data("test_e_waybill.json")
+
+        self.routes = {
+            ("POST", "gsp/authenticate"): self.authenticate,
+            ("POST", "ei/api/invoice"): self.generate_irn,
+            ("GET", "ei/api/invoice/irn"): self.get_e_invoice_by_irn,
+            ("POST", "ei/api/invoice/cancel"): self.cancel_irn,
+            ("POST", "ei/api/ewaybill"): self.generate_e_waybill_by_irn,
+            ("POST", "ei/api/ewayapi"): self.cancel_e_waybill_by_irn,
+            ("POST", "ewb/ewayapi", "GENEWAYBILL"): self.generate_e_waybill,
+            ("POST", "ewb/ewayapi", "CANEWB"): self.cancel_e_waybill,
+            ("POST", "ewb/ewayapi", "VEHEWB"): self.update_vehicle_info,
+            ("POST", "ewb/ewayapi", "UPDATETRANSPORTER"): self.update_transporter,
+            ("POST", "ewb/ewayapi", "EXTENDVALIDITY"): self.extend_validity,
+            ("GET", "ewb/ewayapi/getewaybill"): self.get_e_waybill,
+            ("GET", "commonapi/search", "TP"): self.get_gstin_info,
+        }
+
+    def respond(self, method, path, query, body):
+        with self.random_lock:
+            delay = self.mock_latency + self.random.uniform(0, self.jitter)
+            inject_error = self.random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        if inject_error:
+            return self.error_status, {"success": False, "message": "Injected error"}
+
+        query = {key: values[0] for key, values in parse_qs(query).items()}
+        if not (handler := self.get_handler_for(method, path, query.get("action"))):
+            return 404, {"success": False, "message": f"No mock for {method} {path}"}
+
+        return 200, handler(query, json.loads(body) if body else {})
+
+    def get_handler_for(self, method, path, action):
+        # ignore prefixes like /test and /enriched
+        path = path.strip("/")
+        for route, handler in self.routes.items():
+            if route[0] == method and path.endswith(route[1]):
+                if len(route) == 2 or route[2] == action:
+                    return handler
+
+    def get_sequence(self):
+        return next(self.counter)
+
+    def authenticate(self, query, body):
+        return {"token_type": "Bearer", "access_token": "mock", "expires_in": 3600}
+
+    def generate_irn(self, query, body):
+        response = deepcopy(self.e_invoice_data.goods_item_with_ewaybill.response_data)
+        sequence = self.get_sequence()
+        response.result.update(
+            Irn=f"{sequence:064x}",
+            AckNo=232210000000000 + sequence,
+            EwbNo=391000000000 + sequence,
+        )
+
+        return response
+
+    def get_e_invoice_by_irn(self, query, body):
+        response = deepcopy(self.e_invoice_data.goods_item_with_ewaybill.response_data)
+        response.result.Irn = query.get("irn")
+        response.pop("info", None)
+
+        return response
+
+    def cancel_irn(self, query, body):
+        response = deepcopy(self.e_invoice_data.cancel_e_invoice.response_data)
+        response.result.Irn = body.get("Irn")
+
+        return response
+
+    def generate_e_waybill_by_irn(self, query, body):
+        result = self.e_invoice_data.goods_item_with_ewaybill.response_data.result
+        return {
+            "success": True,
+            "message": "E-Way Bill generated successfully",
+            "result": {
+                "EwbNo": 391000000000 + self.get_sequence(),
+                "EwbDt": result.EwbDt,
+                "EwbValidTill": result.EwbValidTill,
+            },
+        }
+
+    def cancel_e_waybill_by_irn(self, query, body):
+        response = deepcopy(self.e_invoice_data.cancel_e_waybill.response_data)
+        response.result.ewayBillNo = str(body.get("ewbNo"))
+
+        return response
+
+    def generate_e_waybill(self, query, body):
+        response = deepcopy(self.e_waybill_data.goods_item_with_ewaybill.response_data)
+        response.result.ewayBillNo = 301000000000 + self.get_sequence()
+
+        return response
+
+    def cancel_e_waybill(self, query, body):
+        response = deepcopy(self.e_waybill_data.cancel_e_waybill.response_data)
+        response.result.ewayBillNo = str(body.get("ewbNo"))
+
+        return response
+
+    def update_vehicle_info(self, query, body):
+        return deepcopy(self.e_waybill_data.update_vehicle_info.response_data)
+
+    def update_transporter(self, query, body):
+        response = deepcopy(self.e_waybill_data.update_transporter.response_data)
+        response.result.update(
+            ewayBillNo=str(body.get("ewbNo")),
+            transporterId=body.get("transporterId"),
+        )
+
+        return response
+
+    def extend_validity(self, query, body):
+        result = self.e_waybill_data.update_vehicle_info.response_data.result
+        return {
+            "success": True,
+            "message": "E-Way Bill validity is extended successfully",
+            "result": {
+                "ewayBillNo": str(body.get("ewbNo")),
+                "updatedDate": result.vehUpdDate,
+                "validUpto": result.validUpto,
+            },
+        }
+
+    def get_e_waybill(self, query, body):
+        response = deepcopy(self.e_waybill_data.get_e_waybill.response_data)
+        response.result.ewbNo = query.get("ewbNo")
+
+        return response
+
+    def get_gstin_info(self, query, body):
+        return {
+            "success": True,
+            "message": "Taxpayer details fetched successfully",
+            "result": {**deepcopy(TAXPAYER_INFO), "gstin": query.get("gstin")},
+        }
+
+
+def load_test_data(file_name):
+    with open(
+        frappe.get_app_path("finbyz_einvoice", "gst_india", "data", file_name)
+    ) as f:
+        return json.load(f, object_hook=frappe._dict)
@@ -0,0 +1,154 @@
+"""
+Time taken to build and serialize e-Invoice and e-Waybill payloads, dumped from
+their schemas skipping empty values in a single pass and encoded with orjson vs
+built with empty values, sanitized after and encoded with the stdlib encoder used
+by `requests`, as done earlier. The earlier path is dumped from the same schema
+with empty values, which is slightly faster than building the dict literals it
+replaced.
+
+Payloads are based on the request data in `gst_india/data/test_e_*.json`, with the
+item repeated to `lines` lines. Uses GST Accounts of `company` from GST Settings and
+requires e-Waybill to be enabled. Nothing is saved to the database.
+
+Usage:
+    bench --site {site} execute finbyz_einvoice.gst_india.benchmarks.payload.run \
+        --kwargs "{'company': '_Test Indian Registered Company', 'lines': 1000}"
+"""
+
+import json
+import time
+
+import frappe
+
+from finbyz_einvoice.gst_india.benchmarks.http_session import print_result
+from finbyz_einvoice.gst_india.benchmarks.mock_gsp import load_test_data
+from finbyz_einvoice.gst_india.utils.e_invoice import E_INVOICE_SCHEMA, EInvoiceData
+from finbyz_einvoice.gst_india.utils.e_waybill import E_WAYBILL_SCHEMA, EWaybillData
+from finbyz_einvoice.gst_india.utils.payload import Schema, dumps
+from finbyz_einvoice.gst_india.utils.transaction_data import GSTTransactionData
+
+PAYLOADS = (
+    (EInvoiceData, E_INVOICE_SCHEMA, "test_e_invoice.json", "goods_item_with_ewaybill"),
+    (EInvoiceData, E_INVOICE_SCHEMA, "test_e_invoice.json", "service_item"),
+    (EInvoiceData, E_INVOICE_SCHEMA, "test_e_invoice.json", "return_invoice"),
+    (EInvoiceData, E_INVOICE_SCHEMA, "test_e_invoice.json", "debit_invoice"),
+    (EWaybillData, E_WAYBILL_SCHEMA, "test_e_waybill.json", "goods_item_with_ewaybill"),
+)
+
+# used by computed fields, not part of the payload
+DEFAULT_TRANSACTION_DETAILS = {
+    "total_cess_amount": 0,
+    "total_cess_non_advol_amount": 0,
+    "rounding_adjustment": 0,
+    "other_charges": 0,
+    "discount_amount": 0,
+}
+
+
+def run(company=None, lines=1000, repeat=10):
+    company = company or frappe.defaults.get_user_default("Company")
+    results = []
+
+    for data_class, schema, file_name, key in PAYLOADS:
+        request_data = load_test_data(file_name)[key].request_data
+        data = get_transaction_data(data_class, schema, request_data, company, lines)
+
+        sanitized = _time_run(build_and_sanitize, schema, data, repeat)
+        dumped = _time_run(dump, schema, data, repeat)
+
+        if json.loads(sanitized.payload) != json.loads(dumped.payload):
+            frappe.throw(f"Payloads of {file_name}: {key} don't match")
+
+        results.append(
+            {
+                "payload": f"{file_name}: {key}",
+                "lines": lines,
+                "payload_kb": round(len(dumped.payload) / 1024, 2),
+                "sanitized_ms": sanitized.time,
+                "dumped_ms": dumped.time,
+                "speedup": round(sanitized.time / dumped.time, 2),
+            }
+        )
+
+    for result in results:
+        print_result(result)
+        print()
+
+    return results
+
+
+def build_and_sanitize(schema, data):
+    payload = schema.dump(data, skip_empty=False)
+    return json.dumps(GSTTransactionData.sanitize_data(payload), allow_nan=False)
+
+
+def dump(schema, data):
+    return dumps(schema.dump(data))
+
+
+def get_transaction_data(data_class, schema, request_data, company, lines):
+    """Returns transaction data with details loaded from the request data"""
+
+    data = data_class(frappe.get_doc(doctype="Sales Invoice", company=company))
+    data.transaction_details = frappe._dict(DEFAULT_TRANSACTION_DETAILS)
+    data.dispatch_address = data.shipping_address = None
+
+    for key, field in schema.fields.items():
+        if key not in request_data:
+            continue
+
+        if isinstance(field, Schema):
+            _load(field, request_data[key], data)
+
+        elif isinstance(field, str):
+            _set_value(data, field, request_data[key])
+
+        elif key in ("ItemList", "itemList"):
+            item_details = frappe._dict()
+            _load(field.schema, request_data[key][0], item_details)
+            data.all_item_details = [
+                frappe._dict(item_details, item_no=idx) for idx in range(1, lines + 1)
+            ]
+
+    return data
+
+
+def _load(schema, values, source):
+    if schema.source:
+        source = _get_or_set(source, schema.source)
+
+    for key, field in schema.fields.items():
+        if key not in values:
+            continue
+
+        if isinstance(field, Schema):
+            _load(field, values[key], source)
+
+        elif isinstance(field, str):
+            _set_value(source, field, values[key])
+
+
+def _set_value(source, path, value):
+    *parents, fieldname = path.split(".")
+    for parent in parents:
+        source = _get_or_set(source, parent)
+
+    setattr(source, fieldname, value)
+
+
+def _get_or_set(source, attribute):
+    if not getattr(source, attribute, None):
+        setattr(source, attribute, frappe._dict())
+
+    return getattr(source, attribute)
+
+
+def _time_run(method, schema, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = method(schema, data)
+
+    return frappe._dict(
+        payload=payload,
+        time=round((time.perf_counter() - start) * 1000 / repeat, 2),
+    )
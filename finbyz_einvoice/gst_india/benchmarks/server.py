@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Server(ThreadingHTTPServer):
+    # default backlog of 5 stalls concurrent clients
+    request_queue_size = 128
+
+
+class StandInServer:
+    """
+    Local HTTP/1.1 server with keep-alive support that stands in for the GSP.
+
+    Usage:
+        with StandInServer(latency=0.05) as server:
+            requests.get(f"{server.url}/ping")
+
+    :param latency: seconds to wait before responding to each request
+    :param get_response: callable(method, path, query, body) -> (status, dict)
+    """
+
+    def __init__(self, latency=0, get_response=None):
+        self.latency = latency
+        self.get_response = get_response or default_response
+        self.request_count = 0
+        self.connection_count = 0
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.httpd = Server(("127.0.0.1", 0), self.get_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, avoid delayed ACK stalls
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server.connection_count += 1
+
+            def do_GET(self):
+                self.respond("GET")
+
+            def do_POST(self):
+                self.respond("POST")
+
+            def respond(self, method):
+                server.request_count += 1
+                path, _, query = self.path.partition("?")
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status, response = server.get_response(method, path, query, body)
+                content = json.dumps(response).encode()
+
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def default_response(method, path, query, body):
+    return 200, {"success": True, "message": "", "result": {}}
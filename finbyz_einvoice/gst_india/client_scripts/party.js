@@ -31,20 +31,58 @@ function update_gstin_in_other_documents(doctype) {
                         <br><strong>GSTIN:</strong> ${gstin || "&lt;empty&gt;"}
                         <br><strong>GST Category:</strong> ${gst_category}`;
 
-            frappe.confirm(message, function () {
-                frappe.call({
-                    method: "finbyz_einvoice.gst_india.overrides.party.update_docs_with_previous_gstin",
-                    args: {
+            frappe.confirm(message, async function () {
+                const job_id = await frappe.xcall(
+                    "finbyz_einvoice.gst_india.overrides.party.update_docs_with_previous_gstin",
+                    {
                         gstin: gstin || "",
                         gst_category,
                         docs_with_previous_gstin,
-                    },
-                });
+                    }
+                );
+
+                // many documents are updated in a background job
+                if (job_id) show_gstin_update_progress(job_id);
             });
         },
     });
 }
 
+function show_gstin_update_progress(job_id) {
+    const event = "update_docs_with_previous_gstin_progress";
+    const title = __("Updating GSTIN");
+
+    frappe.show_alert({
+        message: __("GSTIN is being updated in a <a href='{0}'>Background Job</a>", [
+            frappe.utils.get_form_link("RQ Job", job_id),
+        ]),
+        indicator: "blue",
+    });
+
+    frappe.realtime.off(event);
+    frappe.realtime.on(event, ({ total, processed, failed }) => {
+        frappe.show_progress(
+            title,
+            processed,
+            total,
+            __("{0} of {1} processed, {2} failed", [processed, total, failed]),
+            true
+        );
+
+        if (processed < total) return;
+
+        frappe.realtime.off(event);
+        frappe.show_alert({
+            message: failed
+                ? __("GSTIN Updated with {0} failure(s). Please check Error Log.", [
+                      failed,
+                  ])
+                : __("GSTIN Updated"),
+            indicator: failed ? "orange" : "green",
+        });
+    });
+}
+
 function validate_gstin(doctype) {
     frappe.ui.form.on(doctype, {
         gstin(frm) {
@@ -1,4 +1,6 @@
 const DOCTYPE = "Sales Invoice";
+// e-Waybill JSON for more documents is exported in the background
+const BACKGROUND_EXPORT_THRESHOLD = 100;
 const erpnext_onload = frappe.listview_settings[DOCTYPE].onload;
 frappe.listview_settings[DOCTYPE].onload = function (list_view) {
     if (erpnext_onload) {
@@ -31,6 +33,10 @@ function add_bulk_action_for_submitted_invoices(list_view, label, callback) {
 }
 
 async function generate_e_waybill_json(docnames) {
+    if (docnames.length > BACKGROUND_EXPORT_THRESHOLD) {
+        return enqueue_e_waybill_json_export(docnames);
+    }
+
     const ewb_data = await frappe.xcall(
         "finbyz_einvoice.gst_india.utils.e_waybill.generate_e_waybill_json",
         { doctype: DOCTYPE, docnames }
@@ -39,6 +45,65 @@ async function generate_e_waybill_json(docnames) {
     trigger_file_download(ewb_data, get_e_waybill_file_name());
 }
 
+async function enqueue_e_waybill_json_export(docnames) {
+    await frappe.xcall(
+        "finbyz_einvoice.gst_india.utils.e_waybill.enqueue_e_waybill_json_export",
+        { doctype: DOCTYPE, docnames }
+    );
+
+    frappe.show_alert({
+        message: __(
+            "e-Waybill JSON export has been queued. You will be notified once the file(s) are ready."
+        ),
+        indicator: "blue",
+    });
+
+    show_e_waybill_json_export_progress();
+}
+
+function show_e_waybill_json_export_progress() {
+    const event = "e_waybill_json_export_progress";
+    const title = __("Exporting e-Waybill JSON");
+
+    frappe.realtime.off(event);
+    frappe.realtime.on(event, ({ status, total, processed, failed, files }) => {
+        frappe.show_progress(
+            title,
+            processed,
+            total,
+            __("{0} of {1} processed, {2} failed", [processed, total, failed]),
+            true
+        );
+
+        if (status !== "Completed") return;
+
+        frappe.realtime.off(event);
+        frappe.hide_progress();
+
+        if (!files.length) {
+            frappe.msgprint({
+                message: __("e-Waybill JSON could not be generated for any document"),
+                indicator: "red",
+            });
+            return;
+        }
+
+        const file_links = files.map(file_url => {
+            const file_name = file_url.split("/").pop();
+            return `<a href="${encodeURI(file_url)}" target="_blank">${file_name}</a>`;
+        });
+
+        frappe.msgprint({
+            title: __("e-Waybill JSON Exported"),
+            message: __("{0} failure(s). Download the file(s) below:<br><br>{1}", [
+                failed,
+                file_links.join("<br>"),
+            ]),
+            indicator: failed ? "orange" : "green",
+        });
+    });
+}
+
 async function enqueue_bulk_e_invoice_generation(docnames) {
     const now = frappe.datetime.system_datetime();
 
@@ -77,6 +142,34 @@ async function enqueue_bulk_e_invoice_generation(docnames) {
             ]
         )
     );
+
+    show_bulk_e_invoice_generation_progress();
+}
+
+function show_bulk_e_invoice_generation_progress() {
+    const event = "bulk_e_invoice_generation_progress";
+    const title = __("Generating e-Invoices");
+
+    frappe.realtime.off(event);
+    frappe.realtime.on(event, ({ total, processed, failed }) => {
+        frappe.show_progress(
+            title,
+            processed,
+            total,
+            __("{0} of {1} processed, {2} failed", [processed, total, failed]),
+            true
+        );
+
+        if (processed < total) return;
+
+        frappe.realtime.off(event);
+        frappe.show_alert({
+            message: __("Bulk e-Invoice Generation completed with {0} failure(s)", [
+                failed,
+            ]),
+            indicator: failed ? "orange" : "green",
+        });
+    });
 }
 
 async function validate_if_submitted(selected_docs) {
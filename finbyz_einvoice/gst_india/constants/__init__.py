@@ -159,6 +159,9 @@ GSTIN_FORMATS = {
     "Tax Deductor": TDS,
 }
 
+# characters of GSTIN by their code point, used to compute its check digit
+GSTIN_CODE_POINT_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
 TCS = re.compile(r"^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}[C]{1}[0-9A-Z]{1}$")
 PAN_NUMBER = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]{1}$")
 PINCODE_FORMAT = re.compile(r"^[1-9][0-9]{5}$")
@@ -20,6 +20,7 @@ party_fields = [
         "label": "GSTIN / UIN",
         "fieldtype": "Autocomplete",
         "insert_after": "tax_details_section",
+        "search_index": 1,
         "translatable": 0,
     },
     {
@@ -425,6 +426,7 @@ CUSTOM_FIELDS = {
             "label": "GSTIN / UIN",
             "fieldtype": "Data",
             "insert_after": "tax_details_section",
+            "search_index": 1,
             "translatable": 0,
         },
         {
@@ -0,0 +1,62 @@
+"""
+Lookup tables derived from GST constants, built once at import.
+
+These are read-only as they are shared by all callers in the process.
+"""
+
+from types import MappingProxyType
+
+from finbyz_einvoice.gst_india.constants import STATE_NUMBERS, UOM_MAP
+from finbyz_einvoice.gst_india.constants.e_waybill import (
+    SUB_SUPPLY_TYPES,
+    TRANSPORT_MODES,
+)
+
+
+def _reverse(mapping):
+    """Returns read-only map of value to key, keeping the first key for a value"""
+
+    reverse = {}
+    for key, value in mapping.items():
+        reverse.setdefault(value, key)
+
+    return MappingProxyType(reverse)
+
+
+# "24": "Gujarat"
+STATES_BY_NUMBER = _reverse(STATE_NUMBERS)
+
+# "BOTTLES": "BTL"
+UOMS_BY_DESCRIPTION = _reverse(UOM_MAP)
+
+# 1: "Supply"
+SUB_SUPPLY_TYPES_BY_CODE = _reverse(SUB_SUPPLY_TYPES)
+
+# 1: "Road"
+TRANSPORT_MODES_BY_CODE = _reverse(TRANSPORT_MODES)
+
+_place_of_supply_options = tuple(
+    f"{state_number}-{state_name}" for state_name, state_number in STATE_NUMBERS.items()
+)
+
+# by whether other countries are included
+PLACE_OF_SUPPLY_OPTIONS = MappingProxyType(
+    {
+        False: _place_of_supply_options,
+        True: (*_place_of_supply_options, "96-Other Countries"),
+    }
+)
+
+PLACE_OF_SUPPLY_OPTIONS_TEXT = MappingProxyType(
+    {
+        with_other_countries: "\n".join(sorted(options))
+        for with_other_countries, options in PLACE_OF_SUPPLY_OPTIONS.items()
+    }
+)
+
+VALID_PLACES_OF_SUPPLY = MappingProxyType(
+    {
+        with_other_countries: frozenset(options)
+        for with_other_countries, options in PLACE_OF_SUPPLY_OPTIONS.items()
+    }
+)
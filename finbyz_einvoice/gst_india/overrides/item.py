@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from finbyz_einvoice.gst_india.utils.hsn_codes import get_hsn_index
+
 
 def validate(doc, method=None):
     validate_hsn_code(doc)
@@ -42,9 +44,11 @@ def set_taxes_from_hsn_code(doc):
     if doc.taxes or not doc.gst_hsn_code:
         return
 
-    hsn_doc = frappe.get_doc("GST HSN Code", doc.gst_hsn_code)
+    taxes = get_hsn_index().get_taxes(doc.gst_hsn_code)
+    if taxes is None:
+        taxes = frappe.get_doc("GST HSN Code", doc.gst_hsn_code).taxes
 
-    for tax in hsn_doc.taxes:
+    for tax in taxes:
         doc.append(
             "taxes",
             {
@@ -1,4 +1,5 @@
 import json
+import traceback
 
 import frappe
 from frappe import _
@@ -9,6 +10,13 @@ from finbyz_einvoice.gst_india.utils import (
     validate_gst_category,
     validate_gstin,
 )
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently, summarize
+
+DOCTYPES_WITH_GSTIN = ("Address", "Supplier", "Customer", "Company")
+
+# more documents than this are updated in a background job
+MAX_DOCS_TO_UPDATE_IN_REQUEST = 20
+BACKGROUND_UPDATE_WORKERS = 4
 
 
 def validate_party(doc, method=None):
@@ -57,38 +65,111 @@ def set_docs_with_previous_gstin(doc, method=None):
 
 
 def get_docs_with_previous_gstin(gstin, doctype, docname):
+    """
+    Returns {doctype: [docnames]} of documents (other than the given one)
+    with the GSTIN. Uses the index on `gstin` of each doctype.
+    """
+
     docs_with_previous_gstin = {}
-    for dt in ("Address", "Supplier", "Customer", "Company"):
-        for doc in frappe.get_list(dt, filters={"gstin": gstin}):
-            if doc.name == docname and doctype == dt:
-                continue
+    for dt in DOCTYPES_WITH_GSTIN:
+        docnames = frappe.get_list(dt, filters={"gstin": gstin}, pluck="name")
+
+        if dt == doctype and docname in docnames:
+            docnames.remove(docname)
 
-            docs_with_previous_gstin.setdefault(dt, []).append(doc.name)
+        if docnames:
+            docs_with_previous_gstin[dt] = docnames
 
     return docs_with_previous_gstin
 
 
 @frappe.whitelist()
 def update_docs_with_previous_gstin(gstin, gst_category, docs_with_previous_gstin):
+    """
+    Update GSTIN and GST Category of the given documents.
+
+    Many documents are updated in a background job, and its ID is returned.
+    Progress of the job is published to the user.
+    """
+
+    docs = [
+        (doctype, docname)
+        for doctype, docnames in json.loads(docs_with_previous_gstin).items()
+        for docname in docnames
+    ]
+
+    if len(docs) > MAX_DOCS_TO_UPDATE_IN_REQUEST:
+        rq_job = frappe.enqueue(
+            "finbyz_einvoice.gst_india.overrides.party.update_docs_in_background",
+            queue="long",
+            timeout=max(300, len(docs) * 5),
+            gstin=gstin,
+            gst_category=gst_category,
+            docs=docs,
+        )
+
+        return rq_job.id
+
     frappe.flags.in_update_docs_with_previous_gstin = True
-    docs_with_previous_gstin = json.loads(docs_with_previous_gstin)
-
-    for doctype, docnames in docs_with_previous_gstin.items():
-        for docname in docnames:
-            try:
-                doc = frappe.get_doc(doctype, docname)
-                doc.gstin = gstin
-                doc.gst_category = gst_category
-                doc.save()
-            except Exception as e:
-                frappe.clear_last_message()
-                frappe.throw(
-                    "Error updating {0} {1}:<br/> {2}".format(doctype, docname, str(e))
-                )
+
+    for doctype, docname in docs:
+        try:
+            update_gstin(doctype, docname, gstin, gst_category)
+        except Exception as e:
+            frappe.clear_last_message()
+            frappe.throw(
+                "Error updating {0} {1}:<br/> {2}".format(doctype, docname, str(e))
+            )
 
     frappe.msgprint(_("GSTIN Updated"), indicator="green", alert=True)
 
 
+def update_docs_in_background(gstin, gst_category, docs):
+    """
+    Update GSTIN and GST Category of the given documents, each committed
+    individually. Failures are logged in Error Log.
+    """
+
+    user = frappe.session.user
+
+    def update(doc):
+        frappe.flags.in_update_docs_with_previous_gstin = True
+        update_gstin(*doc, gstin, gst_category)
+
+    def log_error(doc, exception):
+        frappe.log_error(
+            title=_("Error updating GSTIN of {0} {1}").format(*doc),
+            message="".join(
+                traceback.format_exception(
+                    type(exception), exception, exception.__traceback__
+                )
+            ),
+        )
+
+    def publish_progress(progress):
+        frappe.publish_realtime(
+            "update_docs_with_previous_gstin_progress", progress, user=user
+        )
+
+    results = run_concurrently(
+        update,
+        [tuple(doc) for doc in docs],
+        max_workers=BACKGROUND_UPDATE_WORKERS,
+        on_error=log_error,
+        on_progress=publish_progress,
+    )
+
+    # result of the background job, errors are in Error Log
+    return summarize(results)
+
+
+def update_gstin(doctype, docname, gstin, gst_category):
+    doc = frappe.get_doc(doctype, docname)
+    doc.gstin = gstin
+    doc.gst_category = gst_category
+    doc.save()
+
+
 def create_primary_address(doc, method=None):
     """
     Used to create primary address when creating party.
@@ -1,6 +1,7 @@
 import frappe
 from frappe import _
 
+from finbyz_einvoice.gst_india.api_classes.throttle import get_job_timeout
 from finbyz_einvoice.gst_india.constants import GST_INVOICE_NUMBER_FORMAT
 from finbyz_einvoice.gst_india.overrides.transaction import (
     ignore_gst_validations,
@@ -143,10 +144,15 @@ def on_submit(doc, method=None):
         validate_e_invoice_applicability(doc, gst_settings, throw=False)
         and gst_settings.auto_generate_e_invoice
     ):
+        # waits if the GSP is temporarily unavailable, hence not in short queue
         frappe.enqueue(
-            "finbyz_einvoice.gst_india.utils.e_invoice.generate_e_invoice",
+            "finbyz_einvoice.gst_india.api_classes.throttle.run_when_available",
             enqueue_after_commit=True,
-            queue="short",
+            queue="long",
+            # e-Waybill may be generated with e-Invoice
+            timeout=get_job_timeout(requests=2),
+            api_name="e-Invoice",
+            target="finbyz_einvoice.gst_india.utils.e_invoice.generate_e_invoice",
             docname=doc.name,
             throw=False,
         )
@@ -157,9 +163,12 @@ def on_submit(doc, method=None):
         doc, gst_settings
     ):
         frappe.enqueue(
-            "finbyz_einvoice.gst_india.utils.e_waybill.generate_e_waybill",
+            "finbyz_einvoice.gst_india.api_classes.throttle.run_when_available",
             enqueue_after_commit=True,
-            queue="short",
+            queue="long",
+            timeout=get_job_timeout(),
+            api_name="e-Waybill",
+            target="finbyz_einvoice.gst_india.utils.e_waybill.generate_e_waybill",
             doctype=doc.doctype,
             docname=doc.name,
         )
@@ -1,12 +1,21 @@
+import random
 import re
+from unittest.mock import patch
 
 from parameterized import parameterized_class
 
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
-from finbyz_einvoice.gst_india.constants import SALES_DOCTYPES
-from finbyz_einvoice.gst_india.overrides.transaction import DOCTYPES_WITH_TAXABLE_VALUE
+from finbyz_einvoice.gst_india.constants import SALES_DOCTYPES, STATE_NUMBERS
+from finbyz_einvoice.gst_india.overrides import transaction
+from finbyz_einvoice.gst_india.overrides.transaction import (
+    DOCTYPES_WITH_TAXABLE_VALUE,
+    clear_tax_template_index,
+    get_tax_template,
+    get_tax_template_based_on_category,
+    update_taxable_values,
+)
 from finbyz_einvoice.gst_india.utils.tests import (
     _append_taxes,
     append_item,
@@ -614,6 +623,239 @@ class TestQuotationTransaction(FrappeTestCase):
         self.assertEqual(doc.gst_category, "Unregistered")
 
 
+class TestTaxableValueApportionment(FrappeTestCase):
+    def test_vectorized_apportionment(self):
+        """Charges apportioned with NumPy should be same as item by item"""
+
+        if transaction.np is None:
+            self.skipTest("NumPy is not installed")
+
+        rng = random.Random(0)
+
+        for _ in range(200):
+            doc = get_transaction_with_charges(rng)
+
+            self.assertEqual(
+                get_taxable_values(doc, threshold=len(doc.items) + 1),
+                get_taxable_values(doc, threshold=0),
+            )
+
+
+class TestTaxTemplateIndex(FrappeTestCase):
+    MASTER_DOCTYPES = (
+        "Sales Taxes and Charges Template",
+        "Purchase Taxes and Charges Template",
+    )
+    COMPANIES = ("_Test Indian Registered Company", "_Test Company Without Templates")
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        frappe.db.savepoint("before_test_tax_template_index")
+
+        # several categories for Gujarat, one without templates for Maharashtra
+        # and one more for other states
+        cls.tax_categories = {
+            "in_state": get_tax_category("_Test Gujarat In-State", "Gujarat", 0),
+            "out_state": get_tax_category("_Test Gujarat Out-State", "Gujarat", 1),
+            "no_template": get_tax_category("_Test Maharashtra", "Maharashtra", 1),
+            "other_state": get_tax_category("_Test Other State", None, 1),
+        }
+
+        for master_doctype in cls.MASTER_DOCTYPES:
+            # only one enabled template is allowed for a tax category
+            for title, tax_category, disabled in (
+                ("_Test Gujarat In-State Disabled", "in_state", 1),
+                ("_Test Gujarat In-State", "in_state", 0),
+                ("_Test Gujarat Out-State Disabled", "out_state", 1),
+                ("_Test Other State", "other_state", 0),
+            ):
+                create_tax_template(
+                    master_doctype,
+                    cls.COMPANIES[0],
+                    title,
+                    cls.tax_categories[tax_category],
+                    disabled,
+                )
+
+        clear_tax_template_index()
+
+    @classmethod
+    def tearDownClass(cls):
+        frappe.db.rollback(save_point="before_test_tax_template_index")
+        clear_tax_template_index()
+
+    def test_get_tax_template(self):
+        """Tax template from index should be same as from Tax Categories"""
+
+        for master_doctype in self.MASTER_DOCTYPES:
+            for company in self.COMPANIES:
+                for is_inter_state in (0, 1):
+                    # including states without Tax Category
+                    for state_code in sorted(set(STATE_NUMBERS.values())):
+                        args = (master_doctype, company, is_inter_state, state_code)
+
+                        # callers only check if template is set
+                        self.assertEqual(
+                            get_tax_template(*args) or None,
+                            get_tax_template_from_categories(*args) or None,
+                            args,
+                        )
+
+    def test_get_tax_template_based_on_category(self):
+        for master_doctype in self.MASTER_DOCTYPES:
+            for company in self.COMPANIES:
+                for tax_category in self.tax_categories.values():
+                    party_details = frappe._dict(tax_category=tax_category)
+
+                    self.assertEqual(
+                        get_tax_template_based_on_category(
+                            master_doctype, company, party_details
+                        ),
+                        frappe.db.get_value(
+                            master_doctype,
+                            {"company": company, "tax_category": tax_category},
+                            "name",
+                        ),
+                        (master_doctype, company, tax_category),
+                    )
+
+    def test_index_cleared_after_commit(self):
+        get_tax_template(self.MASTER_DOCTYPES[0], self.COMPANIES[0], 0, "24")
+
+        doc = frappe.get_doc("Tax Category", self.tax_categories["in_state"])
+        clear_tax_template_index(doc)
+        self.assertTrue(
+            frappe.cache().get_value(
+                f"{transaction.TAX_TEMPLATE_INDEX_KEY}:{self.MASTER_DOCTYPES[0]}"
+            )
+        )
+
+        frappe.db.after_commit.run()
+        self.assertIsNone(
+            frappe.cache().get_value(
+                f"{transaction.TAX_TEMPLATE_INDEX_KEY}:{self.MASTER_DOCTYPES[0]}"
+            )
+        )
+
+
+def get_tax_template_from_categories(
+    master_doctype, company, is_inter_state, state_code
+):
+    """Tax template as found earlier, without the index"""
+
+    tax_categories = frappe.get_all(
+        "Tax Category",
+        fields=["name", "is_inter_state", "gst_state"],
+        filters={
+            "is_inter_state": 1 if is_inter_state else 0,
+            "is_reverse_charge": 0,
+            "disabled": 0,
+        },
+    )
+
+    default_tax = ""
+
+    for tax_category in tax_categories:
+        if STATE_NUMBERS.get(tax_category.gst_state) == state_code or (
+            not default_tax and not tax_category.gst_state
+        ):
+            default_tax = frappe.db.get_value(
+                master_doctype,
+                {"company": company, "disabled": 0, "tax_category": tax_category.name},
+                "name",
+            )
+
+    return default_tax
+
+
+def get_tax_category(name, gst_state, is_inter_state):
+    if gst_state and (
+        existing := frappe.db.get_value(
+            "Tax Category",
+            {
+                "gst_state": gst_state,
+                "is_inter_state": is_inter_state,
+                "is_reverse_charge": 0,
+            },
+        )
+    ):
+        return existing
+
+    return (
+        frappe.get_doc(
+            {
+                "doctype": "Tax Category",
+                "title": name,
+                "gst_state": gst_state,
+                "is_inter_state": is_inter_state,
+            }
+        )
+        .insert(ignore_if_duplicate=True)
+        .name
+    )
+
+
+def create_tax_template(master_doctype, company, title, tax_category, disabled=0):
+    frappe.get_doc(
+        {
+            "doctype": master_doctype,
+            "title": title,
+            "company": company,
+            "tax_category": tax_category,
+            "disabled": disabled,
+        }
+    ).insert()
+
+
+def get_transaction_with_charges(rng):
+    """Sales Invoice with random items and charges, apportioned by amount or qty"""
+
+    items = [
+        {
+            "base_net_amount": (
+                round(rng.uniform(-100, 10000), 2)
+                if rng.random() < 0.8
+                # ties when rounding
+                else rng.choice((0, 0.005, 1.005, 2.675, 0.125))
+            ),
+            "qty": rng.randint(1, 20),
+        }
+        for _ in range(rng.randint(1, 300))
+    ]
+
+    if rng.random() < 0.1:
+        base_net_total = 0
+        total_value = sum(item["qty"] for item in items)
+    else:
+        base_net_total = total_value = sum(item["base_net_amount"] for item in items)
+
+    charges = rng.choice((round(rng.uniform(-500, 500), 2), 1 / 3, 0.125 * total_value))
+
+    return frappe.get_doc(
+        {
+            "doctype": "Sales Invoice",
+            "items": items,
+            "base_net_total": base_net_total,
+            "total_qty": sum(item["qty"] for item in items),
+            "taxes": [
+                {
+                    "account_head": "_Test Freight",
+                    "tax_amount": charges,
+                    "base_total": base_net_total + charges,
+                }
+            ],
+        }
+    )
+
+
+def get_taxable_values(doc, threshold):
+    with patch.object(transaction, "VECTORIZED_APPORTIONMENT_THRESHOLD", threshold):
+        update_taxable_values(doc, ())
+
+    return [item.taxable_value for item in doc.items]
+
+
 def get_lead(first_name):
     if name := frappe.db.exists("Lead", {"first_name": first_name}):
         return name
@@ -8,6 +8,7 @@ from frappe.utils.data import format_date
 from finbyz_einvoice.gst_india.utils.tests import create_sales_invoice
 from finbyz_einvoice.gst_india.utils.transaction_data import (
     GSTTransactionData,
+    sanitize_values,
     validate_non_gst_items,
 )
 
@@ -210,3 +211,26 @@ class TestTransactionData(FrappeTestCase):
                 }
             ],
         )
+
+    def test_sanitize_short_value(self):
+        """Values shorter than minimum length after sanitization are not sent"""
+
+        self.assertIsNone(
+            GSTTransactionData.sanitize_value("ab!", regex=3, max_length=300)
+        )
+        self.assertListEqual(
+            sanitize_values(["ab!", "abc!", "ab!"], regex=3, max_length=300),
+            [None, "abc", None],
+        )
+
+        doc = create_sales_invoice(do_not_submit=True)
+        self.assertRaisesRegex(
+            frappe.exceptions.ValidationError,
+            "consists of invalid characters: <strong>!</strong>",
+            GSTTransactionData.sanitize_value,
+            "ab!",
+            regex=3,
+            fieldname="customer_name",
+            reference_doctype=doc.doctype,
+            reference_name=doc.name,
+        )
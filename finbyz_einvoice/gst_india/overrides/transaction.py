@@ -1,4 +1,10 @@
 import json
+from functools import cached_property
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 import frappe
 from frappe import _, bold
@@ -11,13 +17,14 @@ from finbyz_einvoice.gst_india.constants import (
     SALES_DOCTYPES,
     STATE_NUMBERS,
 )
+from finbyz_einvoice.gst_india.constants.lookups import VALID_PLACES_OF_SUPPLY
 from finbyz_einvoice.gst_india.utils import (
     get_all_gst_accounts,
-    get_gst_accounts_by_type,
+    get_gst_account_profile,
     get_place_of_supply,
-    get_place_of_supply_options,
     validate_gst_category,
 )
+from finbyz_einvoice.gst_india.utils.hsn_codes import get_hsn_index
 
 DOCTYPES_WITH_TAXABLE_VALUE = {
     "Purchase Invoice",
@@ -26,6 +33,103 @@ DOCTYPES_WITH_TAXABLE_VALUE = {
     "POS Invoice",
 }
 
+# {master doctype: tax templates indexed as in `_build_tax_template_index`}
+TAX_TEMPLATE_INDEX_KEY = "gst_tax_template_index"
+
+# taxes of tax templates, as returned by `get_taxes_and_charges`
+TAXES_AND_CHARGES_KEY = "gst_taxes_and_charges"
+
+# charges are apportioned to items of larger documents with NumPy, if installed
+VECTORIZED_APPORTIONMENT_THRESHOLD = 100
+
+
+class GSTValidationContext:
+    """
+    Details used by GST validations of a transaction, fetched once when first needed
+    and shared by all validations of the transaction.
+    """
+
+    def __init__(self, doc, is_sales_transaction=None):
+        self.doc = doc
+        self.is_sales_transaction = (
+            doc.doctype in SALES_DOCTYPES
+            if is_sales_transaction is None
+            else bool(is_sales_transaction)
+        )
+        self.valid_places_of_supply = VALID_PLACES_OF_SUPPLY[self.is_sales_transaction]
+
+    @cached_property
+    def settings(self):
+        return frappe.get_cached_doc("GST Settings")
+
+    @cached_property
+    def company_details(self):
+        return (
+            frappe.get_cached_value(
+                "Company", self.doc.company, ("country", "gst_category"), as_dict=True
+            )
+            or frappe._dict()
+        )
+
+    @cached_property
+    def all_gst_accounts(self):
+        return frozenset(get_all_gst_accounts(self.doc.company))
+
+    @cached_property
+    def valid_account_profiles(self):
+        """Profiles of GST Accounts that can be used in the transaction"""
+
+        if self.is_sales_transaction:
+            account_types = ("Output",)
+        else:
+            account_types = ("Input", "Reverse Charge")
+
+        return tuple(
+            get_gst_account_profile(self.doc.company, account_type)
+            for account_type in account_types
+        )
+
+    @cached_property
+    def valid_accounts(self):
+        return frozenset(
+            account
+            for profile in self.valid_account_profiles
+            for account in profile.account_set
+        )
+
+    @cached_property
+    def intra_state_accounts(self):
+        return frozenset(
+            profile.accounts.get(fieldname)
+            for profile in self.valid_account_profiles
+            for fieldname in ("cgst_account", "sgst_account")
+        )
+
+    @cached_property
+    def inter_state_accounts(self):
+        return frozenset(
+            profile.accounts.get("igst_account")
+            for profile in self.valid_account_profiles
+        )
+
+    @cached_property
+    def cgst_sgst_accounts(self):
+        """CGST and SGST Accounts, both of which are needed for intra-state supplies"""
+
+        accounts = self.valid_account_profiles[0].accounts
+        return frozenset((accounts.get("cgst_account"), accounts.get("sgst_account")))
+
+    @cached_property
+    def hsn_index(self):
+        return get_hsn_index()
+
+    @cached_property
+    def is_inter_state(self):
+        return is_inter_state_supply(self.doc)
+
+    def get_account_set(self, account_type):
+        return get_gst_account_profile(self.doc.company, account_type).account_set
+
 
 def update_taxable_values(doc, valid_accounts):
     if doc.doctype not in DOCTYPES_WITH_TAXABLE_VALUE:
@@ -65,6 +169,13 @@ def update_taxable_values(doc, valid_accounts):
     if not total_value:
         return
 
+    if (
+        total_charges
+        and np is not None
+        and len(doc.items) >= VECTORIZED_APPORTIONMENT_THRESHOLD
+    ):
+        return _apportion_charges_vectorized(doc, total_charges, total_value)
+
     for item in doc.items:
         item.taxable_value = item.base_net_amount
 
@@ -85,13 +196,64 @@ def update_taxable_values(doc, valid_accounts):
         item.taxable_value += total_charges - apportioned_charges
 
 
-def is_indian_registered_company(doc):
+def _apportion_charges_vectorized(doc, total_charges, total_value):
+    """
+    Same as apportioning charges item by item in `update_taxable_values`, with the
+    charges of all items computed and rounded together.
+    """
+
+    items = doc.items
+    net_amounts = np.array([item.base_net_amount for item in items], dtype=float)
+    proportionate_values = (
+        net_amounts
+        if doc.base_net_total
+        else np.array([item.qty for item in items], dtype=float)
+    )
+
+    # precision is the same for all items
+    applicable_charges = _round(
+        proportionate_values * (total_charges / total_value),
+        items[0].precision("taxable_value"),
+    )
+
+    for item, taxable_value in zip(items, (net_amounts + applicable_charges).tolist()):
+        item.taxable_value = taxable_value
+
+    # summed in order, as done item by item
+    apportioned_charges = float(np.cumsum(applicable_charges)[-1])
+
+    if apportioned_charges != total_charges:
+        item.taxable_value += total_charges - apportioned_charges
+
+
+def _round(values, precision):
+    """
+    Round values as `flt` would.
+
+    Rounding methods only differ for ties (e.g. 0.125 to 2 decimals), so values close
+    to a tie are rounded with `flt` and the rest to the nearest value.
+    """
+
+    multiplier = 10**precision
+    scaled = values * multiplier
+
+    # adding 0.0 changes -0.0 to 0.0, as returned by `flt`
+    rounded = np.rint(scaled) / multiplier + 0.0
+
+    for idx in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+        rounded[idx] = flt(values[idx], precision)
+
+    return rounded
+
+
+def is_indian_registered_company(doc, context=None):
     if not doc.company_gstin:
-        country, gst_category = frappe.get_cached_value(
-            "Company", doc.company, ("country", "gst_category")
-        )
+        company_details = (context or GSTValidationContext(doc)).company_details
 
-        if country != "India" or gst_category == "Unregistered":
+        if (
+            company_details.country != "India"
+            or company_details.gst_category == "Unregistered"
+        ):
             return False
 
     return True
@@ -119,28 +281,7 @@ def validate_mandatory_fields(doc, fields, error_message=None):
         )
 
 
-def get_valid_accounts(company, is_sales_transaction=False):
-    all_valid_accounts = []
-    intra_state_accounts = []
-    inter_state_accounts = []
-
-    def add_to_valid_accounts(account_type):
-        accounts = get_gst_accounts_by_type(company, account_type)
-        all_valid_accounts.extend(accounts.values())
-        intra_state_accounts.append(accounts.cgst_account)
-        intra_state_accounts.append(accounts.sgst_account)
-        inter_state_accounts.append(accounts.igst_account)
-
-    if is_sales_transaction:
-        add_to_valid_accounts("Output")
-    else:
-        add_to_valid_accounts("Input")
-        add_to_valid_accounts("Reverse Charge")
-
-    return all_valid_accounts, intra_state_accounts, inter_state_accounts
-
-
-def validate_gst_accounts(doc, is_sales_transaction=False):
+def validate_gst_accounts(doc, is_sales_transaction=False, context=None):
     """
     Validate GST accounts
     - Only Valid Accounts should be allowed
@@ -153,11 +294,16 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
     if not doc.taxes:
         return
 
+    # valid accounts depend on whether it is a sales transaction
+    if not context or context.is_sales_transaction != bool(is_sales_transaction):
+        context = GSTValidationContext(doc, is_sales_transaction)
+
+    all_gst_accounts = context.all_gst_accounts
     if not (
         rows_to_validate := [
             row
             for row in doc.taxes
-            if row.tax_amount and row.account_head in get_all_gst_accounts(doc.company)
+            if row.tax_amount and row.account_head in all_gst_accounts
         ]
     ):
         return
@@ -177,9 +323,9 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
     def _throw(message, title=None):
         frappe.throw(message, title=title or _("Invalid GST Account"))
 
-    all_valid_accounts, intra_state_accounts, inter_state_accounts = get_valid_accounts(
-        doc.company, is_sales_transaction
-    )
+    all_valid_accounts = context.valid_accounts
+    intra_state_accounts = context.intra_state_accounts
+    inter_state_accounts = context.inter_state_accounts
 
     # Company GSTIN = Party GSTIN
     party_gstin = (
@@ -231,7 +377,7 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
     elif not doc.is_reverse_charge:
         if idx := _get_matched_idx(
             rows_to_validate,
-            get_gst_accounts_by_type(doc.company, "Reverse Charge").values(),
+            context.get_account_set("Reverse Charge"),
         ):
             _throw(
                 _(
@@ -250,7 +396,7 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
                 ).format(idx)
             )
 
-    is_inter_state = is_inter_state_supply(doc)
+    is_inter_state = context.is_inter_state
     previous_row_references = set()
 
     for row in rows_to_validate:
@@ -294,7 +440,7 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
 
     if not is_inter_state:
         used_accounts = set(row.account_head for row in rows_to_validate)
-        if used_accounts and not set(intra_state_accounts[:2]).issubset(used_accounts):
+        if used_accounts and not context.cgst_sgst_accounts.issubset(used_accounts):
             _throw(
                 _(
                     "Cannot use only one of CGST or SGST account for intra-state supplies"
@@ -314,9 +460,9 @@ def validate_gst_accounts(doc, is_sales_transaction=False):
     return all_valid_accounts
 
 
-def validate_tax_accounts_for_non_gst(doc):
+def validate_tax_accounts_for_non_gst(doc, context=None):
     """GST Tax Accounts should not be charged for Non GST Items"""
-    accounts_list = get_all_gst_accounts(doc.company)
+    accounts_list = (context or GSTValidationContext(doc)).all_gst_accounts
 
     for row in doc.taxes:
         if row.account_head in accounts_list and row.tax_amount:
@@ -328,7 +474,7 @@ def validate_tax_accounts_for_non_gst(doc):
             )
 
 
-def validate_items(doc):
+def validate_items(doc, context=None):
     """Validate Items for a GST Compliant Invoice"""
 
     if not doc.items:
@@ -356,7 +502,7 @@ def validate_items(doc):
             items_with_duplicate_taxes.append(bold(row.item_code))
 
     if not has_gst_items:
-        validate_tax_accounts_for_non_gst(doc)
+        validate_tax_accounts_for_non_gst(doc, context)
         return False
 
     if non_gst_items:
@@ -379,11 +525,8 @@ def validate_items(doc):
         )
 
 
-def validate_place_of_supply(doc):
-    valid_options = get_place_of_supply_options(
-        as_list=True,
-        with_other_countries=doc.doctype in SALES_DOCTYPES,
-    )
+def validate_place_of_supply(doc, context=None):
+    valid_options = (context or GSTValidationContext(doc)).valid_places_of_supply
 
     if doc.place_of_supply not in valid_options:
         frappe.throw(
@@ -423,19 +566,17 @@ def get_source_state_code(doc):
     return (doc.supplier_gstin or doc.company_gstin)[:2]
 
 
-def validate_hsn_codes(doc, method=None):
-    validate_hsn_code, min_hsn_digits = frappe.get_cached_value(
-        "GST Settings",
-        "GST Settings",
-        ("validate_hsn_code", "min_hsn_digits"),
-    )
+def validate_hsn_codes(doc, method=None, context=None):
+    context = context or GSTValidationContext(doc)
+    settings = context.settings
 
-    if not validate_hsn_code:
+    if not settings.validate_hsn_code:
         return
 
     rows_with_missing_hsn = []
     rows_with_invalid_hsn = []
-    min_hsn_digits = int(min_hsn_digits)
+    rows_with_unknown_hsn = []
+    min_hsn_digits = int(settings.min_hsn_digits)
 
     for item in doc.items:
         if not (hsn_code := item.get("gst_hsn_code")):
@@ -444,9 +585,24 @@ def validate_hsn_codes(doc, method=None):
         elif len(hsn_code) < min_hsn_digits:
             rows_with_invalid_hsn.append(str(item.idx))
 
+    # GST HSN Codes may not have been created
+    if hsn_index := context.hsn_index:
+        unknown_hsn_codes = hsn_index.get_invalid(
+            item.gst_hsn_code
+            for item in doc.items
+            if item.get("gst_hsn_code") and len(item.gst_hsn_code) >= min_hsn_digits
+        )
+
+        if unknown_hsn_codes:
+            rows_with_unknown_hsn = [
+                str(item.idx)
+                for item in doc.items
+                if item.get("gst_hsn_code") in unknown_hsn_codes
+            ]
+
     if doc._action == "submit":
         # Same error for erroneous rows on submit
-        rows_with_invalid_hsn += rows_with_missing_hsn
+        rows_with_invalid_hsn += rows_with_missing_hsn + rows_with_unknown_hsn
 
         if not rows_with_invalid_hsn:
             return
@@ -473,16 +629,22 @@ def validate_hsn_codes(doc, method=None):
             ).format(min_hsn_digits, frappe.bold(", ".join(rows_with_invalid_hsn)))
         )
 
+    if rows_with_unknown_hsn:
+        frappe.msgprint(
+            _(
+                "HSN/SAC code is not a valid GST HSN Code for the following row"
+                " numbers: <br>{0}"
+            ).format(frappe.bold(", ".join(rows_with_unknown_hsn)))
+        )
+
 
-def validate_overseas_gst_category(doc, method=None):
+def validate_overseas_gst_category(doc, method=None, context=None):
     if doc.gst_category not in OVERSEAS_GST_CATEGORIES:
         return
 
-    overseas_enabled = frappe.get_cached_value(
-        "GST Settings", "GST Settings", "enable_overseas_transactions"
-    )
+    settings = (context or GSTValidationContext(doc)).settings
 
-    if not overseas_enabled:
+    if not settings.enable_overseas_transactions:
         frappe.throw(
             _(
                 "GST Category cannot be set to {0} since it is disabled in GST Settings"
@@ -607,7 +769,7 @@ def get_gst_details(party_details, doctype, company, *, update_place_of_supply=F
 
     if tax_template_by_category:
         gst_details.taxes_and_charges = tax_template_by_category
-        gst_details.taxes = get_taxes_and_charges(
+        gst_details.taxes = get_cached_taxes_and_charges(
             master_doctype, tax_template_by_category
         )
         return gst_details
@@ -627,7 +789,7 @@ def get_gst_details(party_details, doctype, company, *, update_place_of_supply=F
         party_details.company_gstin[:2],
     ):
         gst_details.taxes_and_charges = default_tax
-        gst_details.taxes = get_taxes_and_charges(master_doctype, default_tax)
+        gst_details.taxes = get_cached_taxes_and_charges(master_doctype, default_tax)
 
     return gst_details
 
@@ -655,52 +817,145 @@ def get_tax_template_based_on_category(master_doctype, company, party_details):
     if not party_details.tax_category:
         return
 
-    default_tax = frappe.db.get_value(
-        master_doctype,
-        {"company": company, "tax_category": party_details.tax_category},
-        "name",
+    return get_tax_template_index(master_doctype).templates.get(
+        (company, party_details.tax_category)
     )
 
-    return default_tax
-
 
 def get_tax_template(master_doctype, company, is_inter_state, state_code):
+    default_templates = get_tax_template_index(master_doctype).default_templates
+    is_inter_state = bool(is_inter_state)
+
+    if (key := (company, is_inter_state, state_code)) in default_templates:
+        return default_templates[key]
+
+    # no Tax Category for the state
+    return default_templates.get((company, is_inter_state, None), "")
+
+
+def get_cached_taxes_and_charges(master_doctype, master_name):
+    """`get_taxes_and_charges`, cached until tax templates are changed"""
+
+    if not master_name:
+        return
+
+    cache = frappe.cache()
+    cache_key = f"{TAXES_AND_CHARGES_KEY}:{master_doctype}:{master_name}"
+
+    taxes = cache.get_value(cache_key)
+    if taxes is None:
+        taxes = get_taxes_and_charges(master_doctype, master_name)
+        cache.set_value(cache_key, taxes)
+
+    # rows are updated by callers
+    return [tax.copy() for tax in taxes]
+
+
+def get_tax_template_index(master_doctype):
+    cache = frappe.cache()
+    cache_key = f"{TAX_TEMPLATE_INDEX_KEY}:{master_doctype}"
+
+    if not (index := cache.get_value(cache_key)):
+        index = _build_tax_template_index(master_doctype)
+        cache.set_value(cache_key, index)
+
+    return index
+
+
+def clear_tax_template_index(doc=None, method=None, *args):
+    """Clear indexed tax templates and their taxes, on change of Tax Category or tax
+    templates"""
+
+    if not doc:
+        _clear_tax_template_index()
+        return
+
+    # until the change is committed, the index can be rebuilt by other requests
+    # from the earlier state, or by this request from the uncommitted state
+    frappe.db.after_commit.add(_clear_tax_template_index)
+    frappe.db.after_rollback.add(_clear_tax_template_index)
+
+
+def _clear_tax_template_index():
+    cache = frappe.cache()
+    cache.delete_keys(TAX_TEMPLATE_INDEX_KEY)
+    cache.delete_keys(TAXES_AND_CHARGES_KEY)
+
+
+def _build_tax_template_index(master_doctype):
+    """
+    Returns tax templates of `master_doctype`, indexed by:
+    - templates: (company, tax category)
+    - default_templates: (company, is inter-state, state code), as per Tax Categories
+      for the state. State code is None for templates used for other states.
+    """
+
+    templates = {}
+    enabled_templates = {}
+
+    for template in frappe.get_all(
+        master_doctype, fields=("name", "company", "tax_category", "disabled")
+    ):
+        key = (template.company, template.tax_category)
+        templates.setdefault(key, template.name)
+
+        if not template.disabled:
+            enabled_templates.setdefault(key, template.name)
+
     tax_categories = frappe.get_all(
         "Tax Category",
-        fields=["name", "is_inter_state", "gst_state"],
-        filters={
-            "is_inter_state": 1 if is_inter_state else 0,
-            "is_reverse_charge": 0,
-            "disabled": 0,
-        },
+        fields=("name", "is_inter_state", "gst_state"),
+        filters={"is_reverse_charge": 0, "disabled": 0},
     )
 
+    companies = {company for company, tax_category in templates}
+    default_templates = {}
+
+    for is_inter_state in (False, True):
+        categories = [
+            tax_category
+            for tax_category in tax_categories
+            if bool(tax_category.is_inter_state) == is_inter_state
+        ]
+
+        state_codes = {
+            STATE_NUMBERS.get(tax_category.gst_state) for tax_category in categories
+        }
+        state_codes.discard(None)
+
+        for company in companies:
+            for state_code in (None, *state_codes):
+                default_templates[(company, is_inter_state, state_code)] = (
+                    _get_default_template(
+                        categories, enabled_templates, company, state_code
+                    )
+                )
+
+    return frappe._dict(templates=templates, default_templates=default_templates)
+
+
+def _get_default_template(tax_categories, templates, company, state_code):
     default_tax = ""
 
     for tax_category in tax_categories:
-        if STATE_NUMBERS.get(tax_category.gst_state) == state_code or (
+        if (state_code and STATE_NUMBERS.get(tax_category.gst_state) == state_code) or (
             not default_tax and not tax_category.gst_state
         ):
-            default_tax = frappe.db.get_value(
-                master_doctype,
-                {"company": company, "disabled": 0, "tax_category": tax_category.name},
-                "name",
-            )
+            default_tax = templates.get((company, tax_category.name))
+
     return default_tax
 
 
-def validate_reverse_charge_transaction(doc, method=None):
+def validate_reverse_charge_transaction(doc, method=None, context=None):
     base_gst_tax = 0
     base_reverse_charge_booked = 0
 
     if not doc.is_reverse_charge:
         return
 
-    reverse_charge_accounts = get_gst_accounts_by_type(
-        doc.company, "Reverse Charge"
-    ).values()
-
-    input_gst_accounts = get_gst_accounts_by_type(doc.company, "Input").values()
+    context = context or GSTValidationContext(doc)
+    reverse_charge_accounts = context.get_account_set("Reverse Charge")
+    input_gst_accounts = context.get_account_set("Input")
 
     for tax in doc.get("taxes"):
         if tax.account_head in input_gst_accounts:
@@ -737,11 +992,13 @@ def is_export_without_payment_of_gst(doc):
 
 
 def validate_transaction(doc, method=None):
-    if ignore_gst_validations(doc):
+    context = GSTValidationContext(doc)
+
+    if ignore_gst_validations(doc, context):
         return False
 
     if doc.place_of_supply:
-        validate_place_of_supply(doc)
+        validate_place_of_supply(doc, context)
     else:
         doc.place_of_supply = get_place_of_supply(doc, doc.doctype)
 
@@ -766,28 +1023,32 @@ def validate_transaction(doc, method=None):
     elif not doc.gst_category:
         doc.gst_category = "Unregistered"
 
-    validate_overseas_gst_category(doc)
+    validate_overseas_gst_category(doc, context=context)
 
-    if is_sales_transaction := doc.doctype in SALES_DOCTYPES:
-        validate_hsn_codes(doc)
+    if is_sales_transaction := context.is_sales_transaction:
+        validate_hsn_codes(doc, context=context)
     else:
-        validate_reverse_charge_transaction(doc)
+        validate_reverse_charge_transaction(doc, context=context)
 
     validate_gst_category(
         doc.gst_category,
         doc.billing_address_gstin if is_sales_transaction else doc.supplier_gstin,
     )
 
-    valid_accounts = validate_gst_accounts(doc, is_sales_transaction) or ()
+    valid_accounts = (
+        validate_gst_accounts(doc, is_sales_transaction, context=context) or ()
+    )
     update_taxable_values(doc, valid_accounts)
 
 
-def ignore_gst_validations(doc):
+def ignore_gst_validations(doc, context=None):
+    context = context or GSTValidationContext(doc)
+
     if (
-        not is_indian_registered_company(doc)
+        not is_indian_registered_company(doc, context)
         or doc.get("is_opening") == "Yes"
         # If there are no GST items, then no need to proceed further
-        or validate_items(doc) is False
+        or validate_items(doc, context) is False
     ):
         return True
 
@@ -19,6 +19,7 @@ from finbyz_einvoice.gst_india.constants.custom_fields import (
 from finbyz_einvoice.gst_india.setup.property_setters import get_property_setters
 from finbyz_einvoice.gst_india.utils import get_data_file_path
 from finbyz_einvoice.gst_india.utils.custom_fields import toggle_custom_fields
+from finbyz_einvoice.gst_india.utils.hsn_codes import clear_hsn_index
 
 ITEM_VARIANT_FIELDNAMES = frozenset(("gst_hsn_code", "is_nil_exempt", "is_non_gst"))
 
@@ -118,6 +119,7 @@ def _create_hsn_codes():
         chunk_size=20_000,
     )
 
+    clear_hsn_index()
     frappe.flags.hsn_codes_corrected = 1
 
 
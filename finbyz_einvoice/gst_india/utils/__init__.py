@@ -1,3 +1,6 @@
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, NamedTuple, Optional
+
 from dateutil import parser
 from pytz import timezone
 from titlecase import titlecase as _titlecase
@@ -14,24 +17,26 @@ from erpnext.controllers.taxes_and_totals import (
 from finbyz_einvoice.gst_india.constants import (
     ABBREVIATIONS,
     GST_ACCOUNT_FIELDS,
+    GSTIN_CODE_POINT_CHARS,
     GSTIN_FORMATS,
     PAN_NUMBER,
     SALES_DOCTYPES,
-    STATE_NUMBERS,
     TCS,
     TIMEZONE,
     UOM_MAP,
 )
+from finbyz_einvoice.gst_india.constants.lookups import (
+    PLACE_OF_SUPPLY_OPTIONS,
+    PLACE_OF_SUPPLY_OPTIONS_TEXT,
+    STATES_BY_NUMBER,
+    UOMS_BY_DESCRIPTION,
+)
 
 
 def get_state(state_number):
     """Get state from State Number"""
 
-    state_number = str(state_number).zfill(2)
-
-    for state, code in STATE_NUMBERS.items():
-        if code == state_number:
-            return state
+    return STATES_BY_NUMBER.get(str(state_number).zfill(2))
 
 
 def load_doc(doctype, name, perm="read"):
@@ -182,22 +187,29 @@ def validate_gstin_check_digit(gstin, label="GSTIN"):
     """
     Function to validate the check digit of the GSTIN.
     """
+    if gstin[-1] != get_gstin_check_digit(gstin):
+        frappe.throw(
+            _(
+                """Invalid {0}! The check digit validation has failed. Please ensure you've typed the {0} correctly."""
+            ).format(label)
+        )
+
+
+def get_gstin_check_digit(gstin):
+    """
+    Returns the expected check digit (last character) of the GSTIN.
+    """
     factor = 1
     total = 0
-    code_point_chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    mod = len(code_point_chars)
+    mod = len(GSTIN_CODE_POINT_CHARS)
     input_chars = gstin[:-1]
     for char in input_chars:
-        digit = factor * code_point_chars.find(char)
+        digit = factor * GSTIN_CODE_POINT_CHARS.find(char)
         digit = (digit // mod) + (digit % mod)
         total += digit
         factor = 2 if factor == 1 else 1
-    if gstin[-1] != code_point_chars[((mod - (total % mod)) % mod)]:
-        frappe.throw(
-            _(
-                """Invalid {0}! The check digit validation has failed. Please ensure you've typed the {0} correctly."""
-            ).format(label)
-        )
+
+    return GSTIN_CODE_POINT_CHARS[((mod - (total % mod)) % mod)]
 
 
 def get_itemised_tax_breakup_data(doc, account_wise=False, hsn_wise=False):
@@ -277,27 +289,43 @@ def get_place_of_supply(party_details, doctype):
         return f"{state_code}-{state}"
 
 
-def get_gst_accounts_by_type(company, account_type, throw=True):
+class GSTAccountProfile(NamedTuple):
+    """GST Accounts of a Company for an Account Type, as set in GST Settings"""
+
+    company: str
+    account_type: str
+
+    # {"cgst_account": "CGST - TC", ...}, with all GST account fields
+    accounts: Mapping[str, Optional[str]]
+
+    # {"CGST - TC": "cgst", ...}
+    tax_types: Mapping[str, str]
+
+    # accounts that are set, for membership tests
+    account_set: FrozenSet[str]
+
+    export_reverse_charge_account: Optional[str]
+
+
+# {site: (modified of GST Settings, {(company, account_type): profile})}
+_gst_account_profiles = {}
+
+
+def get_gst_account_profile(company, account_type, throw=True):
     """
-    :param company: Company to get GST Accounts for
-    :param account_type: Account Type to get GST Accounts for
+    Returns GSTAccountProfile of the company for the account type.
 
-    Returns a dict of accounts:
-    {
-        "cgst_account": "ABC",
-        ...
-    }
+    Profiles are built once per process and rebuilt when GST Settings is updated.
     """
+
     if not company:
         frappe.throw(_("Please set Company first"))
 
-    settings = frappe.get_cached_doc("GST Settings", "GST Settings")
-    for row in settings.gst_accounts:
-        if row.account_type == account_type and row.company == company:
-            return frappe._dict((key, row.get(key)) for key in GST_ACCOUNT_FIELDS)
+    if profile := _get_gst_account_profiles().get((company, account_type)):
+        return profile
 
     if not throw:
-        return frappe._dict()
+        return _make_gst_account_profile(company, account_type)
 
     frappe.throw(
         _(
@@ -308,22 +336,85 @@ def get_gst_accounts_by_type(company, account_type, throw=True):
     )
 
 
+def get_gst_accounts_by_type(company, account_type, throw=True):
+    """
+    :param company: Company to get GST Accounts for
+    :param account_type: Account Type to get GST Accounts for
+
+    Returns a dict of accounts:
+    {
+        "cgst_account": "ABC",
+        ...
+    }
+    """
+
+    profile = get_gst_account_profile(company, account_type, throw=throw)
+    return frappe._dict(profile.accounts)
+
+
 def get_all_gst_accounts(company):
     if not company:
         frappe.throw(_("Please set Company first"))
 
+    return [
+        account
+        for profile in _get_gst_account_profiles().values()
+        if profile.company == company
+        for account in profile.accounts.values()
+        if account
+    ]
+
+
+def clear_gst_account_profiles():
+    _gst_account_profiles.pop(frappe.local.site, None)
+
+
+def _get_gst_account_profiles():
     settings = frappe.get_cached_doc("GST Settings")
 
-    accounts_list = []
-    for row in settings.gst_accounts:
-        if row.company != company:
-            continue
+    cached = _gst_account_profiles.get(frappe.local.site)
+    if cached and cached[0] == settings.modified:
+        return cached[1]
 
-        for account in GST_ACCOUNT_FIELDS:
-            if gst_account := row.get(account):
-                accounts_list.append(gst_account)
+    profiles = {}
+    for row in settings.gst_accounts:
+        key = (row.company, row.account_type)
+        if key not in profiles:
+            profiles[key] = _make_gst_account_profile(*key, row)
+
+    _gst_account_profiles[frappe.local.site] = (settings.modified, profiles)
+    return profiles
+
+
+def _make_gst_account_profile(company, account_type, row=None):
+    if not row:
+        return GSTAccountProfile(
+            company=company,
+            account_type=account_type,
+            accounts=MappingProxyType({}),
+            tax_types=MappingProxyType({}),
+            account_set=frozenset(),
+            export_reverse_charge_account=None,
+        )
 
-    return accounts_list
+    accounts = {fieldname: row.get(fieldname) for fieldname in GST_ACCOUNT_FIELDS}
+
+    return GSTAccountProfile(
+        company=company,
+        account_type=account_type,
+        accounts=MappingProxyType(accounts),
+        tax_types=MappingProxyType(
+            # remove "_account" from "cgst_account"
+            {
+                account: fieldname[:-8]
+                for fieldname, account in accounts.items()
+                if account
+            }
+        ),
+        account_set=frozenset(account for account in accounts.values() if account),
+        # set for Finbyz Export with reverse charge
+        export_reverse_charge_account=row.get("export_reverse_charge_account"),
+    )
 
 
 def parse_datetime(value, day_first=False):
@@ -404,27 +495,45 @@ def get_gst_uom(uom, settings=None):
     """Returns the GST UOM from ERPNext UOM"""
     settings = settings or frappe.get_cached_doc("GST Settings")
 
-    for row in settings.get("gst_uom_map"):
-        if row.uom == uom:
-            return row.gst_uom.split("(")[0].strip()
+    gst_uom_map = _get_gst_uom_map(settings)
+    if uom in gst_uom_map:
+        return gst_uom_map[uom]
 
     uom = uom.upper()
     if uom in UOM_MAP:
         return uom
 
-    return next((k for k, v in UOM_MAP.items() if v == uom), "OTH")
+    return UOMS_BY_DESCRIPTION.get(uom, "OTH")
 
 
-def get_place_of_supply_options(*, as_list=False, with_other_countries=False):
-    options = []
+# {site: (modified of GST Settings, {uom: gst uom})}
+_gst_uom_maps = {}
+
 
-    for state_name, state_number in STATE_NUMBERS.items():
-        options.append(f"{state_number}-{state_name}")
+def clear_gst_uom_maps():
+    _gst_uom_maps.pop(frappe.local.site, None)
 
-    if with_other_countries:
-        options.append("96-Other Countries")
+
+def _get_gst_uom_map(settings):
+    """UOM Map of GST Settings, built once per process and rebuilt when updated"""
+
+    cached = _gst_uom_maps.get(frappe.local.site)
+    if cached and cached[0] == settings.modified:
+        return cached[1]
+
+    gst_uom_map = {}
+    for row in settings.get("gst_uom_map"):
+        gst_uom_map.setdefault(row.uom, row.gst_uom.split("(")[0].strip())
+
+    gst_uom_map = MappingProxyType(gst_uom_map)
+    _gst_uom_maps[frappe.local.site] = (settings.modified, gst_uom_map)
+    return gst_uom_map
+
+
+def get_place_of_supply_options(*, as_list=False, with_other_countries=False):
+    with_other_countries = bool(with_other_countries)
 
     if as_list:
-        return options
+        return list(PLACE_OF_SUPPLY_OPTIONS[with_other_countries])
 
-    return "\n".join(sorted(options))
+    return PLACE_OF_SUPPLY_OPTIONS_TEXT[with_other_countries]
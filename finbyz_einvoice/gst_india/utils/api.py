@@ -1,14 +1,190 @@
+import time
+
+from redis.exceptions import LockError
+
 import frappe
+from frappe.utils import add_days, cint, flt, now, now_datetime
+
+INTEGRATION_REQUEST_SERVICE = "Finbyz Einvoice API"
+BUFFER_KEY = "integration_request_buffer"
+FLUSH_INTERVAL_KEY = "integration_request_flush_interval"
+FLUSH_LOCK_KEY = "integration_request_flush_lock"
+FLUSH_LOCK_TIMEOUT = 300  # seconds
+
+DEFAULT_FLUSH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 10  # seconds
+DEFAULT_MAX_PAYLOAD_LENGTH = 100_000  # characters per field
+DEFAULT_RETENTION_DAYS = 90
+
+INTEGRATION_REQUEST_FIELDS = (
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "docstatus",
+    "integration_request_service",
+    "request_id",
+    "url",
+    "request_headers",
+    "data",
+    "output",
+    "error",
+    "status",
+    "reference_doctype",
+    "reference_docname",
+)
 
 
 def enqueue_integration_request(**kwargs):
+    """
+    Buffer an Integration Request in Redis, to be inserted in bulk.
+
+    Buffer is flushed by a background job for every `integration_request_flush_size`
+    entries (default: 50), and once `integration_request_flush_interval` seconds
+    (default: 10) have passed since the first entry after the previous flush.
+    Entries left in the buffer are flushed by the scheduler.
+    """
+
+    if frappe.flags.in_test:
+        return create_integration_request(**kwargs)
+
+    cache = frappe.cache()
+    entry = get_integration_request_values(**kwargs)
+    buffered = cache.rpush(
+        cache.make_key(BUFFER_KEY), frappe.as_json(entry, indent=None)
+    )
+
+    flush_size = cint(frappe.conf.integration_request_flush_size) or DEFAULT_FLUSH_SIZE
+    flush_interval = (
+        flt(frappe.conf.integration_request_flush_interval) or DEFAULT_FLUSH_INTERVAL
+    )
+
+    # one flush per `flush_size` entries
+    if buffered % flush_size and not _flush_interval_elapsed(flush_interval):
+        return
+
     frappe.enqueue(
-        "finbyz_einvoice.gst_india.utils.api.create_integration_request",
-        **kwargs,
+        "finbyz_einvoice.gst_india.utils.api.flush_integration_requests",
+        queue="short",
     )
 
 
-def create_integration_request(
+def _flush_interval_elapsed(flush_interval):
+    """
+    First entry after a flush starts the interval.
+    Returns True only once, for the first entry after the interval has elapsed.
+    """
+
+    cache = frappe.cache()
+    key = cache.make_key(FLUSH_INTERVAL_KEY)
+
+    if not (started_at := cache.get(key)):
+        cache.set(key, time.time(), nx=True)
+        return False
+
+    return time.time() - flt(started_at) >= flush_interval and cache.delete(key)
+
+
+def flush_integration_requests():
+    """
+    Insert buffered Integration Requests, one bulk insert per batch.
+
+    Entries are removed from the buffer only after they are committed, so that
+    they are not lost if the insert fails. Only one flush runs at a time.
+    """
+
+    cache = frappe.cache()
+    key = cache.make_key(BUFFER_KEY)
+    batch_size = cint(frappe.conf.integration_request_flush_size) or DEFAULT_FLUSH_SIZE
+
+    # entries are flushed by the running flush
+    lock = cache.lock(cache.make_key(FLUSH_LOCK_KEY), timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return
+
+    try:
+        while entries := cache.lrange(key, 0, batch_size - 1):
+            _insert_integration_requests(
+                [
+                    tuple(entry.get(field) for field in INTEGRATION_REQUEST_FIELDS)
+                    for entry in map(frappe.parse_json, entries)
+                ]
+            )
+
+            # new entries are only appended
+            cache.ltrim(key, len(entries), -1)
+
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # lock expired while flushing
+            pass
+
+
+def _insert_integration_requests(values):
+    try:
+        # entries may have been inserted by a flush that failed before removing
+        # them from the buffer
+        frappe.db.bulk_insert(
+            "Integration Request",
+            INTEGRATION_REQUEST_FIELDS,
+            values,
+            ignore_duplicates=True,
+        )
+
+        # nosemgrep
+        frappe.db.commit()
+        return
+
+    except Exception:
+        frappe.db.rollback()
+
+    # insert one by one, to skip entries that can't be inserted
+    failed = []
+    for row in values:
+        try:
+            frappe.db.bulk_insert(
+                "Integration Request",
+                INTEGRATION_REQUEST_FIELDS,
+                [row],
+                ignore_duplicates=True,
+            )
+
+            # nosemgrep
+            frappe.db.commit()
+
+        except Exception:
+            frappe.db.rollback()
+            failed.append(row)
+
+    if not failed:
+        return
+
+    # raises if the database is unavailable, keeping entries in the buffer
+    frappe.db.sql("SELECT 1")
+
+    for row in failed:
+        frappe.log_error(
+            title="Failed to insert buffered Integration Request",
+            message=frappe.as_json(dict(zip(INTEGRATION_REQUEST_FIELDS, row))),
+        )
+
+    # nosemgrep
+    frappe.db.commit()
+
+
+def create_integration_request(**kwargs):
+    values = get_integration_request_values(**kwargs)
+    values.pop("name")
+
+    return frappe.get_doc({"doctype": "Integration Request", **values}).insert(
+        ignore_permissions=True
+    )
+
+
+def get_integration_request_values(
     url=None,
     request_id=None,
     request_headers=None,
@@ -18,29 +194,67 @@ def create_integration_request(
     reference_doctype=None,
     reference_name=None,
 ):
+    timestamp = now()
+    user = frappe.session.user if frappe.session else "Administrator"
+
+    return {
+        "name": frappe.generate_hash(length=10),
+        "creation": timestamp,
+        "modified": timestamp,
+        "owner": user,
+        "modified_by": user,
+        "docstatus": 0,
+        "integration_request_service": INTEGRATION_REQUEST_SERVICE,
+        "request_id": request_id,
+        "url": url,
+        "request_headers": compact_json(request_headers),
+        "data": compact_json(data),
+        "output": compact_json(output),
+        "error": compact_json(error),
+        "status": "Failed" if error else "Completed",
+        "reference_doctype": reference_doctype,
+        "reference_docname": reference_name,
+    }
+
+
+def compact_json(obj):
+    """
+    Serialize without indentation and truncate to `integration_request_max_payload`
+    characters (default: 100000, 0 to disable).
+    """
 
-    return frappe.get_doc(
-        {
-            "doctype": "Integration Request",
-            "integration_request_service": "Finbyz Einvoice API",
-            "request_id": request_id,
-            "url": url,
-            "request_headers": pretty_json(request_headers),
-            "data": pretty_json(data),
-            "output": pretty_json(output),
-            "error": pretty_json(error),
-            "status": "Failed" if error else "Completed",
-            "reference_doctype": reference_doctype,
-            "reference_docname": reference_name,
-        }
-    ).insert(ignore_permissions=True)
-
-
-def pretty_json(obj):
     if not obj:
         return ""
 
-    if isinstance(obj, str):
-        return obj
+    if not isinstance(obj, str):
+        obj = frappe.as_json(obj, indent=None, separators=(",", ":"))
+
+    max_length = cint(
+        frappe.conf.get("integration_request_max_payload", DEFAULT_MAX_PAYLOAD_LENGTH)
+    )
+
+    if max_length and len(obj) > max_length:
+        return f"{obj[:max_length]}... (truncated {len(obj) - max_length} characters)"
+
+    return obj
 
-    return frappe.as_json(obj, indent=4)
+
+def delete_old_integration_requests():
+    """
+    Delete Integration Requests older than `integration_request_retention_days`
+    (default: 90, 0 to keep all).
+    """
+
+    retention_days = cint(
+        frappe.conf.get("integration_request_retention_days", DEFAULT_RETENTION_DAYS)
+    )
+    if not retention_days:
+        return
+
+    frappe.db.delete(
+        "Integration Request",
+        {
+            "integration_request_service": INTEGRATION_REQUEST_SERVICE,
+            "creation": ("<", add_days(now_datetime(), -retention_days)),
+        },
+    )
@@ -0,0 +1,193 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import frappe
+
+PROGRESS_INTERVAL = 1  # seconds
+
+
+def run_concurrently(
+    method,
+    items,
+    *,
+    get_group=None,
+    max_workers=8,
+    max_per_group=4,
+    on_error=None,
+    on_progress=None,
+):
+    """
+    Run `method(item)` for all items in a bounded pool of worker threads.
+
+    - Each worker thread has its own database connection. Changes made for an item
+      are committed as soon as `method` returns, and rolled back if it raises.
+    - Not more than `max_per_group` items of the same group (as returned by
+      `get_group(item)`) are processed at the same time.
+    - `on_error(item, exception)` is called in the worker thread after rollback,
+      and changes made by it (e.g. error logs) are committed.
+    - `on_progress(progress)` is called in the calling thread, at most once per
+      second and once after all items are processed.
+
+    Returns a dict of {item: exception or None}.
+    """
+
+    return ConcurrentRunner(
+        method, items, get_group, max_workers, max_per_group, on_error, on_progress
+    ).run()
+
+
+def summarize(results):
+    """
+    Returns a plain summary of results of `run_concurrently`, e.g. as result of a
+    background job, instead of the exceptions.
+    """
+
+    return {
+        "total": len(results),
+        "failed": [item for item, error in results.items() if error],
+    }
+
+
+class ConcurrentRunner:
+    def __init__(
+        self,
+        method,
+        items,
+        get_group,
+        max_workers,
+        max_per_group,
+        on_error,
+        on_progress,
+    ):
+        self.method = method
+        self.items = list(dict.fromkeys(items))
+        self.get_group = get_group or (lambda item: None)
+        self.max_workers = max(1, min(max_workers, len(self.items)))
+        self.max_per_group = max(1, max_per_group)
+        self.on_error = on_error
+        self.on_progress = on_progress
+
+        self.tasks = queue.Queue()
+        self.done = queue.Queue()
+        self.results = {}
+        self.last_progress_at = 0
+
+        # worker threads connect to the same site as the calling thread
+        self.site = frappe.local.site
+        self.sites_path = frappe.local.sites_path
+        self.user = frappe.session.user
+
+    def run(self):
+        if not self.items:
+            return self.results
+
+        pending = {}
+        for item in self.items:
+            pending.setdefault(self.get_group(item), deque()).append(item)
+
+        in_flight = dict.fromkeys(pending, 0)
+        workers = [
+            threading.Thread(target=self.work, daemon=True)
+            for _ in range(self.max_workers)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        try:
+            available_slots = self.max_workers
+            while len(self.results) < len(self.items):
+                # dispatch items of groups that are below their limit
+                for group, group_items in pending.items():
+                    while (
+                        group_items
+                        and available_slots
+                        and in_flight[group] < self.max_per_group
+                    ):
+                        self.tasks.put((group, group_items.popleft()))
+                        in_flight[group] += 1
+                        available_slots -= 1
+
+                group, item, error = self.done.get()
+                self.results[item] = error
+                in_flight[group] -= 1
+                available_slots += 1
+
+                self.publish_progress()
+
+        finally:
+            for _ in workers:
+                self.tasks.put(None)
+
+            for worker in workers:
+                worker.join()
+
+        self.publish_progress(force=True)
+        return self.results
+
+    def work(self):
+        try:
+            frappe.init(site=self.site, sites_path=self.sites_path)
+            frappe.connect()
+            frappe.set_user(self.user)
+
+        except Exception as e:
+            # fail items picked up by this worker instead of leaving them pending
+            while task := self.tasks.get():
+                self.done.put((*task, e))
+
+            return
+
+        try:
+            while task := self.tasks.get():
+                error = None
+
+                # exactly one result for each task, else `run` waits forever
+                try:
+                    error = self.process(task[1])
+                except Exception as e:
+                    error = e
+                finally:
+                    self.done.put((*task, error))
+
+        finally:
+            frappe.destroy()
+
+    def process(self, item):
+        try:
+            self.method(item)
+            # nosemgrep
+            frappe.db.commit()
+
+        except Exception as e:
+            frappe.db.rollback()
+
+            if self.on_error:
+                try:
+                    self.on_error(item, e)
+                    # nosemgrep
+                    frappe.db.commit()
+
+                except Exception:
+                    frappe.db.rollback()
+
+            return e
+
+    def publish_progress(self, force=False):
+        if not self.on_progress:
+            return
+
+        now = time.monotonic()
+        if not force and now - self.last_progress_at < PROGRESS_INTERVAL:
+            return
+
+        self.last_progress_at = now
+        self.on_progress(
+            frappe._dict(
+                total=len(self.items),
+                processed=len(self.results),
+                failed=sum(1 for error in self.results.values() if error),
+            )
+        )
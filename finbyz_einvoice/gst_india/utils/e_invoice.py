@@ -1,4 +1,7 @@
+import hashlib
 import json
+import math
+import traceback
 
 import jwt
 
@@ -6,6 +9,7 @@ import frappe
 from frappe import _
 from frappe.utils import (
     add_to_date,
+    cint,
     cstr,
     format_date,
     get_datetime,
@@ -14,6 +18,10 @@ from frappe.utils import (
 )
 
 from finbyz_einvoice.gst_india.api_classes.e_invoice import EInvoiceAPI
+from finbyz_einvoice.gst_india.api_classes.throttle import (
+    GSPUnavailableError,
+    run_when_available,
+)
 from finbyz_einvoice.gst_india.constants import (
     EXPORT_TYPES,
     GST_CATEGORIES,
@@ -30,15 +38,28 @@ from finbyz_einvoice.gst_india.utils import (
     send_updated_doc,
     update_onload,
 )
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently, summarize
 from finbyz_einvoice.gst_india.utils.e_waybill import (
     _cancel_e_waybill,
     log_and_process_e_waybill_generation,
 )
+from finbyz_einvoice.gst_india.utils.payload import ListOf, Schema, constant, dumps
 from finbyz_einvoice.gst_india.utils.transaction_data import (
     GSTTransactionData,
+    prefetch_transaction_data,
     validate_non_gst_items,
 )
 
+DEFAULT_BULK_WORKERS = 8
+DEFAULT_BULK_WORKERS_PER_GSTIN = 4
+
+PAYLOAD_CACHE_KEY = "e_invoice_payload"
+PAYLOAD_CACHE_EXPIRY = 6 * 60 * 60  # seconds
+
+RESPONSE_CACHE_KEY = "e_invoice_response"
+# IRN details can't be fetched after 2 days of generation
+RESPONSE_CACHE_EXPIRY = 2 * 24 * 60 * 60  # seconds
+
 
 @frappe.whitelist()
 def enqueue_bulk_e_invoice_generation(docnames):
@@ -53,10 +74,12 @@ def enqueue_bulk_e_invoice_generation(docnames):
         frappe.throw(_("Please enable e-Invoicing in GST Settings first"))
 
     docnames = frappe.parse_json(docnames) if docnames.startswith("[") else [docnames]
+    # worst case: all invoices belong to the same Company GSTIN
+    batches = math.ceil(len(docnames) / min(get_bulk_generation_limits()))
     rq_job = frappe.enqueue(
         "finbyz_einvoice.gst_india.utils.e_invoice.generate_e_invoices",
         queue="long",
-        timeout=len(docnames) * 240,  # 4 mins per e-Invoice
+        timeout=batches * 240,  # 4 mins per e-Invoice
         docnames=docnames,
     )
 
@@ -67,45 +90,92 @@ def generate_e_invoices(docnames):
     """
     Bulk generate e-Invoices for the given Sales Invoices.
     Permission checks are done in the `generate_e_invoice` function.
+
+    e-Invoices are generated concurrently, each committed individually.
+    Masters referenced by the invoices (addresses, batches, etc.) are fetched
+    together before generation.
+
+    Tunable using site config:
+    - `e_invoice_bulk_workers`: e-Invoices generated at a time (default: 8)
+    - `e_invoice_bulk_workers_per_gstin`: e-Invoices generated at a time
+      for the same Company GSTIN (default: 4)
     """
 
-    for docname in docnames:
-        try:
-            generate_e_invoice(docname)
+    company_gstins = dict(
+        frappe.get_all(
+            "Sales Invoice",
+            filters={"name": ("in", docnames)},
+            fields=("name", "company_gstin"),
+            as_list=True,
+        )
+    )
+    user = frappe.session.user
+    prefetched = prefetch_transaction_data("Sales Invoice", docnames)
 
-        except Exception:
-            frappe.log_error(
-                title=_("e-Invoice generation failed for Sales Invoice {0}").format(
-                    docname
-                ),
-                message=frappe.get_traceback(),
-            )
+    def log_error(docname, exception):
+        frappe.log_error(
+            title=_("e-Invoice generation failed for Sales Invoice {0}").format(
+                docname
+            ),
+            message="".join(
+                traceback.format_exception(
+                    type(exception), exception, exception.__traceback__
+                )
+            ),
+        )
+
+    def publish_progress(progress):
+        frappe.publish_realtime(
+            "bulk_e_invoice_generation_progress", progress, user=user
+        )
+
+    def generate(docname):
+        # pause instead of failing remaining invoices while GSP is unavailable
+        run_when_available(
+            EInvoiceAPI.API_NAME, _generate_e_invoice, docname, prefetched=prefetched
+        )
+
+    max_workers, max_per_gstin = get_bulk_generation_limits()
+    results = run_concurrently(
+        generate,
+        docnames,
+        get_group=company_gstins.get,
+        max_workers=max_workers,
+        max_per_group=max_per_gstin,
+        on_error=log_error,
+        on_progress=publish_progress,
+    )
+
+    # result of the background job, errors are in Error Log
+    return summarize(results)
 
-        finally:
-            # each e-Invoice needs to be committed individually
-            # nosemgrep
-            frappe.db.commit()
 
+def get_bulk_generation_limits():
+    return (
+        cint(frappe.conf.e_invoice_bulk_workers) or DEFAULT_BULK_WORKERS,
+        cint(frappe.conf.e_invoice_bulk_workers_per_gstin)
+        or DEFAULT_BULK_WORKERS_PER_GSTIN,
+    )
 
 
 @frappe.whitelist()
 def generate_e_invoice(docname, throw=True):
+    return _generate_e_invoice(docname, throw)
+
+
+def _generate_e_invoice(docname, throw=True, prefetched=None):
     doc = load_doc("Sales Invoice", docname, "submit")
     try:
-        data = EInvoiceData(doc).get_data()
-        api = EInvoiceAPI(doc)
-        result = api.generate_irn(data)
-
-        # Handle Duplicate IRN
-        if result.InfCd == "DUPIRN":
-            response = api.get_e_invoice_by_irn(result.Desc.Irn)
+        data = get_e_invoice_payload(doc, prefetched)
+        request_hash = get_request_hash(data)
 
-            # Handle error 2283:
-            # IRN details cannot be provided as it is generated more than 2 days ago
-            result = result.Desc if response.error_code == "2283" else response
+        # reuse response of an earlier attempt with the same payload, if any
+        if not (result := get_stored_response(doc, request_hash)):
+            result = generate_irn(doc, data, request_hash)
 
     except frappe.ValidationError as e:
-        if throw:
+        # auto-generation is paused and resumed by `run_when_available`
+        if throw or isinstance(e, GSPUnavailableError):
             raise e
 
         frappe.clear_last_message()
@@ -177,6 +247,89 @@ def generate_e_invoice(docname, throw=True):
 
     return send_updated_doc(doc)
 
+
+def generate_irn(doc, data, request_hash):
+    api = EInvoiceAPI(doc)
+
+    try:
+        result = api.generate_irn(data)
+    except frappe.ValidationError:
+        # payload has been rejected, rebuild it on retry
+        frappe.cache().delete_value(get_payload_cache_key(doc))
+        raise
+
+    # Handle Duplicate IRN
+    if result.InfCd == "DUPIRN":
+        stored_result = get_stored_response(doc)
+
+        if stored_result and stored_result.Irn == result.Desc.Irn:
+            result = stored_result
+
+        else:
+            response = api.get_e_invoice_by_irn(result.Desc.Irn)
+
+            # Handle error 2283:
+            # IRN details cannot be provided as it is generated more than 2 days ago
+            result = result.Desc if response.error_code == "2283" else response
+
+    frappe.cache().set_value(
+        get_response_cache_key(doc),
+        frappe._dict(request_hash=request_hash, result=result),
+        expires_in_sec=RESPONSE_CACHE_EXPIRY,
+    )
+    frappe.cache().delete_value(get_payload_cache_key(doc))
+
+    return result
+
+
+def get_e_invoice_payload(doc, prefetched=None):
+    """
+    Returns e-Invoice payload of the document, built once per version of the
+    document and GST Settings so that retries send the same payload.
+    """
+
+    e_invoice_data = EInvoiceData(doc, prefetched=prefetched)
+    cache_key = get_payload_cache_key(doc)
+
+    if data := frappe.cache().get_value(cache_key):
+        e_invoice_data.validate_transaction()
+        return data
+
+    data = e_invoice_data.get_data()
+    frappe.cache().set_value(cache_key, data, expires_in_sec=PAYLOAD_CACHE_EXPIRY)
+
+    return data
+
+
+def get_stored_response(doc, request_hash=None):
+    """
+    Returns result of the last IRN generated for the document.
+    If `request_hash` is given, only if it was generated for the same payload.
+    """
+
+    stored = frappe.cache().get_value(get_response_cache_key(doc))
+    if not stored or (request_hash and stored.request_hash != request_hash):
+        return
+
+    return stored.result
+
+
+def get_request_hash(data):
+    return hashlib.sha256(dumps(data)).hexdigest()
+
+
+def get_payload_cache_key(doc):
+    settings_modified = frappe.get_cached_doc("GST Settings").modified
+    return (
+        f"{PAYLOAD_CACHE_KEY}:{doc.doctype}:{doc.name}:{doc.modified}"
+        f":{settings_modified}"
+    )
+
+
+def get_response_cache_key(doc):
+    return f"{RESPONSE_CACHE_KEY}:{doc.doctype}:{doc.name}"
+
+
 @frappe.whitelist()
 def cancel_e_invoice(docname, values):
     doc = load_doc("Sales Invoice", docname, "cancel")
@@ -209,6 +362,7 @@ def cancel_e_invoice(docname, values):
     )
 
     doc.db_set({"einvoice_status": "Cancelled", "irn": ""})
+    frappe.cache().delete_value(get_response_cache_key(doc))
 
     frappe.msgprint(
         _("e-Invoice cancelled successfully"),
@@ -324,14 +478,162 @@ def validate_if_e_invoice_can_be_cancelled(doc):
         )
 
 
+E_INVOICE_ITEM_SCHEMA = Schema(
+    {
+        "SlNo": lambda item: cstr(item.item_no),
+        "PrdDesc": "item_name",
+        "IsServc": "is_service_item",
+        "HsnCd": "hsn_code",
+        "Barcde": "barcode",
+        "Unit": "uom",
+        "Qty": "qty",
+        "UnitPrice": "unit_rate",
+        "TotAmt": "taxable_value",
+        "Discount": "discount_amount",
+        "AssAmt": "taxable_value",
+        "PrdSlNo": "serial_no",
+        "GstRt": "tax_rate",
+        "IgstAmt": "igst_amount",
+        "CgstAmt": "cgst_amount",
+        "SgstAmt": "sgst_amount",
+        "CesRt": "cess_rate",
+        "CesAmt": "cess_amount",
+        "CesNonAdvlAmt": "cess_non_advol_amount",
+        "TotItemVal": "total_value",
+        "BchDtls": Schema({"Nm": "batch_no", "ExpDt": "batch_expiry_date"}),
+    }
+)
+
+# IRP schema v1.1, dumped from `EInvoiceData`
+E_INVOICE_SCHEMA = Schema(
+    {
+        "Version": constant("1.1"),
+        "TranDtls": Schema(
+            {
+                "TaxSch": "tax_scheme",
+                "SupTyp": "supply_type",
+                "RegRev": "reverse_charge",
+                "EcmGstin": "ecommerce_gstin",
+            },
+            source="transaction_details",
+        ),
+        "DocDtls": Schema(
+            {"Typ": "invoice_type", "No": "name", "Dt": "date"},
+            source="transaction_details",
+        ),
+        "SellerDtls": Schema(
+            {
+                "Gstin": "gstin",
+                "LglNm": "legal_name",
+                "TrdNm": "legal_name",
+                "Loc": "city",
+                "Pin": "pincode",
+                "Stcd": "state_number",
+                "Addr1": "address_line1",
+                "Addr2": "address_line2",
+            },
+            source="company_address",
+        ),
+        "BuyerDtls": Schema(
+            {
+                "Gstin": "billing_address.gstin",
+                "LglNm": "billing_address.legal_name",
+                "TrdNm": "billing_address.legal_name",
+                "Addr1": "billing_address.address_line1",
+                "Addr2": "billing_address.address_line2",
+                "Loc": "billing_address.city",
+                "Pin": "billing_address.pincode",
+                "Stcd": "billing_address.state_number",
+                "Pos": "transaction_details.place_of_supply",
+            }
+        ),
+        "ItemList": ListOf("all_item_details", E_INVOICE_ITEM_SCHEMA),
+        "ValDtls": Schema(
+            {
+                "AssVal": "total",
+                "CgstVal": "total_cgst_amount",
+                "SgstVal": "total_sgst_amount",
+                "IgstVal": "total_igst_amount",
+                "CesVal": lambda details: (
+                    details.total_cess_amount + details.total_cess_non_advol_amount
+                ),
+                "Discount": "discount_amount",
+                "RndOffAmt": "rounding_adjustment",
+                "OthChrg": "other_charges",
+                "TotInvVal": "grand_total",
+                "TotInvValFc": "grand_total_in_foreign_currency",
+            },
+            source="transaction_details",
+        ),
+        "PayDtls": Schema(
+            {
+                "Nm": "payee_name",
+                "Mode": "mode_of_payment",
+                "PayTerm": "payment_terms",
+                "PaidAmt": "paid_amount",
+                "PaymtDue": "outstanding_amount",
+                "CrDay": "credit_days",
+            },
+            source="transaction_details",
+        ),
+        "RefDtls": Schema(
+            {
+                "PrecDocDtls": ListOf(
+                    lambda details: (details,),
+                    Schema({"InvNo": "original_name", "InvDt": "original_date"}),
+                )
+            },
+            source="transaction_details",
+        ),
+        "EwbDtls": Schema(
+            {
+                "TransId": "gst_transporter_id",
+                "TransName": "transporter_name",
+                "TransMode": lambda details: cstr(details.mode_of_transport),
+                "Distance": "distance",
+                "TransDocNo": "lr_no",
+                "TransDocDt": "lr_date",
+                "VehNo": "vehicle_no",
+                "VehType": "vehicle_type",
+            },
+            source="transaction_details",
+        ),
+        "DispDtls": Schema(
+            {
+                "Nm": "address_title",
+                "Addr1": "address_line1",
+                "Addr2": "address_line2",
+                "Loc": "city",
+                "Pin": "pincode",
+                "Stcd": "state_number",
+            },
+            source="dispatch_address",
+        ),
+        "ShipDtls": Schema(
+            {
+                "Gstin": "gstin",
+                "LglNm": "address_title",
+                "TrdNm": "address_title",
+                "Addr1": "address_line1",
+                "Addr2": "address_line2",
+                "Loc": "city",
+                "Pin": "pincode",
+                "Stcd": "state_number",
+            },
+            source="shipping_address",
+        ),
+    }
+)
+
+
 class EInvoiceData(GSTTransactionData):
     def get_data(self):
         self.validate_transaction()
         self.set_transaction_details()
-        self.set_item_list()
+        self.all_item_details = self.get_all_item_details()
         self.set_transporter_details()
         self.set_party_address_details()
-        return self.sanitize_data(self.get_invoice_data())
+        return self.get_invoice_data()
 
     def validate_transaction(self):
         super().validate_transaction()
@@ -365,8 +667,10 @@ class EInvoiceData(GSTTransactionData):
         if batch_no := self.sanitize_value(
             item.batch_no, max_length=20, truncate=False
         ):
-            batch_expiry_date = frappe.db.get_value(
-                "Batch", item.batch_no, "expiry_date"
+            batch_expiry_date = self.get_prefetched(
+                "batch_expiry_dates",
+                item.batch_no,
+                lambda: frappe.db.get_value("Batch", item.batch_no, "expiry_date"),
             )
             item_details.update(
                 {
@@ -391,8 +695,12 @@ class EInvoiceData(GSTTransactionData):
                     {
                         "original_name": return_against,
                         "original_date": format_date(
-                            frappe.db.get_value(
-                                "Sales Invoice", return_against, "posting_date"
+                            self.get_prefetched(
+                                "posting_dates",
+                                return_against,
+                                lambda: frappe.db.get_value(
+                                    "Sales Invoice", return_against, "posting_date"
+                                ),
                             ),
                             self.DATE_FORMAT,
                         ),
@@ -543,132 +851,7 @@ class EInvoiceData(GSTTransactionData):
                 self.dispatch_address,
             )
 
-        invoice_data = {
-            "Version": "1.1",
-            "TranDtls": {
-                "TaxSch": self.transaction_details.tax_scheme,
-                "SupTyp": self.transaction_details.supply_type,
-                "RegRev": self.transaction_details.reverse_charge,
-                "EcmGstin": self.transaction_details.ecommerce_gstin,
-            },
-            "DocDtls": {
-                "Typ": self.transaction_details.invoice_type,
-                "No": self.transaction_details.name,
-                "Dt": self.transaction_details.date,
-            },
-            "SellerDtls": {
-                "Gstin": self.company_address.gstin,
-                "LglNm": self.company_address.legal_name,
-                "TrdNm": self.company_address.legal_name,
-                "Loc": self.company_address.city,
-                "Pin": self.company_address.pincode,
-                "Stcd": self.company_address.state_number,
-                "Addr1": self.company_address.address_line1,
-                "Addr2": self.company_address.address_line2,
-            },
-            "BuyerDtls": {
-                "Gstin": self.billing_address.gstin,
-                "LglNm": self.billing_address.legal_name,
-                "TrdNm": self.billing_address.legal_name,
-                "Addr1": self.billing_address.address_line1,
-                "Addr2": self.billing_address.address_line2,
-                "Loc": self.billing_address.city,
-                "Pin": self.billing_address.pincode,
-                "Stcd": self.billing_address.state_number,
-                "Pos": self.transaction_details.place_of_supply,
-            },
-            "ItemList": self.item_list,
-            "ValDtls": {
-                "AssVal": self.transaction_details.total,
-                "CgstVal": self.transaction_details.total_cgst_amount,
-                "SgstVal": self.transaction_details.total_sgst_amount,
-                "IgstVal": self.transaction_details.total_igst_amount,
-                "CesVal": (
-                    self.transaction_details.total_cess_amount
-                    + self.transaction_details.total_cess_non_advol_amount
-                ),
-                "Discount": self.transaction_details.discount_amount,
-                "RndOffAmt": self.transaction_details.rounding_adjustment,
-                "OthChrg": self.transaction_details.other_charges,
-                "TotInvVal": self.transaction_details.grand_total,
-                "TotInvValFc": self.transaction_details.grand_total_in_foreign_currency,
-            },
-            "PayDtls": {
-                "Nm": self.transaction_details.payee_name,
-                "Mode": self.transaction_details.mode_of_payment,
-                "PayTerm": self.transaction_details.payment_terms,
-                "PaidAmt": self.transaction_details.paid_amount,
-                "PaymtDue": self.transaction_details.outstanding_amount,
-                "CrDay": self.transaction_details.credit_days,
-            },
-            "RefDtls": {
-                "PrecDocDtls": [
-                    {
-                        "InvNo": self.transaction_details.original_name,
-                        "InvDt": self.transaction_details.original_date,
-                    }
-                ]
-            },
-            "EwbDtls": {
-                "TransId": self.transaction_details.gst_transporter_id,
-                "TransName": self.transaction_details.transporter_name,
-                "TransMode": cstr(self.transaction_details.mode_of_transport),
-                "Distance": self.transaction_details.distance,
-                "TransDocNo": self.transaction_details.lr_no,
-                "TransDocDt": self.transaction_details.lr_date,
-                "VehNo": self.transaction_details.vehicle_no,
-                "VehType": self.transaction_details.vehicle_type,
-            },
-        }
-
-        if self.dispatch_address:
-            invoice_data["DispDtls"] = {
-                "Nm": self.dispatch_address.address_title,
-                "Addr1": self.dispatch_address.address_line1,
-                "Addr2": self.dispatch_address.address_line2,
-                "Loc": self.dispatch_address.city,
-                "Pin": self.dispatch_address.pincode,
-                "Stcd": self.dispatch_address.state_number,
-            }
-
-        if self.shipping_address:
-            invoice_data["ShipDtls"] = {
-                "Gstin": self.shipping_address.gstin,
-                "LglNm": self.shipping_address.address_title,
-                "TrdNm": self.shipping_address.address_title,
-                "Addr1": self.shipping_address.address_line1,
-                "Addr2": self.shipping_address.address_line2,
-                "Loc": self.shipping_address.city,
-                "Pin": self.shipping_address.pincode,
-                "Stcd": self.shipping_address.state_number,
-            }
-
-        return invoice_data
+        return E_INVOICE_SCHEMA.dump(self)
 
     def get_item_data(self, item_details):
-        return {
-            "SlNo": cstr(item_details.item_no),
-            "PrdDesc": item_details.item_name,
-            "IsServc": item_details.is_service_item,
-            "HsnCd": item_details.hsn_code,
-            "Barcde": item_details.barcode,
-            "Unit": item_details.uom,
-            "Qty": item_details.qty,
-            "UnitPrice": item_details.unit_rate,
-            "TotAmt": item_details.taxable_value,
-            "Discount": item_details.discount_amount,
-            "AssAmt": item_details.taxable_value,
-            "PrdSlNo": item_details.serial_no,
-            "GstRt": item_details.tax_rate,
-            "IgstAmt": item_details.igst_amount,
-            "CgstAmt": item_details.cgst_amount,
-            "SgstAmt": item_details.sgst_amount,
-            "CesRt": item_details.cess_rate,
-            "CesAmt": item_details.cess_amount,
-            "CesNonAdvlAmt": item_details.cess_non_advol_amount,
-            "TotItemVal": item_details.total_value,
-            "BchDtls": {
-                "Nm": item_details.batch_no,
-                "ExpDt": item_details.batch_expiry_date,
-            },
-        }
+        return E_INVOICE_ITEM_SCHEMA.dump(item_details, skip_empty=False)
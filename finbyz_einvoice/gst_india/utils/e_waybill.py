@@ -1,9 +1,19 @@
 import os
+import traceback
 
 import frappe
 from frappe import _
+from frappe.desk.doctype.notification_log.notification_log import (
+    enqueue_create_notification,
+)
 from frappe.desk.form.load import get_docinfo
-from frappe.utils import add_to_date, get_datetime, get_fullname, random_string
+from frappe.utils import (
+    add_to_date,
+    cint,
+    get_datetime,
+    get_fullname,
+    random_string,
+)
 from frappe.utils.file_manager import save_file
 
 from finbyz_einvoice.gst_india.api_classes.e_invoice import EInvoiceAPI
@@ -20,10 +30,21 @@ from finbyz_einvoice.gst_india.utils import (
     send_updated_doc,
     update_onload,
 )
-from finbyz_einvoice.gst_india.utils.transaction_data import GSTTransactionData
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently
+from finbyz_einvoice.gst_india.utils.payload import ListOf, Schema, constant, dumps
+from finbyz_einvoice.gst_india.utils.transaction_data import (
+    GSTTransactionData,
+    prefetch_transaction_data,
+)
 
 PERMITTED_DOCTYPES = {"Sales Invoice", "Delivery Note"}
 
+E_WAYBILL_JSON_VERSION = "1.0.0621"
+
+# e-Waybill JSON is uploaded to the portal one File at a time
+DEFAULT_JSON_EXPORT_CHUNK_SIZE = 500
+DEFAULT_JSON_EXPORT_WORKERS = 4
+
 
 #######################################################################################
 ### Manual JSON Generation for e-Waybill ##############################################
@@ -34,9 +55,12 @@ PERMITTED_DOCTYPES = {"Sales Invoice", "Delivery Note"}
 def generate_e_waybill_json(doctype: str, docnames, values=None):
     docnames = frappe.parse_json(docnames) if docnames.startswith("[") else [docnames]
     ewb_data = {
-        "version": "1.0.0621",
+        "version": E_WAYBILL_JSON_VERSION,
         "billLists": [],
     }
+    prefetched = (
+        prefetch_transaction_data(doctype, docnames) if len(docnames) > 1 else None
+    )
 
     for doc in docnames:
         doc = frappe.get_doc(doctype, doc)
@@ -46,9 +70,170 @@ def generate_e_waybill_json(doctype: str, docnames, values=None):
             update_transaction(doc, frappe.parse_json(values))
             send_updated_doc(doc)
 
-        ewb_data["billLists"].append(EWaybillData(doc, for_json=True).get_data())
+        ewb_data["billLists"].append(
+            EWaybillData(doc, for_json=True, prefetched=prefetched).get_data()
+        )
+
+    return dumps(ewb_data, indent=True).decode()
+
+
+@frappe.whitelist()
+def enqueue_e_waybill_json_export(doctype: str, docnames):
+    """
+    Enqueue export of e-Waybill JSON for the given documents to private Files.
+    """
+
+    frappe.has_permission(doctype, "submit", throw=True)
+
+    docnames = frappe.parse_json(docnames) if docnames.startswith("[") else [docnames]
+    rq_job = frappe.enqueue(
+        "finbyz_einvoice.gst_india.utils.e_waybill.export_e_waybill_json",
+        queue="long",
+        timeout=max(len(docnames), 300),  # 1 sec per document
+        doctype=doctype,
+        docnames=docnames,
+    )
+
+    return rq_job.id
+
+
+def export_e_waybill_json(doctype, docnames):
+    """
+    Export e-Waybill JSON for the given documents to private Files, one for each
+    chunk of documents, and notify the user once done.
+    Permission checks are done for each document.
+
+    Documents of a chunk are processed concurrently, and their entries are
+    serialized as soon as they are built.
+
+    Tunable using site config:
+    - `e_waybill_json_export_chunk_size`: documents per File (default: 500)
+    - `e_waybill_json_export_workers`: documents processed at a time (default: 4)
+    """
+
+    docnames = list(dict.fromkeys(docnames))
+    user = frappe.session.user
+    chunk_size = (
+        cint(frappe.conf.e_waybill_json_export_chunk_size)
+        or DEFAULT_JSON_EXPORT_CHUNK_SIZE
+    )
+    max_workers = (
+        cint(frappe.conf.e_waybill_json_export_workers) or DEFAULT_JSON_EXPORT_WORKERS
+    )
+
+    file_prefix = f"Bulk_e-Waybill_Data_{frappe.generate_hash(length=5)}"
+    progress = frappe._dict(total=len(docnames), processed=0, failed=0, files=[])
+
+    def publish_progress(chunk_progress=None, status="Running"):
+        chunk_progress = chunk_progress or {}
+        frappe.publish_realtime(
+            "e_waybill_json_export_progress",
+            {
+                "status": status,
+                "total": progress.total,
+                "processed": progress.processed + chunk_progress.get("processed", 0),
+                "failed": progress.failed + chunk_progress.get("failed", 0),
+                "files": progress.files,
+            },
+            user=user,
+        )
+
+    for index, start in enumerate(range(0, len(docnames), chunk_size), start=1):
+        chunk = docnames[start : start + chunk_size]
+        content, failed = get_e_waybill_json_chunk(
+            doctype, chunk, max_workers, publish_progress
+        )
+
+        progress.processed += len(chunk)
+        progress.failed += failed
+
+        if not content:
+            continue
+
+        file = frappe.get_doc(
+            {
+                "doctype": "File",
+                "file_name": f"{file_prefix}_{index}.json",
+                "is_private": 1,
+                "content": content,
+            }
+        ).insert(ignore_permissions=True)
+
+        # nosemgrep
+        frappe.db.commit()
+        progress.files.append(file.file_url)
+
+        enqueue_create_notification(
+            user,
+            {
+                "type": "Alert",
+                "document_type": "File",
+                "document_name": file.name,
+                "subject": _("e-Waybill JSON {0} for {1} document(s) is ready").format(
+                    frappe.bold(file.file_name), len(chunk) - failed
+                ),
+            },
+        )
+
+    publish_progress(status="Completed")
+    return progress
+
+
+def get_e_waybill_json_chunk(doctype, docnames, max_workers, on_progress=None):
+    """
+    Returns e-Waybill JSON (as bytes) for the given documents, and the number of
+    documents for which it could not be generated.
+    """
+
+    prefetched = prefetch_transaction_data(doctype, docnames)
+    bill_lists = {}
+
+    def build(docname):
+        doc = frappe.get_doc(doctype, docname)
+        doc.check_permission("submit")
+
+        bill_lists[docname] = dumps(
+            EWaybillData(doc, for_json=True, prefetched=prefetched).get_data()
+        )
+
+    def log_error(docname, exception):
+        frappe.log_error(
+            title=_("e-Waybill JSON generation failed for {0} {1}").format(
+                _(doctype), docname
+            ),
+            message="".join(
+                traceback.format_exception(
+                    type(exception), exception, exception.__traceback__
+                )
+            ),
+        )
+
+    results = run_concurrently(
+        build,
+        docnames,
+        max_workers=max_workers,
+        max_per_group=max_workers,
+        on_error=log_error,
+        on_progress=on_progress,
+    )
+
+    failed = sum(1 for error in results.values() if error)
+    if not bill_lists:
+        return None, failed
 
-    return frappe.as_json(ewb_data, indent=4)
+    # entries in the order of documents
+    content = b",".join(
+        bill_lists[docname] for docname in docnames if docname in bill_lists
+    )
+
+    return (
+        b'{"version":'
+        + dumps(E_WAYBILL_JSON_VERSION)
+        + b',"billLists":['
+        + content
+        + b"]}",
+        failed,
+    )
 
 
 #######################################################################################
@@ -473,6 +658,99 @@ def update_transaction(doc, values):
 #######################################################################################
 
 
+E_WAYBILL_ITEM_SCHEMA = Schema(
+    {
+        "itemNo": "item_no",
+        "productName": constant(""),
+        "productDesc": "item_name",
+        "hsnCode": "hsn_code",
+        "qtyUnit": "uom",
+        "quantity": "qty",
+        "taxableAmount": "taxable_value",
+        "sgstRate": "sgst_rate",
+        "cgstRate": "cgst_rate",
+        "igstRate": "igst_rate",
+        "cessRate": "cess_rate",
+        "cessNonAdvol": "cess_non_advol_rate",
+    }
+)
+
+# dumped from `EWaybillData`
+E_WAYBILL_SCHEMA = Schema(
+    {
+        "userGstin": "transaction_details.company_gstin",
+        "supplyType": "transaction_details.supply_type",
+        "subSupplyType": "transaction_details.sub_supply_type",
+        "subSupplyDesc": constant(""),
+        "docType": "transaction_details.document_type",
+        "docNo": "transaction_details.name",
+        "docDate": "transaction_details.date",
+        "transactionType": "transaction_details.transaction_type",
+        "fromTrdName": "from_address.legal_name",
+        "fromGstin": "from_address.gstin",
+        "fromAddr1": "dispatch_address.address_line1",
+        "fromAddr2": "dispatch_address.address_line2",
+        "fromPlace": "dispatch_address.city",
+        "fromPincode": "dispatch_address.pincode",
+        "fromStateCode": "from_address.state_number",
+        "actFromStateCode": "dispatch_address.state_number",
+        "toTrdName": "to_address.legal_name",
+        "toGstin": "to_address.gstin",
+        "toAddr1": "shipping_address.address_line1",
+        "toAddr2": "shipping_address.address_line2",
+        "toPlace": "shipping_address.city",
+        "toPincode": "shipping_address.pincode",
+        "toStateCode": "to_address.state_number",
+        "actToStateCode": "shipping_address.state_number",
+        "totalValue": "transaction_details.total",
+        "cgstValue": "transaction_details.total_cgst_amount",
+        "sgstValue": "transaction_details.total_sgst_amount",
+        "igstValue": "transaction_details.total_igst_amount",
+        "cessValue": "transaction_details.total_cess_amount",
+        "TotNonAdvolVal": "transaction_details.total_cess_non_advol_amount",
+        "OthValue": lambda data: (
+            data.transaction_details.rounding_adjustment
+            + data.transaction_details.other_charges
+            - data.transaction_details.discount_amount
+        ),
+        "totInvValue": "transaction_details.grand_total",
+        "transMode": "transaction_details.mode_of_transport",
+        "transDistance": "transaction_details.distance",
+        "transporterName": "transaction_details.transporter_name",
+        "transporterId": "transaction_details.gst_transporter_id",
+        "transDocNo": "transaction_details.lr_no",
+        "transDocDate": "transaction_details.lr_date",
+        "vehicleNo": "transaction_details.vehicle_no",
+        "vehicleType": "transaction_details.vehicle_type",
+        "itemList": ListOf("all_item_details", E_WAYBILL_ITEM_SCHEMA),
+        "mainHsnCode": "transaction_details.main_hsn_code",
+    }
+)
+
+# keys that are different in JSON for manual upload
+E_WAYBILL_JSON_SCHEMA = E_WAYBILL_SCHEMA.rename(
+    {
+        "transactionType": "transType",
+        "actFromStateCode": "actualFromStateCode",
+        "actToStateCode": "actualToStateCode",
+    }
+)
+
+E_WAYBILL_WITH_IRN_SCHEMA = Schema(
+    {
+        "Irn": "doc.irn",
+        "Distance": "transaction_details.distance",
+        "TransMode": lambda data: str(data.transaction_details.mode_of_transport),
+        "TransId": "transaction_details.gst_transporter_id",
+        "TransName": "transaction_details.transporter_name",
+        "TransDocDt": "transaction_details.lr_date",
+        "TransDocNo": "transaction_details.lr_no",
+        "VehNo": "transaction_details.vehicle_no",
+        "VehType": "transaction_details.vehicle_type",
+    }
+)
+
+
 class EWaybillData(GSTTransactionData):
     def __init__(self, *args, **kwargs):
         self.for_json = kwargs.pop("for_json", False)
@@ -488,7 +766,7 @@ class EWaybillData(GSTTransactionData):
             return self.get_data_with_irn()
 
         self.set_transaction_details()
-        self.set_item_list()
+        self.all_item_details = self.get_all_item_details()
         self.set_transporter_details()
         self.set_party_address_details()
         self.validate_distance_for_same_pincode()
@@ -500,19 +778,7 @@ class EWaybillData(GSTTransactionData):
         self.set_party_address_details()
         self.validate_distance_for_same_pincode()
 
-        return self.sanitize_data(
-            {
-                "Irn": self.doc.irn,
-                "Distance": self.transaction_details.distance,
-                "TransMode": str(self.transaction_details.mode_of_transport),
-                "TransId": self.transaction_details.gst_transporter_id,
-                "TransName": self.transaction_details.transporter_name,
-                "TransDocDt": self.transaction_details.lr_date,
-                "TransDocNo": self.transaction_details.lr_no,
-                "VehNo": self.transaction_details.vehicle_no,
-                "VehType": self.transaction_details.vehicle_type,
-            }
-        )
+        return E_WAYBILL_WITH_IRN_SCHEMA.dump(self)
 
     def get_data_for_cancellation(self, values):
         self.validate_if_e_waybill_is_set()
@@ -842,82 +1108,10 @@ class EWaybillData(GSTTransactionData):
                 self.dispatch_address,
             )
 
-        data = {
-            "userGstin": self.transaction_details.company_gstin,
-            "supplyType": self.transaction_details.supply_type,
-            "subSupplyType": self.transaction_details.sub_supply_type,
-            "subSupplyDesc": "",
-            "docType": self.transaction_details.document_type,
-            "docNo": self.transaction_details.name,
-            "docDate": self.transaction_details.date,
-            "transactionType": self.transaction_details.transaction_type,
-            "fromTrdName": self.from_address.legal_name,
-            "fromGstin": self.from_address.gstin,
-            "fromAddr1": self.dispatch_address.address_line1,
-            "fromAddr2": self.dispatch_address.address_line2,
-            "fromPlace": self.dispatch_address.city,
-            "fromPincode": self.dispatch_address.pincode,
-            "fromStateCode": self.from_address.state_number,
-            "actFromStateCode": self.dispatch_address.state_number,
-            "toTrdName": self.to_address.legal_name,
-            "toGstin": self.to_address.gstin,
-            "toAddr1": self.shipping_address.address_line1,
-            "toAddr2": self.shipping_address.address_line2,
-            "toPlace": self.shipping_address.city,
-            "toPincode": self.shipping_address.pincode,
-            "toStateCode": self.to_address.state_number,
-            "actToStateCode": self.shipping_address.state_number,
-            "totalValue": self.transaction_details.total,
-            "cgstValue": self.transaction_details.total_cgst_amount,
-            "sgstValue": self.transaction_details.total_sgst_amount,
-            "igstValue": self.transaction_details.total_igst_amount,
-            "cessValue": self.transaction_details.total_cess_amount,
-            "TotNonAdvolVal": self.transaction_details.total_cess_non_advol_amount,
-            "OthValue": (
-                self.transaction_details.rounding_adjustment
-                + self.transaction_details.other_charges
-                - self.transaction_details.discount_amount
-            ),
-            "totInvValue": self.transaction_details.grand_total,
-            "transMode": self.transaction_details.mode_of_transport,
-            "transDistance": self.transaction_details.distance,
-            "transporterName": self.transaction_details.transporter_name,
-            "transporterId": self.transaction_details.gst_transporter_id,
-            "transDocNo": self.transaction_details.lr_no,
-            "transDocDate": self.transaction_details.lr_date,
-            "vehicleNo": self.transaction_details.vehicle_no,
-            "vehicleType": self.transaction_details.vehicle_type,
-            "itemList": self.item_list,
-            "mainHsnCode": self.transaction_details.main_hsn_code,
-        }
-
         if self.for_json:
-            for key, value in (
-                # keys that are different in for_json
-                {
-                    "transactionType": "transType",
-                    "actFromStateCode": "actualFromStateCode",
-                    "actToStateCode": "actualToStateCode",
-                }
-            ).items():
-                data[value] = data.pop(key)
-
-            return data
+            return E_WAYBILL_JSON_SCHEMA.dump(self, skip_empty=False)
 
-        return self.sanitize_data(data)
+        return E_WAYBILL_SCHEMA.dump(self)
 
     def get_item_data(self, item_details):
-        return {
-            "itemNo": item_details.item_no,
-            "productName": "",
-            "productDesc": item_details.item_name,
-            "hsnCode": item_details.hsn_code,
-            "qtyUnit": item_details.uom,
-            "quantity": item_details.qty,
-            "taxableAmount": item_details.taxable_value,
-            "sgstRate": item_details.sgst_rate,
-            "cgstRate": item_details.cgst_rate,
-            "igstRate": item_details.igst_rate,
-            "cessRate": item_details.cess_rate,
-            "cessNonAdvol": item_details.cess_non_advol_rate,
-        }
+        return E_WAYBILL_ITEM_SCHEMA.dump(item_details, skip_empty=False)
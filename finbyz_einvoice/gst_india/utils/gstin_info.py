@@ -2,10 +2,18 @@ from string import whitespace
 
 import frappe
 from frappe import _
+from frappe.utils import cint, now_datetime, time_diff_in_seconds
 
 from finbyz_einvoice.gst_india.api_classes.public import PublicAPI
 from finbyz_einvoice.gst_india.utils import titlecase, validate_gstin
 
+CACHE_KEY = "gstin_info"
+STATS_KEY = "gstin_info_cache_stats"
+DEFAULT_TTL_DAYS = 7
+DEFAULT_MAX_STALE_DAYS = 30
+HOT_CACHE_EXPIRY = 24 * 60 * 60  # seconds
+SECONDS_PER_DAY = 24 * 60 * 60
+
 GST_CATEGORIES = {
     "Regular": "Registered Regular",
     "Input Service Distributor (ISD)": "Registered Regular",
@@ -28,7 +36,79 @@ def get_gstin_info(gstin):
         frappe.throw(_("Not allowed"), frappe.PermissionError)
 
     validate_gstin(gstin)
+    return get_cached_gstin_info(gstin)
+
+
+def get_cached_gstin_info(gstin):
+    """
+    Returns GSTIN info from cache, fetching it from the GST Public API if required.
+
+    GSTIN info is cached in Redis, and persisted in GSTIN Info for other workers
+    and after Redis is cleared.
+
+    Tunable using site config:
+    - `gstin_info_ttl_days`: days for which GSTIN info is used as is (default: 7)
+    - `gstin_info_max_stale_days`: days for which outdated GSTIN info is returned
+      while it is refreshed in the background (default: 30)
+    """
+
+    ttl_days = cint(frappe.conf.gstin_info_ttl_days) or DEFAULT_TTL_DAYS
+    max_stale_days = max(
+        ttl_days, cint(frappe.conf.gstin_info_max_stale_days) or DEFAULT_MAX_STALE_DAYS
+    )
+
+    entry = frappe.cache().get_value(get_cache_key(gstin)) or _get_persisted_entry(
+        gstin
+    )
+    age = time_diff_in_seconds(now_datetime(), entry.last_updated_on) if entry else 0
+
+    if entry and age < ttl_days * SECONDS_PER_DAY:
+        _update_cache_stats("hits")
+        return frappe._dict(entry.gstin_info)
+
+    if entry and age < max_stale_days * SECONDS_PER_DAY:
+        _update_cache_stats("stale_hits")
+        _enqueue_refresh(gstin)
+        return frappe._dict(entry.gstin_info)
+
+    _update_cache_stats("misses")
+    return refresh_gstin_info(gstin)
+
+
+def refresh_gstin_info(gstin):
+    """Fetch GSTIN info from the GST Public API and cache it"""
+
     response = PublicAPI().get_gstin_info(gstin)
+    gstin_info = parse_gstin_info(response)
+    entry = frappe._dict(
+        gstin_info=gstin_info,
+        legal_name=titlecase(response.lgnm),
+        last_updated_on=now_datetime(),
+    )
+
+    _persist_entry(gstin, entry)
+    _set_cache(gstin, entry)
+
+    return gstin_info
+
+
+def record_verification_error(gstin, error, status=None):
+    """
+    Save error of GSTIN verification in GSTIN Info.
+
+    If `status` is set (e.g. GSTIN is invalid), it replaces the cached info.
+    Otherwise, the error is transient and the cached info (if any) is kept.
+    """
+
+    values = {"verification_error": error}
+    if status:
+        values.update(status=status, last_updated_on=now_datetime(), data=None)
+        frappe.cache().delete_value(get_cache_key(gstin))
+
+    _upsert(gstin, values)
+
+
+def parse_gstin_info(response):
     business_name = (
         response.tradeNam if response.ctb == "Proprietorship" else response.lgnm
     )
@@ -49,6 +129,102 @@ def get_gstin_info(gstin):
     return gstin_info
 
 
+def get_gstin_info_cache_stats():
+    """Returns hits, stale hits and misses of the GSTIN info cache"""
+
+    cache = frappe.cache()
+    stats = {
+        key: cint(cache.get(cache.make_key(f"{STATS_KEY}:{key}")))
+        for key in ("hits", "stale_hits", "misses")
+    }
+
+    total = sum(stats.values())
+    stats["hit_ratio"] = (
+        round((stats["hits"] + stats["stale_hits"]) / total, 4) if total else 0
+    )
+
+    return stats
+
+
+def get_cache_key(gstin):
+    return f"{CACHE_KEY}:{gstin}"
+
+
+def _get_persisted_entry(gstin):
+    entry = frappe.db.get_value(
+        "GSTIN Info", gstin, ("data", "last_updated_on"), as_dict=True
+    )
+
+    # invalid GSTINs are saved without data
+    if not entry or not entry.data:
+        return
+
+    entry = frappe._dict(
+        gstin_info=frappe.parse_json(entry.data),
+        last_updated_on=entry.last_updated_on,
+    )
+
+    _set_cache(gstin, entry)
+    return entry
+
+
+def _persist_entry(gstin, entry):
+    gstin_info = entry.gstin_info
+    _upsert(
+        gstin,
+        {
+            "business_name": gstin_info.business_name,
+            "legal_name": entry.legal_name,
+            "gst_category": gstin_info.gst_category,
+            "status": gstin_info.status,
+            "last_updated_on": entry.last_updated_on,
+            "verification_error": None,
+            "data": frappe.as_json(gstin_info, indent=None),
+        },
+    )
+
+
+def _upsert(gstin, values):
+    if frappe.db.exists("GSTIN Info", gstin):
+        frappe.db.set_value("GSTIN Info", gstin, values)
+        return
+
+    try:
+        frappe.get_doc({"doctype": "GSTIN Info", "gstin": gstin, **values}).insert(
+            ignore_permissions=True
+        )
+
+    except frappe.DuplicateEntryError:
+        # inserted by another request in the meantime
+        frappe.db.set_value("GSTIN Info", gstin, values)
+
+
+def _set_cache(gstin, entry):
+    frappe.cache().set_value(
+        get_cache_key(gstin), entry, expires_in_sec=HOT_CACHE_EXPIRY
+    )
+
+
+def _enqueue_refresh(gstin):
+    # refresh only once, even if requested by multiple users
+    cache = frappe.cache()
+    if not cache.set(
+        cache.make_key(f"{CACHE_KEY}:refreshing:{gstin}"), 1, nx=True, ex=300
+    ):
+        return
+
+    frappe.enqueue(
+        "finbyz_einvoice.gst_india.utils.gstin_info.refresh_gstin_info",
+        queue="short",
+        gstin=gstin,
+    )
+
+
+def _update_cache_stats(key):
+    cache = frappe.cache()
+    cache.incr(cache.make_key(f"{STATS_KEY}:{key}"))
+
+
 def _get_address(address):
     """:param address: dict of address with a key of 'addr' and 'ntr'"""
 
@@ -0,0 +1,127 @@
+"""
+Validation of GSTINs and PANs in bulk (e.g. for data imports and reports), returning
+a status for each value instead of throwing at the first invalid one.
+
+GSTINs are checked as in `validate_gstin` and `validate_gst_category`, in the same
+order. Check digits of large batches are computed together with NumPy, if installed.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from finbyz_einvoice.gst_india.constants import (
+    GSTIN_CODE_POINT_CHARS,
+    GSTIN_FORMATS,
+    PAN_NUMBER,
+    TCS,
+)
+from finbyz_einvoice.gst_india.utils import get_gstin_check_digit
+
+VALID = 0
+INVALID_LENGTH = 1
+INVALID_CHECK_DIGIT = 2
+INVALID_TCS_FORMAT = 3
+# GSTIN doesn't match the format for its GST Category,
+# or the GST Category is not valid with (or without) a GSTIN
+INVALID_GST_CATEGORY = 4
+INVALID_FORMAT = 5
+
+CATEGORIES_WITHOUT_GSTIN = {"Unregistered", "Overseas"}
+
+# smaller batches are faster to check one by one than to convert to arrays
+MIN_VECTORIZED_BATCH = 4
+
+if np is not None:
+    # code point of each (ASCII) character, -1 for characters not in a GSTIN
+    _CODE_POINTS = np.full(128, -1, dtype=np.int64)
+    _CODE_POINTS[[ord(char) for char in GSTIN_CODE_POINT_CHARS]] = np.arange(
+        len(GSTIN_CODE_POINT_CHARS)
+    )
+
+    # factor for each of the first 14 characters
+    _FACTORS = np.tile(np.array([1, 2], dtype=np.int64), 7)
+
+
+def validate_gstins(
+    gstins,
+    gst_categories=None,
+    *,
+    is_tcs_gstin=False,
+    is_transporter_id=False,
+):
+    """
+    Returns list of statuses (e.g. `VALID`, `INVALID_CHECK_DIGIT`) for `gstins`.
+
+    If `gst_categories` are passed, each GSTIN is also validated for the GST Category
+    at the same position. Empty GSTINs are valid unless their GST Category needs one.
+    """
+
+    gstins = [(gstin or "").upper().strip() for gstin in gstins]
+    statuses = [VALID] * len(gstins)
+    to_check = []
+
+    for idx, gstin in enumerate(gstins):
+        if not gstin:
+            continue
+
+        if len(gstin) != 15:
+            statuses[idx] = INVALID_LENGTH
+
+        elif not (is_transporter_id and gstin.startswith("88")):
+            to_check.append(idx)
+
+    has_valid_check_digits = has_valid_check_digit([gstins[idx] for idx in to_check])
+    for idx, is_valid in zip(to_check, has_valid_check_digits):
+        if not is_valid:
+            statuses[idx] = INVALID_CHECK_DIGIT
+
+    if is_tcs_gstin:
+        for idx, gstin in enumerate(gstins):
+            if gstin and statuses[idx] == VALID and not TCS.match(gstin):
+                statuses[idx] = INVALID_TCS_FORMAT
+
+    if gst_categories is not None:
+        for idx, gst_category in enumerate(gst_categories):
+            if statuses[idx] == VALID and not _is_valid_gst_category(
+                gst_category, gstins[idx]
+            ):
+                statuses[idx] = INVALID_GST_CATEGORY
+
+    return statuses
+
+
+def validate_pans(pans):
+    """Returns list of statuses (`VALID` or `INVALID_FORMAT`) for `pans`"""
+
+    return [VALID if PAN_NUMBER.match(pan or "") else INVALID_FORMAT for pan in pans]
+
+
+def has_valid_check_digit(gstins):
+    """
+    Returns list of whether the check digit of each GSTIN is valid.
+
+    GSTINs should be in upper case and have 15 characters.
+    """
+
+    if np is None or len(gstins) < MIN_VECTORIZED_BATCH:
+        return [gstin[-1] == get_gstin_check_digit(gstin) for gstin in gstins]
+
+    # one row of 15 unicode code points for each GSTIN
+    chars = np.frombuffer("".join(gstins).encode("utf-32-le"), dtype="<u4")
+    code_points = _CODE_POINTS[np.minimum(chars, 127).reshape(-1, 15)]
+
+    mod = len(GSTIN_CODE_POINT_CHARS)
+    digits = code_points[:, :-1] * _FACTORS
+    totals = (digits // mod + digits % mod).sum(axis=1)
+
+    return ((mod - totals % mod) % mod == code_points[:, -1]).tolist()
+
+
+def _is_valid_gst_category(gst_category, gstin):
+    if not gstin:
+        return gst_category in CATEGORIES_WITHOUT_GSTIN
+
+    gstin_format = GSTIN_FORMATS.get(gst_category)
+    return bool(gstin_format and gstin_format.match(gstin))
@@ -0,0 +1,185 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime, time_diff_in_seconds
+
+from finbyz_einvoice.gst_india.api_classes.public import PublicAPI
+from finbyz_einvoice.gst_india.api_classes.throttle import run_when_available
+from finbyz_einvoice.gst_india.utils import validate_gstin
+from finbyz_einvoice.gst_india.utils.bulk import run_concurrently
+from finbyz_einvoice.gst_india.utils.gstin_info import (
+    record_verification_error,
+    refresh_gstin_info,
+)
+
+STATE_KEY = "gstin_verification"
+PROGRESS_EVENT = "gstin_verification_progress"
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_WORKERS = 4
+STALE_AFTER = 15 * 60  # seconds without progress, after which a job is not running
+
+# doctypes with GSTINs to be verified, and filters for them
+GSTIN_SOURCES = {
+    "Company": {},
+    "Customer": {"disabled": 0},
+    "Supplier": {"disabled": 0},
+    "Address": {"disabled": 0},
+}
+
+STATUS_QUEUED = "Queued"
+STATUS_RUNNING = "Running"
+STATUS_COMPLETED = "Completed"
+STATUS_STOPPED = "Stopped"
+
+
+@frappe.whitelist()
+def enqueue_gstin_verification(resume=True):
+    """
+    Verify GSTINs of all Companies, Customers, Suppliers and Addresses in background.
+
+    If `resume` is set, GSTINs verified by an unfinished previous run are skipped.
+    """
+
+    frappe.only_for(("System Manager", "Accounts Manager"))
+
+    state = get_verification_state()
+    if (
+        state
+        and state.status in (STATUS_QUEUED, STATUS_RUNNING)
+        and not is_stale(state)
+    ):
+        frappe.throw(
+            _("GSTIN verification is already in progress"),
+            title=_("Already Running"),
+        )
+
+    if not (cint(resume) and state and state.status != STATUS_COMPLETED):
+        state = frappe._dict(started_on=now_datetime())
+
+    _update_state(state, status=STATUS_QUEUED, user=frappe.session.user)
+    frappe.enqueue(
+        "finbyz_einvoice.gst_india.utils.gstin_verification.verify_gstins",
+        queue="long",
+        timeout=24 * 60 * 60,
+    )
+
+    return state
+
+
+def verify_gstins():
+    """
+    Verify GSTINs in chunks of `gstin_verification_chunk_size` (default: 500),
+    using `gstin_verification_workers` concurrent requests (default: 4) within
+    rate limits of the GST Public API.
+
+    Progress is saved after each GSTIN. GSTINs verified after the start of the
+    run are skipped, so a stopped or failed run can be resumed.
+    """
+
+    state = get_verification_state() or frappe._dict(started_on=now_datetime())
+    gstins = get_gstins_to_verify()
+    chunk_size = cint(frappe.conf.gstin_verification_chunk_size) or DEFAULT_CHUNK_SIZE
+    workers = cint(frappe.conf.gstin_verification_workers) or DEFAULT_WORKERS
+
+    _update_state(
+        state, status=STATUS_RUNNING, total=len(gstins), processed=0, failed=0
+    )
+
+    for start in range(0, len(gstins), chunk_size):
+        chunk = gstins[start : start + chunk_size]
+        pending = _get_unverified(chunk, state.started_on)
+        processed = state.processed + len(chunk) - len(pending)
+        failed = state.failed
+
+        def update_progress(progress):
+            _update_state(
+                state,
+                processed=processed + progress.processed,
+                failed=failed + progress.failed,
+            )
+
+        results = run_concurrently(
+            verify_gstin,
+            pending,
+            max_workers=workers,
+            max_per_group=workers,
+            on_error=_log_error,
+            on_progress=update_progress,
+        )
+
+        if not pending:
+            _update_state(state, processed=processed)
+
+        # likely a problem with the API (e.g. credits exhausted), don't continue
+        elif all(results.values()):
+            _update_state(state, status=STATUS_STOPPED)
+            return
+
+    _update_state(state, status=STATUS_COMPLETED)
+
+
+def verify_gstin(gstin):
+    try:
+        validate_gstin(gstin)
+    except frappe.ValidationError as e:
+        frappe.clear_last_message()
+        record_verification_error(gstin, str(e), status="Invalid")
+        return
+
+    run_when_available(PublicAPI.API_NAME, refresh_gstin_info, gstin)
+
+
+def get_gstins_to_verify():
+    """Returns unique GSTINs across all sources"""
+
+    gstins = set()
+    for doctype, filters in GSTIN_SOURCES.items():
+        for gstin in frappe.get_all(
+            doctype,
+            filters={**filters, "gstin": ("is", "set")},
+            pluck="gstin",
+            distinct=True,
+        ):
+            if gstin := gstin.upper().strip():
+                gstins.add(gstin)
+
+    return sorted(gstins)
+
+
+def get_verification_state():
+    return frappe.cache().get_value(STATE_KEY)
+
+
+def is_stale(state):
+    return time_diff_in_seconds(now_datetime(), state.updated_on) > STALE_AFTER
+
+
+def _get_unverified(gstins, verified_after):
+    if not gstins:
+        return []
+
+    verified = set(
+        frappe.get_all(
+            "GSTIN Info",
+            filters={
+                "name": ("in", gstins),
+                "last_updated_on": (">=", verified_after),
+            },
+            pluck="name",
+        )
+    )
+
+    return [gstin for gstin in gstins if gstin not in verified]
+
+
+def _log_error(gstin, exception):
+    # not saved as invalid, will be verified again on resume
+    frappe.clear_last_message()
+    record_verification_error(gstin, str(exception) or repr(exception))
+
+
+def _update_state(state, **values):
+    state.update(values, updated_on=now_datetime())
+    frappe.cache().set_value(STATE_KEY, state)
+
+    if state.user:
+        frappe.publish_realtime(PROGRESS_EVENT, state, user=state.user)
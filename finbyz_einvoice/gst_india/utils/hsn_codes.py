@@ -0,0 +1,136 @@
+"""
+Index of GST HSN Codes with their descriptions and taxes, for lookups without
+database queries.
+
+The index is built from the database once, shared by all processes through Redis
+and kept in memory by each process until GST HSN Codes are changed.
+"""
+
+from bisect import bisect_left
+
+import frappe
+
+# {HSN Code: (description, taxes)}
+HSN_INDEX_KEY = "gst_hsn_index"
+
+# changed when GST HSN Codes are changed, to rebuild the index in all processes
+HSN_INDEX_VERSION_KEY = "gst_hsn_index_version"
+
+# {site: (version, HSNIndex)}
+_hsn_indexes = {}
+
+
+class HSNIndex:
+    """GST HSN Codes with their descriptions and taxes"""
+
+    __slots__ = ("hsn_codes", "sorted_codes")
+
+    def __init__(self, hsn_codes):
+        self.hsn_codes = hsn_codes
+        self.sorted_codes = tuple(sorted(hsn_codes))
+
+    def __contains__(self, hsn_code):
+        return hsn_code in self.hsn_codes
+
+    def __len__(self):
+        return len(self.hsn_codes)
+
+    def is_prefix(self, prefix):
+        """Whether any HSN Code starts with `prefix`, e.g. 8471 for 84713010"""
+
+        idx = bisect_left(self.sorted_codes, prefix)
+        return idx < len(self.sorted_codes) and self.sorted_codes[idx].startswith(
+            prefix
+        )
+
+    def is_valid(self, hsn_code):
+        """
+        Whether the HSN Code, a heading of HSN Codes (e.g. 8471) or a sub-heading of
+        an HSN Code (e.g. 84713010 for 847130) is in the index.
+        """
+
+        if hsn_code in self.hsn_codes or self.is_prefix(hsn_code):
+            return True
+
+        return any(
+            hsn_code[:length] in self.hsn_codes
+            for length in range(len(hsn_code) - 1, 1, -1)
+        )
+
+    def get_invalid(self, hsn_codes):
+        """Returns set of HSN Codes (e.g. of all items of a document) that are not valid"""
+
+        return {hsn_code for hsn_code in set(hsn_codes) if not self.is_valid(hsn_code)}
+
+    def get_description(self, hsn_code):
+        if details := self.hsn_codes.get(hsn_code):
+            return details[0]
+
+    def get_taxes(self, hsn_code):
+        """Returns taxes of the HSN Code, or None if it is not in the index"""
+
+        if details := self.hsn_codes.get(hsn_code):
+            return details[1]
+
+
+def get_hsn_index():
+    cache = frappe.cache()
+    version = cache.get_value(HSN_INDEX_VERSION_KEY)
+
+    cached = _hsn_indexes.get(frappe.local.site)
+    if version and cached and cached[0] == version:
+        return cached[1]
+
+    hsn_codes = cache.get_value(HSN_INDEX_KEY) if version else None
+    if hsn_codes is None:
+        version = frappe.generate_hash(length=10)
+        hsn_codes = _get_hsn_codes()
+
+        cache.set_value(HSN_INDEX_KEY, hsn_codes)
+        cache.set_value(HSN_INDEX_VERSION_KEY, version)
+
+    index = HSNIndex(hsn_codes)
+    _hsn_indexes[frappe.local.site] = (version, index)
+    return index
+
+
+def clear_hsn_index(doc=None, method=None, *args):
+    """Rebuild the index in all processes, on change of GST HSN Codes"""
+
+    if not doc:
+        _clear_hsn_index()
+        return
+
+    # until the change is committed, the index can be rebuilt by other requests
+    # from the earlier state, or by this request from the uncommitted state
+    frappe.db.after_commit.add(_clear_hsn_index)
+    frappe.db.after_rollback.add(_clear_hsn_index)
+
+
+def _clear_hsn_index():
+    frappe.cache().delete_value((HSN_INDEX_VERSION_KEY, HSN_INDEX_KEY))
+    _hsn_indexes.pop(frappe.local.site, None)
+
+
+def _get_hsn_codes():
+    hsn_codes = {
+        hsn_code: (description, [])
+        for hsn_code, description in frappe.get_all(
+            "GST HSN Code", fields=("name", "description"), as_list=True
+        )
+    }
+
+    for tax in frappe.get_all(
+        "Item Tax",
+        fields=("parent", "item_tax_template", "tax_category", "valid_from"),
+        filters={"parenttype": "GST HSN Code", "parentfield": "taxes"},
+        parent_doctype="GST HSN Code",
+        order_by="idx",
+    ):
+        if details := hsn_codes.get(tax.pop("parent")):
+            details[1].append(tax)
+
+    return {
+        hsn_code: (description, tuple(taxes))
+        for hsn_code, (description, taxes) in hsn_codes.items()
+    }
@@ -6,11 +6,10 @@ import pyqrcode
 from barcode import Code128
 from barcode.writer import ImageWriter
 
-from finbyz_einvoice.gst_india.constants.e_waybill import (
-    SUB_SUPPLY_TYPES,
-    SUPPLY_TYPES,
-    TRANSPORT_MODES,
-    TRANSPORT_TYPES,
+from finbyz_einvoice.gst_india.constants.e_waybill import SUPPLY_TYPES, TRANSPORT_TYPES
+from finbyz_einvoice.gst_india.constants.lookups import (
+    SUB_SUPPLY_TYPES_BY_CODE,
+    TRANSPORT_MODES_BY_CODE,
 )
 from finbyz_einvoice.gst_india.overrides.transaction import is_inter_state_supply
 from finbyz_einvoice.gst_india.utils import as_ist
@@ -57,19 +56,11 @@ def get_supply_type(code):
 
 
 def get_sub_supply_type(code):
-    code = int(code)
-
-    for sub_supply_type, _code in SUB_SUPPLY_TYPES.items():
-        if _code == code:
-            return sub_supply_type
+    return SUB_SUPPLY_TYPES_BY_CODE.get(int(code))
 
 
 def get_transport_mode(code):
-    code = int(code)
-
-    for transport_mode, _code in TRANSPORT_MODES.items():
-        if _code == code:
-            return transport_mode
+    return TRANSPORT_MODES_BY_CODE.get(int(code))
 
 
 def get_transport_type(code):
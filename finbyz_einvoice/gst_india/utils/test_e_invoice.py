@@ -1,5 +1,6 @@
 import json
 import re
+from unittest.mock import patch
 
 import responses
 from responses import matchers
@@ -10,7 +11,14 @@ from frappe.utils import add_to_date, get_datetime, getdate, now_datetime
 from frappe.utils.data import format_date
 
 from finbyz_einvoice.gst_india.api_classes.base import BASE_URL
+from finbyz_einvoice.gst_india.api_classes.e_invoice import EInvoiceAPI
+from finbyz_einvoice.gst_india.api_classes.throttle import (
+    GSPUnavailableError,
+    RequestThrottle,
+    run_when_available,
+)
 from finbyz_einvoice.gst_india.utils import load_doc
+from finbyz_einvoice.gst_india.utils.api import compact_json
 from finbyz_einvoice.gst_india.utils.e_invoice import (
     EInvoiceData,
     cancel_e_invoice,
@@ -20,6 +28,7 @@ from finbyz_einvoice.gst_india.utils.e_invoice import (
 )
 from finbyz_einvoice.gst_india.utils.e_waybill import EWaybillData
 from finbyz_einvoice.gst_india.utils.tests import append_item, create_sales_invoice
+from finbyz_einvoice.gst_india.utils.transaction_data import prefetch_transaction_data
 
 
 class TestEInvoice(FrappeTestCase):
@@ -202,7 +211,7 @@ class TestEInvoice(FrappeTestCase):
         # Assert if Integration Request Log generated
         self.assertDocumentEqual(
             {
-                "output": frappe.as_json(test_data.get("response_data"), indent=4),
+                "output": compact_json(test_data.get("response_data")),
             },
             frappe.get_doc(
                 "Integration Request",
@@ -246,7 +255,7 @@ class TestEInvoice(FrappeTestCase):
         # Assert if Integration Request Log generated
         self.assertDocumentEqual(
             {
-                "output": frappe.as_json(test_data.get("response_data"), indent=4),
+                "output": compact_json(test_data.get("response_data")),
             },
             frappe.get_doc(
                 "Integration Request",
@@ -272,6 +281,43 @@ class TestEInvoice(FrappeTestCase):
             frappe.db.get_value("e-Waybill Log", {"reference_name": si.name}, "name")
         )
 
+    @responses.activate
+    def test_auto_generation_while_gsp_unavailable(self):
+        """e-Invoice queued on submit waits while GSP is unavailable"""
+        test_data = self.e_invoice_test_data.get("service_item")
+        si = create_sales_invoice(**test_data.get("kwargs"))
+        self._mock_e_invoice_response(data=test_data)
+
+        check_circuit = RequestThrottle.check_circuit
+        checks = []
+
+        def unavailable_once(throttle):
+            checks.append(throttle.api_name)
+            if len(checks) == 1:
+                frappe.throw("GSP Unavailable", GSPUnavailableError)
+
+            return check_circuit(throttle)
+
+        with patch.object(RequestThrottle, "check_circuit", unavailable_once), patch(
+            "time.sleep"
+        ):
+            # as enqueued by `on_submit`
+            run_when_available(
+                EInvoiceAPI.API_NAME,
+                "finbyz_einvoice.gst_india.utils.e_invoice.generate_e_invoice",
+                docname=si.name,
+                throw=False,
+            )
+
+        self.assertEqual(len(checks), 2)
+        self.assertDocumentEqual(
+            {
+                "irn": test_data.get("response_data").get("result").get("Irn"),
+                "einvoice_status": "Generated",
+            },
+            frappe.get_doc("Sales Invoice", si.name),
+        )
+
     @responses.activate
     def test_return_e_invoice_with_goods_item(self):
         """Generate test e-Invoice for returned Sales Invoices"""
@@ -310,7 +356,7 @@ class TestEInvoice(FrappeTestCase):
         # Assert if Integration Request Log generated
         self.assertDocumentEqual(
             {
-                "output": frappe.as_json(test_data.get("response_data"), indent=4),
+                "output": compact_json(test_data.get("response_data")),
             },
             frappe.get_doc(
                 "Integration Request",
@@ -341,6 +387,26 @@ class TestEInvoice(FrappeTestCase):
             )
         )
 
+    def test_e_invoice_data_with_prefetched_values(self):
+        si = create_sales_invoice(vehicle_no="GJ07DL9009")
+        return_si = create_sales_invoice(
+            **self.e_invoice_test_data.return_invoice.kwargs,
+            return_against=si.name,
+        )
+
+        prefetched = prefetch_transaction_data(
+            "Sales Invoice", [si.name, return_si.name]
+        )
+        self.assertEqual(prefetched.posting_dates, {si.name: getdate(si.posting_date)})
+        self.assertIn(si.customer_address, prefetched.addresses)
+
+        for doc in (si, return_si):
+            doc = frappe.get_doc("Sales Invoice", doc.name)
+            self.assertDictEqual(
+                EInvoiceData(doc).get_data(),
+                EInvoiceData(doc, prefetched=prefetched).get_data(),
+            )
+
     @responses.activate
     def test_debit_note_e_invoice_with_goods_item(self):
         """Generate test e-Invoice for debit note with zero quantity"""
@@ -370,7 +436,7 @@ class TestEInvoice(FrappeTestCase):
         # Assert if Integration Request Log generated
         self.assertDocumentEqual(
             {
-                "output": frappe.as_json(test_data.get("response_data"), indent=4),
+                "output": compact_json(test_data.get("response_data")),
             },
             frappe.get_doc(
                 "Integration Request",
@@ -3,7 +3,7 @@ from unittest.mock import Mock, patch
 
 import frappe
 
-from finbyz_einvoice.gst_india.utils.gstin_info import get_gstin_info
+from finbyz_einvoice.gst_india.utils.gstin_info import get_cache_key, get_gstin_info
 
 
 class TestGstinInfo(unittest.TestCase):
@@ -122,3 +122,25 @@ class TestGstinInfo(unittest.TestCase):
                 },
             },
         )
+
+    def test_get_gstin_info_from_cache(self):
+        self.mock_public_api.return_value = Mock()
+        self.mock_public_api.return_value.get_gstin_info.return_value = (
+            self.MOCK_GSTIN_INFO
+        )
+
+        frappe.db.delete("GSTIN Info", {"gstin": self.gstin})
+        frappe.cache().delete_value(get_cache_key(self.gstin))
+
+        gstin_info = get_gstin_info(self.gstin)
+
+        # from Redis
+        self.assertDictEqual(get_gstin_info(self.gstin), gstin_info)
+
+        # from GSTIN Info
+        frappe.cache().delete_value(get_cache_key(self.gstin))
+        self.assertDictEqual(get_gstin_info(self.gstin), gstin_info)
+
+        self.mock_public_api.return_value.get_gstin_info.assert_called_once_with(
+            self.gstin
+        )
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+
+import frappe
+
+from finbyz_einvoice.gst_india.utils import validate_gst_category, validate_gstin
+from finbyz_einvoice.gst_india.utils.gstin_validation import (
+    INVALID_CHECK_DIGIT,
+    INVALID_FORMAT,
+    INVALID_GST_CATEGORY,
+    INVALID_LENGTH,
+    INVALID_TCS_FORMAT,
+    VALID,
+    validate_gstins,
+    validate_pans,
+)
+
+
+class TestGstinValidation(unittest.TestCase):
+    GSTINS = (
+        ("24AAUPV7468F1ZW", "Registered Regular", VALID),
+        (" 24aaupv7468f1zw", "Registered Composition", VALID),
+        ("24AAUPV7468F1ZX", "Registered Regular", INVALID_CHECK_DIGIT),
+        ("24AAUPV7468F1Z", "Registered Regular", INVALID_LENGTH),
+        ("24AAUPV7468F1ZW", "Unregistered", INVALID_GST_CATEGORY),
+        ("24AAUPV7468F1ZW", "UIN Holders", INVALID_GST_CATEGORY),
+        ("", "Unregistered", VALID),
+        (None, "Overseas", VALID),
+        ("", "Registered Regular", INVALID_GST_CATEGORY),
+    )
+
+    def test_validate_gstins(self):
+        gstins, gst_categories, expected = zip(*self.GSTINS)
+
+        # vectorized (if NumPy is installed) and one by one
+        for min_vectorized_batch in (0, len(gstins) + 1):
+            with patch(
+                "finbyz_einvoice.gst_india.utils.gstin_validation.MIN_VECTORIZED_BATCH",
+                min_vectorized_batch,
+            ):
+                self.assertEqual(
+                    validate_gstins(gstins, gst_categories), list(expected)
+                )
+
+    def test_statuses_match_validate_gstin(self):
+        for gstin, gst_category, status in self.GSTINS:
+            try:
+                validate_gst_category(gst_category, validate_gstin(gstin))
+            except frappe.ValidationError:
+                frappe.clear_last_message()
+                self.assertNotEqual(status, VALID, gstin)
+            else:
+                self.assertEqual(status, VALID, gstin)
+
+    def test_tcs_gstin(self):
+        self.assertEqual(
+            validate_gstins(["24AAUPV7468F1ZW", "24AAUPV7468F1CX"], is_tcs_gstin=True),
+            [INVALID_TCS_FORMAT, INVALID_CHECK_DIGIT],
+        )
+
+    def test_transporter_id(self):
+        self.assertEqual(
+            validate_gstins(["88AABCM9407D1ZS"], is_transporter_id=True), [VALID]
+        )
+
+    def test_validate_pans(self):
+        self.assertEqual(
+            validate_pans(["AAUPV7468F", "AAUPV7468", None]),
+            [VALID, INVALID_FORMAT, INVALID_FORMAT],
+        )
@@ -0,0 +1,48 @@
+import unittest
+
+import frappe
+
+from finbyz_einvoice.gst_india.utils.hsn_codes import HSNIndex
+
+
+class TestHSNIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = HSNIndex(
+            {
+                "847130": ("Portable computers", ()),
+                "84713010": ("Personal computer", ()),
+                "61149090": (
+                    "Garments of other textile materials",
+                    (frappe._dict(item_tax_template="GST 12% - _TIRC"),),
+                ),
+                "9983": ("Other professional services", ()),
+            }
+        )
+
+    def test_is_prefix(self):
+        self.assertTrue(self.index.is_prefix("8471"))
+        self.assertTrue(self.index.is_prefix("84713010"))
+        self.assertFalse(self.index.is_prefix("8472"))
+        self.assertFalse(self.index.is_prefix("847130101"))
+
+    def test_is_valid(self):
+        for hsn_code in ("84713010", "8471", "84713090", "998311"):
+            self.assertTrue(self.index.is_valid(hsn_code), hsn_code)
+
+        for hsn_code in ("84721000", "6115", "97"):
+            self.assertFalse(self.index.is_valid(hsn_code), hsn_code)
+
+    def test_get_invalid(self):
+        self.assertEqual(
+            self.index.get_invalid(["84713010", "84721000", "84721000", "6115"]),
+            {"84721000", "6115"},
+        )
+
+    def test_lookups(self):
+        self.assertIn("9983", self.index)
+        self.assertEqual(self.index.get_description("847130"), "Portable computers")
+        self.assertEqual(
+            self.index.get_taxes("61149090")[0].item_tax_template, "GST 12% - _TIRC"
+        )
+        self.assertIsNone(self.index.get_taxes("8472"))
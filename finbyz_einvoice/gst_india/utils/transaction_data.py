@@ -1,4 +1,6 @@
 import re
+import threading
+from functools import lru_cache
 
 import frappe
 from frappe import _
@@ -9,30 +11,60 @@ from finbyz_einvoice.gst_india.constants.e_waybill import (
     TRANSPORT_MODES,
     VEHICLE_TYPES,
 )
-from finbyz_einvoice.gst_india.utils import get_gst_accounts_by_type, get_gst_uom
+from finbyz_einvoice.gst_india.utils import get_gst_account_profile, get_gst_uom
 from finbyz_einvoice.gst_india.constants import GST_TAX_TYPES
 
+ADDRESS_FIELDS = (
+    "name",
+    "address_title",
+    "address_line1",
+    "address_line2",
+    "city",
+    "pincode",
+    "country",
+    "gstin",
+    "gst_state_number",
+    "modified",
+)
+
+TRANSACTION_ADDRESS_FIELDS = (
+    "customer_address",
+    "company_address",
+    "shipping_address_name",
+    "dispatch_address_name",
+    "port_address",
+)
+
 REGEX_MAP = {
     1: re.compile(r"[^A-Za-z0-9]"),
     2: re.compile(r"[^A-Za-z0-9\-\/. ]"),
     3: re.compile(r"[^A-Za-z0-9@#\-\/,&. ]"),
 }
 
+SANITIZE_CACHE_SIZE = 8192
+ADDRESS_CACHE_SIZE = 1024  # per site
+
+# validated and sanitized address details, per process
+# {site: {(address name, validate_gstin): (address modified, address details)}}
+_address_details = {}
+_address_details_lock = threading.Lock()
+
 
 class GSTTransactionData:
     DATE_FORMAT = "dd/mm/yyyy"
 
-    def __init__(self, doc):
+    def __init__(self, doc, prefetched=None):
         self.doc = doc
+        self.prefetched = prefetched or frappe._dict()
+        self.item_tax_index = None
         self.settings = frappe.get_cached_doc("GST Settings")
         self.sandbox_mode = self.settings.sandbox_mode
         self.transaction_details = frappe._dict()
 
-        # "CGST Account - TC": "cgst_account"
-        self.gst_accounts = {
-            v: k
-            for k, v in get_gst_accounts_by_type(self.doc.company, "Output").items()
-        }
+        self.gst_account_profile = get_gst_account_profile(self.doc.company, "Output")
+
+        # "CGST Account - TC": "cgst"
+        self.gst_accounts = self.gst_account_profile.tax_types
 
     def set_transaction_details(self):
         rounding_adjustment = self.rounded(self.doc.base_rounding_adjustment)
@@ -50,8 +82,12 @@ class GSTTransactionData:
                 "company_name": self.sanitize_value(self.doc.company),
                 "customer_name": self.sanitize_value(
                     self.doc.customer_name
-                    or frappe.db.get_value(
-                        "Customer", self.doc.customer, "customer_name"
+                    or self.get_prefetched(
+                        "customer_names",
+                        self.doc.customer,
+                        lambda: frappe.db.get_value(
+                            "Customer", self.doc.customer, "customer_name"
+                        ),
                     )
                 ),
                 "date": format_date(self.doc.posting_date, self.DATE_FORMAT),
@@ -88,7 +124,7 @@ class GSTTransactionData:
         for key in tax_total_keys:
             self.transaction_details[key] = 0
         # Finbyz Changes Start
-        reverse_charge_account = frappe.db.get_value("GST Account", {'company': self.doc.company, "account_type" : "Output"}, "export_reverse_charge_account")
+        reverse_charge_account = self.gst_account_profile.export_reverse_charge_account
 
         reverse_charge_amount = 0
         total_tax_amount = 0
@@ -100,7 +136,7 @@ class GSTTransactionData:
             if not row.tax_amount or row.account_head not in self.gst_accounts:
                 continue
 
-            tax = self.gst_accounts[row.account_head][:-8]
+            tax = self.gst_accounts[row.account_head]
             self.transaction_details[f"total_{tax}_amount"] = abs(
                 self.rounded(row.base_tax_amount_after_discount_amount)
             )
@@ -251,16 +287,18 @@ class GSTTransactionData:
         if self.doc.group_same_items:
             items = self.group_same_items()
 
-        for row in items:
+        item_names = sanitize_values(
+            [row.item_name for row in items], regex=3, max_length=300
+        )
+
+        for row, item_name in zip(items, item_names):
             item_details = frappe._dict(
                 {
                     "item_no": row.idx,
                     "qty": abs(self.rounded(row.qty, 3)),
                     "taxable_value": abs(self.rounded(row.taxable_value)),
                     "hsn_code": row.gst_hsn_code,
-                    "item_name": self.sanitize_value(
-                        row.item_name, regex=3, max_length=300
-                    ),
+                    "item_name": item_name,
                     "uom": get_gst_uom(row.uom, self.settings),
                 }
             )
@@ -306,23 +344,15 @@ class GSTTransactionData:
         for tax in GST_TAX_TYPES:
             item_details.update({f"{tax}_amount": 0, f"{tax}_rate": 0})
 
-        for row in self.doc.taxes:
-            if not row.tax_amount or row.account_head not in self.gst_accounts:
-                continue
+        item_key = item.item_code or item.item_name
 
-            # Remove '_account' from 'cgst_account'
-            tax = self.gst_accounts[row.account_head][:-8]
-            tax_rate = self.rounded(
-                frappe.parse_json(row.item_wise_tax_detail).get(
-                    item.item_code or item.item_name
-                )[0],
-                3,
-            )
+        for tax, charge_type, tax_rates in self.get_item_tax_index():
+            tax_rate = tax_rates[item_key]
 
             # considers senarios where same item is there multiple times
             tax_amount = self.get_progressive_item_tax_amount(
                 tax_rate * item.qty
-                if row.charge_type == "On Item Quantity"
+                if charge_type == "On Item Quantity"
                 else tax_rate * item.taxable_value / 100,
                 tax,
             )
@@ -352,6 +382,33 @@ class GSTTransactionData:
             }
         )
 
+    def get_item_tax_index(self):
+        """
+        Returns item-wise tax rates of GST rows, parsed once for the transaction:
+        [(tax, charge_type, {item_code or item_name: tax_rate}), ...]
+        """
+
+        if self.item_tax_index is not None:
+            return self.item_tax_index
+
+        self.item_tax_index = []
+
+        for row in self.doc.taxes:
+            if not row.tax_amount or row.account_head not in self.gst_accounts:
+                continue
+
+            tax = self.gst_accounts[row.account_head]
+            tax_rates = {
+                item_key: self.rounded(tax_detail[0], 3)
+                for item_key, tax_detail in frappe.parse_json(
+                    row.item_wise_tax_detail
+                ).items()
+            }
+
+            self.item_tax_index.append((tax, row.charge_type, tax_rates))
+
+        return self.item_tax_index
+
     def get_progressive_item_tax_amount(self, amount, tax_type):
         """
         Helper function to calculate progressive tax amount for an item to remove
@@ -366,23 +423,39 @@ class GSTTransactionData:
         return abs(response)
 
     def get_address_details(self, address_name, validate_gstin=False):
-        address = frappe.get_cached_value(
-            "Address",
+        """
+        Returns validated and sanitized address details.
+
+        Details are built once per process for each version of the address,
+        as company and dispatch addresses repeat across transactions.
+        """
+
+        address = self.get_prefetched(
+            "addresses",
             address_name,
-            (
-                "name",
-                "address_title",
-                "address_line1",
-                "address_line2",
-                "city",
-                "pincode",
-                "country",
-                "gstin",
-                "gst_state_number",
+            lambda: frappe.get_cached_value(
+                "Address", address_name, ADDRESS_FIELDS, as_dict=True
             ),
-            as_dict=True,
         )
 
+        cache = _address_details.setdefault(frappe.local.site, {})
+        key = (address_name, bool(validate_gstin))
+
+        if (cached := cache.get(key)) and cached[0] == address.modified:
+            # copied, as it is updated by the caller
+            return frappe._dict(cached[1])
+
+        address_details = self._get_address_details(address.copy(), validate_gstin)
+
+        # bulk generation builds details in many threads at once
+        with _address_details_lock:
+            if len(cache) >= ADDRESS_CACHE_SIZE:
+                cache.pop(next(iter(cache), None), None)
+
+            cache[key] = (address.modified, address_details)
+        return frappe._dict(address_details)
+
+    def _get_address_details(self, address, validate_gstin=False):
         if address.gst_state_number == "97":  # For Other Territory
             address.pincode = "999999"
 
@@ -464,6 +537,18 @@ class GSTTransactionData:
     def get_item_data(self, item_details):
         pass
 
+    def get_prefetched(self, key, name, get_value):
+        """
+        Returns value of `name` from prefetched values,
+        or the result of `get_value()` if it was not prefetched.
+        """
+
+        values = self.prefetched.get(key) or {}
+        if name in values:
+            return values[name]
+
+        return get_value()
+
     @staticmethod
     def sanitize_data(d):
         """Adapted from https://stackoverflow.com/a/27974027/4767738"""
@@ -546,32 +631,179 @@ class GSTTransactionData:
                 title=_("Invalid Data for GST Upload"),
             )
 
-        if not value or len(value) < min_length:
+        sanitized_value, error = _sanitize_value(
+            value, regex, min_length, max_length, truncate
+        )
+
+        if not error:
+            return sanitized_value
+
+        if error == "min_length":
             return _throw(
                 _("{field} must be at least {min_length} characters long"),
                 min_length=min_length,
             )
 
-        original_value = value
+        if error == "non_ascii":
+            return _throw(_("{field} must only consist of ASCII characters"))
 
-        if regex:
-            value = re.sub(REGEX_MAP[regex], "", value)
+        return _throw(
+            _("{field} consists of invalid characters: {invalid_chars}"),
+            invalid_chars=frappe.bold("".join(set(REGEX_MAP[regex].findall(value)))),
+        )
 
-        if len(value) < min_length:
-            if not original_value.isascii():
-                return _throw(_("{field} must only consist of ASCII characters"))
 
-            return _throw(
-                _("{field} consists of invalid characters: {invalid_chars}"),
-                invalid_chars=frappe.bold(
-                    "".join(set(original_value).difference(value))
-                ),
-            )
+def sanitize_values(values, regex=None, min_length=3, max_length=100, truncate=True):
+    """
+    Sanitize a column of values (e.g. item names of bulk transactions) at once,
+    each distinct value only once.
 
-        if not truncate and len(value) > max_length:
-            return
+    Returns list of sanitized values in the same order, with `None` for values
+    that can't be sanitized.
+    """
+
+    sanitized_values = {
+        value: _sanitize_value(value, regex, min_length, max_length, truncate)[0]
+        for value in set(values)
+    }
+
+    return [sanitized_values[value] for value in values]
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def _sanitize_value(value, regex, min_length, max_length, truncate):
+    """
+    Returns sanitized value and error, if any.
+
+    Same names and addresses repeat across transactions, hence memoized.
+    Doesn't depend on anything other than the arguments.
+    """
+
+    if not value or len(value) < min_length:
+        return None, "min_length"
+
+    original_value = value
+
+    # skip substitution for values that are already clean
+    if regex and (pattern := REGEX_MAP[regex]).search(value):
+        value = pattern.sub("", value)
+
+    if len(value) < min_length:
+        if not original_value.isascii():
+            return None, "non_ascii"
+
+        return None, "invalid_characters"
+
+    if not truncate and len(value) > max_length:
+        return None, None
+
+    return value[:max_length], None
+
+
+def clear_address_details(doc=None, method=None):
+    """
+    Clear address details cached in this process, for the given Address or all.
+    Other processes rebuild them as the Address is modified.
+    """
+
+    if not doc:
+        _address_details.pop(frappe.local.site, None)
+        return
+
+    cache = _address_details.get(frappe.local.site) or {}
+    for validate_gstin in (True, False):
+        cache.pop((doc.name, validate_gstin), None)
+
+
+def prefetch_transaction_data(doctype, docnames):
+    """
+    Returns masters referenced by the given transactions, to be passed to
+    `GSTTransactionData` as `prefetched` when building data for many transactions.
+
+    These are loaded with one query per master, instead of one per transaction
+    (or per item, for batches):
+    - addresses: {address name: address}
+    - customer_names: {customer: customer name}
+    - batch_expiry_dates: {batch: expiry date}
+    - posting_dates: {transaction: posting date}, for transactions returned against
+
+    Values missing here (e.g. if a transaction is updated later) are fetched as usual.
+    """
+
+    if not docnames:
+        return frappe._dict()
+
+    meta = frappe.get_meta(doctype)
+    transactions = frappe.get_all(
+        doctype,
+        filters={"name": ("in", docnames)},
+        fields=[
+            fieldname
+            for fieldname in (
+                "customer",
+                "customer_name",
+                "return_against",
+                *TRANSACTION_ADDRESS_FIELDS,
+            )
+            if meta.has_field(fieldname)
+        ],
+    )
+
+    addresses = set()
+    customers = set()
+    return_against = set()
+
+    for transaction in transactions:
+        addresses.update(
+            name
+            for fieldname in TRANSACTION_ADDRESS_FIELDS
+            if (name := transaction.get(fieldname))
+        )
 
-        return value[:max_length]
+        if transaction.customer and not transaction.customer_name:
+            customers.add(transaction.customer)
+
+        if transaction.return_against:
+            return_against.add(transaction.return_against)
+
+    batches = frappe.get_all(
+        f"{doctype} Item",
+        filters={
+            "parenttype": doctype,
+            "parent": ("in", docnames),
+            "batch_no": ("is", "set"),
+        },
+        pluck="batch_no",
+        distinct=True,
+    )
+
+    return frappe._dict(
+        addresses={
+            address.name: address
+            for address in _get_all("Address", addresses, ADDRESS_FIELDS)
+        },
+        customer_names=dict(
+            _get_all("Customer", customers, ("name", "customer_name"), as_list=True)
+        ),
+        batch_expiry_dates=dict(
+            _get_all("Batch", batches, ("name", "expiry_date"), as_list=True)
+        ),
+        posting_dates=dict(
+            _get_all(doctype, return_against, ("name", "posting_date"), as_list=True)
+        ),
+    )
+
+
+def _get_all(doctype, names, fields, as_list=False):
+    if not names:
+        return []
+
+    return frappe.get_all(
+        doctype,
+        filters={"name": ("in", list(names))},
+        fields=fields,
+        as_list=as_list,
+    )
 
 
 def validate_non_gst_items(doc, throw=True):
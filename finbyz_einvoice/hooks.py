@@ -110,6 +110,27 @@ app_license = "MIT"
 #	}
 # }
 
+doc_events = {
+	"Address": {
+		"on_update": "finbyz_einvoice.gst_india.utils.transaction_data.clear_address_details",
+		"on_trash": "finbyz_einvoice.gst_india.utils.transaction_data.clear_address_details",
+	},
+	("Tax Category", "Sales Taxes and Charges Template", "Purchase Taxes and Charges Template"): {
+		"on_update": "finbyz_einvoice.gst_india.overrides.transaction.clear_tax_template_index",
+		"on_trash": "finbyz_einvoice.gst_india.overrides.transaction.clear_tax_template_index",
+		"after_rename": "finbyz_einvoice.gst_india.overrides.transaction.clear_tax_template_index",
+	},
+	"GST HSN Code": {
+		"on_update": "finbyz_einvoice.gst_india.utils.hsn_codes.clear_hsn_index",
+		"on_trash": "finbyz_einvoice.gst_india.utils.hsn_codes.clear_hsn_index",
+		"after_rename": "finbyz_einvoice.gst_india.utils.hsn_codes.clear_hsn_index",
+	},
+	# taxes of GST HSN Codes link to Item Tax Templates
+	"Item Tax Template": {
+		"after_rename": "finbyz_einvoice.gst_india.utils.hsn_codes.clear_hsn_index",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -131,6 +152,25 @@ app_license = "MIT"
 #	],
 # }
 
+scheduler_events = {
+	"all": [
+		"finbyz_einvoice.gst_india.utils.api.flush_integration_requests"
+	],
+	"daily": [
+		"finbyz_einvoice.gst_india.utils.api.delete_old_integration_requests"
+	],
+}
+
+# clear GST Account profiles, UOM map and address details cached in this process,
+# and indexed tax templates and HSN Codes, e.g. after patches
+clear_cache = [
+	"finbyz_einvoice.gst_india.utils.clear_gst_account_profiles",
+	"finbyz_einvoice.gst_india.utils.clear_gst_uom_maps",
+	"finbyz_einvoice.gst_india.utils.transaction_data.clear_address_details",
+	"finbyz_einvoice.gst_india.overrides.transaction.clear_tax_template_index",
+	"finbyz_einvoice.gst_india.utils.hsn_codes.clear_hsn_index",
+]
+
 # Testing
 # -------
 